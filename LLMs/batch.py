@@ -0,0 +1,75 @@
+import re
+import json
+import asyncio
+import logging
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def pack_prompts(messages) -> str:
+    """Combines several prompts into one that asks for a JSON array of answers."""
+    requests = "\n\n".join(f"Request {i}:\n{message}" for i, message in enumerate(messages, start=1))
+    return (
+        f"Answer each of the following {len(messages)} requests independently, exactly as you would "
+        f"answer it on its own.\n"
+        f"Return only a JSON array of {len(messages)} strings, where item i is the complete answer to "
+        f"request i. Do not add anything before or after the array.\n\n"
+        f"{requests}"
+    )
+
+
+def unpack_responses(text: str, count: int):
+    """
+    Splits the answer to a packed prompt into its `count` answers. Returns
+    None if the response is not a JSON array of `count` strings.
+    """
+    text = _FENCE.sub("", text.strip())
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end <= start:
+        return None
+    try:
+        answers = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    if not isinstance(answers, list) or len(answers) != count or not all(isinstance(a, str) for a in answers):
+        return None
+    return answers
+
+
+async def conv_batch(llm, messages, max_concurrency=4, rate_limiter=None, pack=1, max_retries=3,
+                     return_exceptions=False):
+    """
+    Sends many prompts to `llm`; see `LLM.conv_batch`.
+    """
+    messages = list(messages)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def call(message):
+        async with semaphore:
+            if rate_limiter is not None:
+                await rate_limiter.acquire()
+            return await llm.aconv(message, max_retries)
+
+    async def run(group):
+        if len(group) == 1:
+            return [await call(group[0])]
+        response, usage = await call(pack_prompts(group))
+        answers = unpack_responses(response, len(group))
+        if answers is None:
+            logger.warning(f"Could not split the packed response into {len(group)} answers; sending them one by one.")
+            return await asyncio.gather(*(call(message) for message in group), return_exceptions=return_exceptions)
+        # The request's usage is reported once, so totals still add up
+        return [(answer, usage if i == 0 else None) for i, answer in enumerate(answers)]
+
+    pack = max(1, pack)
+    groups = [messages[start:start + pack] for start in range(0, len(messages), pack)]
+    outcomes = await asyncio.gather(*(run(group) for group in groups), return_exceptions=return_exceptions)
+
+    results = []
+    for group, outcome in zip(groups, outcomes):
+        results.extend([outcome] * len(group) if isinstance(outcome, BaseException) else outcome)
+    return results
@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import logging
+from contextlib import closing
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from .llm_interface import LLM
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def cache_key(llm: LLM, message: str, model_id: str = None) -> str:
+    """
+    Hashes everything that determines a response: the model (`model_id`,
+    or the LLM's own), the system message, the sampling parameters and the
+    prompt.
+    """
+    fields = {
+        'model_id': model_id or llm.model_id,
+        'system_message': llm.system_message,
+        'max_tokens': llm.max_tokens,
+        'temperature': llm.temperature,
+        'top_p': llm.top_p,
+        'message': message,
+    }
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    An embedded SQLite store of LLM responses by cache key.
+
+    Entries expire after the TTL they were stored with. Once the store
+    holds more than `max_entries`, the least recently used entries are
+    evicted, so the file stays bounded however many distinct prompts pass
+    through it.
+    """
+
+    def __init__(self, path, max_entries=1000, clock=time.time):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self._clock = clock
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    usage TEXT,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses (accessed_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def get(self, key: str) -> Optional[Tuple[str, Optional[Dict[str, int]]]]:
+        """Returns the cached (response, usage) for `key`, or None if missing or expired."""
+        now = self._clock()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT response, usage FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        response, usage = row
+        return response, json.loads(usage) if usage else None
+
+    def put(self, key: str, response: str, usage: Optional[Dict[str, int]], ttl: float):
+        """Stores a response for `ttl` seconds, evicting expired and least recently used entries."""
+        now = self._clock()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, usage, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, response, json.dumps(usage) if usage else None, now + ttl, now),
+            )
+            conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+            conn.execute(
+                """
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+
+    def __len__(self):
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class CachedLLM(LLM):
+    """
+    Wraps any `LLM` so identical requests are answered from a `ResponseCache`.
+
+    A rerun after a failed Telegram send, or a prompt that comes round again,
+    returns the stored response instead of calling the model. Streams are
+    cached once they complete; a cached stream is yielded in one piece.
+
+    Attributes:
+        llm (LLM): The wrapped model.
+        cache (ResponseCache): Where responses are kept.
+        ttl (float): Seconds a response stays valid.
+    """
+
+    def __init__(self, llm: LLM, cache: ResponseCache, ttl: float):
+        self.llm = llm
+        super().__init__(llm.model_id, llm.system_message, llm.max_tokens, llm.temperature, llm.top_p)
+        self.cache = cache
+        self.ttl = ttl
+        # A FailoverLLM's model_id changes with the provider that answered;
+        # keys use the configured model so they stay stable
+        self.key_model_id = llm.model_id
+
+    @property
+    def model_id(self):
+        """The wrapped model's id, e.g. the provider that produced the last response."""
+        return self.llm.model_id
+
+    @model_id.setter
+    def model_id(self, value):
+        self.llm.model_id = value
+
+    def _lookup(self, message: str):
+        key = cache_key(self, message, model_id=self.key_model_id)
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info(f"LLM cache hit for {self.model_id}.")
+        return key, cached
+
+    def conv(self, message: str, max_retries: int = 3) -> Tuple[str, Optional[Dict[str, int]]]:
+        key, cached = self._lookup(message)
+        if cached is not None:
+            return cached
+        response, usage = self.llm.conv(message, max_retries)
+        self.cache.put(key, response, usage, self.ttl)
+        return response, usage
+
+    async def aconv(self, message: str, max_retries: int = 3) -> Tuple[str, Optional[Dict[str, int]]]:
+        key, cached = await asyncio.to_thread(self._lookup, message)
+        if cached is not None:
+            return cached
+        response, usage = await self.llm.aconv(message, max_retries)
+        await asyncio.to_thread(self.cache.put, key, response, usage, self.ttl)
+        return response, usage
+
+    async def stream(self, message: str) -> AsyncIterator[str]:
+        key, cached = await asyncio.to_thread(self._lookup, message)
+        if cached is not None:
+            yield cached[0]
+            return
+        pieces = []
+        async for piece in self.llm.stream(message):
+            pieces.append(piece)
+            yield piece
+        # Only a stream that ran to completion is stored
+        await asyncio.to_thread(self.cache.put, key, "".join(pieces), None, self.ttl)
+
+    async def aclose(self):
+        await self.llm.aclose()
@@ -1,19 +1,58 @@
 import os
 import logging
-from .open_ai import AzureChat
-from .open_router import OpenRouterLLM
 
 logger = logging.getLogger(__name__)
 
 def get_llm_instance(config):
-    """Selects and initializes the LLM based on a config module."""
-    provider = getattr(config, "LLM_PROVIDER", "OPEN_ROUTER").upper()
+    """
+    Selects and initializes the LLM based on a config module.
+
+    LLM_FALLBACK_PROVIDERS lists providers that take over when LLM_PROVIDER
+    fails (those without credentials are skipped), and LLM_HEDGE also sends
+    slow requests to the next provider. If the config sets
+    LLM_CACHE_TTL_SECONDS, responses are cached for that long. Every call is
+    recorded in the metrics store under the config's name (e.g.
+    'crypto' for config.crypto_config).
+    """
+    llm = _provider_instance(config, getattr(config, "LLM_PROVIDER", "OPEN_ROUTER"))
+    fallbacks = []
+    for provider in getattr(config, "LLM_FALLBACK_PROVIDERS", []):
+        try:
+            fallbacks.append(_provider_instance(config, provider))
+        except ValueError as e:
+            logger.warning(f"Fallback provider {provider} unavailable: {e}")
+    if fallbacks:
+        from .failover import FailoverLLM
+        llm = FailoverLLM(
+            [llm, *fallbacks],
+            hedge=getattr(config, "LLM_HEDGE", False),
+            hedge_after=getattr(config, "LLM_HEDGE_AFTER_SECONDS", 20.0),
+        )
+    ttl = getattr(config, "LLM_CACHE_TTL_SECONDS", None)
+    if ttl:
+        import config.llm_cache_config as llm_cache_config
+        from .cache import CachedLLM, ResponseCache
+        cache = ResponseCache(llm_cache_config.DB_PATH, max_entries=llm_cache_config.MAX_ENTRIES)
+        llm = CachedLLM(llm, cache, ttl)
+
+    import config.llm_metrics_config as llm_metrics_config
+    if llm_metrics_config.ENABLED:
+        from .telemetry import InstrumentedLLM, MetricsStore
+        job = config.__name__.rsplit(".", 1)[-1].removesuffix("_config")
+        llm = InstrumentedLLM(llm, MetricsStore(llm_metrics_config.DB_PATH), job)
+    return llm
+
+
+def _provider_instance(config, provider):
+    provider = provider.upper()
+    # Providers are imported on demand so the unused SDK is never loaded
     if provider == "AZURE":
         logger.info("Using Azure OpenAI LLM.")
         api_key = os.getenv("AZURE_OPENAI_API_KEY")
         endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
         if not api_key or not endpoint:
             raise ValueError("AZURE_OPENAI_API_KEY and AZURE_OPENAI_ENDPOINT must be set.")
+        from .open_ai import AzureChat
         return AzureChat(
             model_id=config.AZURE_MODEL_ID,
             api_key=api_key,
@@ -27,6 +66,7 @@ def get_llm_instance(config):
         api_key = os.getenv("OPEN_ROUTER_API_KEY")
         if not api_key:
             raise ValueError("OPEN_ROUTER_API_KEY must be set.")
+        from .open_router import OpenRouterLLM
         return OpenRouterLLM(
             api_key=api_key,
             model_id=config.OPEN_ROUTER_MODEL_ID,
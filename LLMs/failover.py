@@ -0,0 +1,235 @@
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from .llm_interface import LLM
+from .telemetry import attempt_scope
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Stops calling a provider whose recent calls mostly failed.
+
+    The breaker opens once at least `min_calls` of the last `window` calls
+    were made and the share of failures among them reaches
+    `failure_threshold`. While open, calls are refused for `cooldown`
+    seconds; after that a single trial call is let through, and its outcome
+    closes the breaker again or re-opens it.
+    """
+
+    def __init__(self, window=20, failure_threshold=0.5, min_calls=4, cooldown=60.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self._clock = clock
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = None
+        self._trial = False
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def release(self):
+        """Ends a trial call that was abandoned (e.g. cancelled) without counting an outcome."""
+        self._trial = False
+
+    def record(self, success: bool):
+        self._trial = False
+        if self._opened_at is not None:
+            # The trial call decides: close and start afresh, or stay open
+            if success:
+                self._opened_at = None
+                self._outcomes.clear()
+            else:
+                self._opened_at = self._clock()
+            return
+        self._outcomes.append(success)
+        failures = self._outcomes.count(False)
+        if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_threshold:
+            logger.warning(f"Circuit opened after {failures}/{len(self._outcomes)} failed calls.")
+            self._opened_at = self._clock()
+
+
+class FailoverLLM(LLM):
+    """
+    An `LLM` that spreads each request over several providers.
+
+    Providers are tried in order, skipping those whose circuit breaker is
+    open, and the next one takes over when a provider fails. With `hedge`,
+    a request still unanswered after the current provider's p95 latency
+    (over its recent successful calls, or `hedge_after` until there are
+    `min_samples` of them) is also sent to the next provider, and the first
+    answer wins. Providers are called with `provider_retries`, so a slow or
+    rate-limited provider hands over instead of backing off for minutes.
+
+    `model_id` starts as the first provider's and then names whichever
+    provider produced the last response.
+    """
+
+    def __init__(self, providers: List[LLM], hedge: bool = False, hedge_after: float = 20.0,
+                 min_samples: int = 5, provider_retries: int = 1, breakers: Optional[List[CircuitBreaker]] = None):
+        if not providers:
+            raise ValueError("At least one provider is required.")
+        first = providers[0]
+        super().__init__(first.model_id, first.system_message, first.max_tokens, first.temperature, first.top_p)
+        self.providers = list(providers)
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+        self.min_samples = min_samples
+        self.provider_retries = provider_retries
+        self.breakers = breakers or [CircuitBreaker() for _ in self.providers]
+        self._latencies = [deque(maxlen=100) for _ in self.providers]
+
+    def hedge_delay(self, index: int) -> float:
+        """Seconds to wait for provider `index` before hedging: its recent p95 latency."""
+        latencies = sorted(self._latencies[index])
+        if len(latencies) < self.min_samples:
+            return self.hedge_after
+        return latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+
+    def _candidates(self):
+        """Yields providers in order, asking each breaker only when its provider's turn comes."""
+        for index, breaker in enumerate(self.breakers):
+            if breaker.allow():
+                yield index
+            else:
+                logger.info(f"Skipping {self.providers[index].model_id}: circuit open.")
+
+    @staticmethod
+    def _no_provider(error):
+        return error or Exception("Every LLM provider's circuit is open.")
+
+    def _succeeded(self, index: int, started: float, scope=None):
+        self.breakers[index].record(True)
+        self._latencies[index].append(time.monotonic() - started)
+        self.model_id = self.providers[index].model_id
+        if scope is not None:
+            # Credit the answer to this provider in the call's telemetry
+            scope.answered = True
+            scope.model_id = scope.model_id or self.model_id
+            scope.last_attempt_started = scope.last_attempt_started or started
+
+    def _failed(self, index: int, error: Exception):
+        self.breakers[index].record(False)
+        logger.warning(f"LLM provider {self.providers[index].model_id} failed: {error}")
+
+    def conv(self, message: str, max_retries: int = 3) -> Tuple[str, Optional[Dict[str, int]]]:
+        """Tries the providers in order; hedging needs `aconv`."""
+        error = None
+        for index in self._candidates():
+            started = time.monotonic()
+            with attempt_scope() as scope:
+                try:
+                    result = self.providers[index].conv(message, self.provider_retries)
+                except Exception as e:
+                    self._failed(index, e)
+                    error = e
+                    continue
+                self._succeeded(index, started, scope)
+            return result
+        raise self._no_provider(error)
+
+    async def _call(self, index: int, message: str):
+        started = time.monotonic()
+        # Hedged calls run concurrently, so each reports its attempts separately
+        with attempt_scope() as scope:
+            try:
+                result = await self.providers[index].aconv(message, self.provider_retries)
+            except asyncio.CancelledError:
+                # The hedge partner answered first; that is not the provider's
+                # fault, but a half-open trial must be freed for the next call
+                self.breakers[index].release()
+                raise
+            except Exception as e:
+                self._failed(index, e)
+                raise
+            self._succeeded(index, started, scope)
+        return result
+
+    async def aconv(self, message: str, max_retries: int = 3) -> Tuple[str, Optional[Dict[str, int]]]:
+        candidates = self._candidates()
+        running = {}
+        error = None
+        exhausted = False
+
+        def start_next():
+            nonlocal exhausted
+            index = next(candidates, None)
+            if index is None:
+                exhausted = True
+            else:
+                running[asyncio.create_task(self._call(index, message))] = index
+            return index
+
+        try:
+            while running or start_next() is not None:
+                # Hedging waits for the most recently started provider's p95
+                timeout = None
+                if self.hedge and not exhausted:
+                    timeout = self.hedge_delay(list(running.values())[-1])
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    index = start_next()
+                    if index is not None:
+                        logger.info(f"No answer yet; hedging with {self.providers[index].model_id}.")
+                    continue
+                for task in done:
+                    running.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+        finally:
+            for task in running:
+                task.cancel()
+        raise self._no_provider(error)
+
+    async def stream(self, message: str) -> AsyncIterator[str]:
+        """
+        Streams from the first provider that starts answering. Failover only
+        happens before the first piece; after that, errors are raised.
+        """
+        error = None
+        for index in self._candidates():
+            started = time.monotonic()
+            chunks = self.providers[index].stream(message)
+            try:
+                first = await anext(chunks)
+            except StopAsyncIteration:
+                first = ""
+            except Exception as e:
+                self._failed(index, e)
+                error = e
+                continue
+            yield first
+            try:
+                async for piece in chunks:
+                    yield piece
+            except Exception as e:
+                self._failed(index, e)
+                raise
+            self._succeeded(index, started)
+            return
+        raise self._no_provider(error)
+
+    async def aclose(self):
+        await asyncio.gather(*(provider.aclose() for provider in self.providers), return_exceptions=True)
@@ -1,5 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Tuple
+from typing import AsyncIterator, Iterable, List, Optional, Dict, Tuple
 
 class LLM(ABC):
     """
@@ -53,4 +54,72 @@ class LLM(ABC):
                   {'input_tokens': ..., 'output_tokens': ..., 'total_tokens': ...}
                   or None if usage info is not available.
         """
-        pass
\ No newline at end of file
+        pass
+
+    async def aconv(self, message: str, max_retries: int = 3) -> Tuple[str, Optional[Dict[str, int]]]:
+        """
+        The coroutine counterpart of `conv`, with the same arguments, result
+        and errors.
+
+        The default implementation runs `conv` in a worker thread; providers
+        override it with an async client, so many calls can be in flight on
+        one event loop without a thread each.
+        """
+        return await asyncio.to_thread(self.conv, message, max_retries)
+
+    async def conv_batch(self, messages: Iterable[str], max_concurrency: int = 4, rate_limiter=None,
+                         pack: int = 1, max_retries: int = 3,
+                         return_exceptions: bool = False) -> List[Tuple[str, Optional[Dict[str, int]]]]:
+        """
+        Sends many messages and returns their (response, usage) results in order.
+
+        Up to `max_concurrency` requests are in flight at once, and each
+        waits for `rate_limiter` (anything with an async `acquire()`, such as
+        an `AsyncTokenBucket`) when given; pass the same limiter to every
+        batch to share a provider's quota between them.
+
+        With `pack` > 1, up to `pack` messages go out in one request that
+        asks for a JSON array of answers, which is split back into one
+        result per message. A packed request's usage is reported on its
+        first result only. If the answer cannot be split, those messages are
+        sent one by one. Packing trades per-request overhead for longer
+        responses, so keep `pack` small enough for `max_tokens`.
+
+        Args:
+            messages: The user messages to send.
+            max_concurrency (int): Maximum requests in flight.
+            rate_limiter: Optional limiter awaited before every request.
+            pack (int): Messages per request.
+            max_retries (int): Passed to `aconv`.
+            return_exceptions (bool): Put a failed message's exception in its
+                                      place instead of raising it.
+
+        Returns:
+            list: One (response, usage) tuple, or exception, per message.
+        """
+        from .batch import conv_batch
+        return await conv_batch(
+            self, messages, max_concurrency=max_concurrency, rate_limiter=rate_limiter, pack=pack,
+            max_retries=max_retries, return_exceptions=return_exceptions,
+        )
+
+    async def aclose(self):
+        """Releases the connections held by async clients, if any."""
+
+    async def stream(self, message: str) -> AsyncIterator[str]:
+        """
+        Sends a message to the language model and yields its response as it
+        is generated, one text delta at a time.
+
+        The default implementation runs `conv` in a worker thread and yields
+        the whole response at once; providers that support streaming
+        override it so the first words arrive while the rest is generated.
+
+        Args:
+            message (str): The user's input message to send to the model.
+
+        Yields:
+            str: Successive pieces of the response.
+        """
+        response, _ = await asyncio.to_thread(self.conv, message)
+        yield response
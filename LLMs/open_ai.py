@@ -1,9 +1,10 @@
-from openai import AzureOpenAI, RateLimitError, APIError
-from typing import Optional, Dict, Tuple, List
+from typing import AsyncIterator, Optional, Dict, Tuple, List
 import time
+import asyncio
 import random
 import logging
 from .llm_interface import LLM
+from .telemetry import record_attempt
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -15,7 +16,7 @@ class AzureChat(LLM):
     the generic LLM interface.
     
     Attributes:
-        client (AzureOpenAI): The AzureOpenAI client instance.
+        client (openai.AzureOpenAI): The AzureOpenAI client instance.
         # Inherits model_id, system_message, max_tokens, etc. from LLM
     """
 
@@ -47,23 +48,57 @@ class AzureChat(LLM):
         if not azure_endpoint:
             raise ValueError("azure_endpoint must be provided.")
 
-        self.client = AzureOpenAI(
-            api_key=api_key,
-            api_version=api_version,
-            azure_endpoint=azure_endpoint
-        )
+        # The openai SDK takes most of a second to import; load it only when used
+        from openai import AzureOpenAI
+
+        self._client_options = {
+            'api_key': api_key,
+            'api_version': api_version,
+            'azure_endpoint': azure_endpoint,
+        }
+        self.client = AzureOpenAI(**self._client_options)
+        self._async_client = None
+
+    @property
+    def async_client(self):
+        """The AsyncAzureOpenAI client, created on first use."""
+        if self._async_client is None:
+            from openai import AsyncAzureOpenAI
+            self._async_client = AsyncAzureOpenAI(**self._client_options)
+        return self._async_client
+
+    def _messages(self, message: str) -> List[Dict[str, str]]:
+        messages_payload: List[Dict[str, str]] = []
+        if self.system_message:
+            messages_payload.append({"role": "system", "content": self.system_message})
+        messages_payload.append({"role": "user", "content": message})
+        return messages_payload
+
+    @staticmethod
+    def _result(response) -> Tuple[str, Optional[Dict[str, int]]]:
+        content = response.choices[0].message.content or ""
+
+        usage_info = None
+        if response.usage:
+            usage_info = {
+                'input_tokens': response.usage.prompt_tokens,
+                'output_tokens': response.usage.completion_tokens,
+                'total_tokens': response.usage.total_tokens
+            }
+
+        return content, usage_info
 
     def conv(self, message: str, max_retries: int = 3) -> Tuple[str, Optional[Dict[str, int]]]:
         """
         Sends a message to the Azure OpenAI model and gets its response.
         This method implements the abstract `conv` method from the LLM interface.
         """
-        messages_payload: List[Dict[str, str]] = []
-        if self.system_message:
-            messages_payload.append({"role": "system", "content": self.system_message})
-        messages_payload.append({"role": "user", "content": message})
+        from openai import RateLimitError, APIError
+
+        messages_payload = self._messages(message)
 
         for attempt in range(max_retries + 1):
+            record_attempt(self.model_id)
             try:
                 response = self.client.chat.completions.create(
                     model=self.model_id,
@@ -73,17 +108,7 @@ class AzureChat(LLM):
                     top_p=self.top_p,
                 )
 
-                content = response.choices[0].message.content or ""
-                
-                usage_info = None
-                if response.usage:
-                    usage_info = {
-                        'input_tokens': response.usage.prompt_tokens,
-                        'output_tokens': response.usage.completion_tokens,
-                        'total_tokens': response.usage.total_tokens
-                    }
-
-                return content, usage_info
+                return self._result(response)
 
             except RateLimitError as e:
                 if attempt < max_retries:
@@ -108,4 +133,92 @@ class AzureChat(LLM):
                     raise Exception("Unexpected error after max retries.") from e
         
         # This line should not be reachable if logic is correct, but serves as a failsafe
-        raise Exception("Conversation failed unexpectedly after all retries.")
\ No newline at end of file
+        raise Exception("Conversation failed unexpectedly after all retries.")
+
+    async def aconv(self, message: str, max_retries: int = 3) -> Tuple[str, Optional[Dict[str, int]]]:
+        """
+        The coroutine counterpart of `conv`, with the same retries and errors,
+        on the AsyncAzureOpenAI client; backoff sleeps without blocking the loop.
+        """
+        from openai import RateLimitError, APIError
+
+        messages_payload = self._messages(message)
+
+        for attempt in range(max_retries + 1):
+            record_attempt(self.model_id)
+            try:
+                response = await self.async_client.chat.completions.create(
+                    model=self.model_id,
+                    messages=messages_payload,
+                    max_tokens=self.max_tokens,
+                    temperature=self.temperature,
+                    top_p=self.top_p,
+                )
+                return self._result(response)
+
+            except RateLimitError as e:
+                if attempt < max_retries:
+                    delay = (2 ** attempt) + random.uniform(0, 1)
+                    logger.warning(f"Rate limit hit. Retrying in {delay:.2f}s...")
+                    await asyncio.sleep(delay)
+                else:
+                    logger.error("Max retries reached for rate limit.")
+                    raise Exception(f"Rate limit error after {max_retries} retries.") from e
+
+            except APIError as e:
+                logger.error(f"Azure OpenAI API error: {e}")
+                raise Exception("API error during conversation.") from e
+
+            except Exception as e:
+                logger.error(f"An unexpected error occurred: {e}")
+                if attempt < max_retries:
+                    delay = (2 ** attempt) + random.uniform(0, 1)
+                    logger.warning(f"Retrying after unexpected error in {delay:.2f}s...")
+                    await asyncio.sleep(delay)
+                else:
+                    raise Exception("Unexpected error after max retries.") from e
+
+        raise Exception("Conversation failed unexpectedly after all retries.")
+
+    async def aclose(self):
+        """Closes the async client's connections."""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+
+    async def stream(self, message: str, max_retries: int = 3) -> AsyncIterator[str]:
+        """
+        Streams the model's response as it is generated. Rate limits are
+        retried only until the stream starts; once text has been yielded a
+        failure is raised to the caller.
+        """
+        from openai import RateLimitError, APIError
+
+        for attempt in range(max_retries + 1):
+            record_attempt(self.model_id)
+            try:
+                stream = await self.async_client.chat.completions.create(
+                    model=self.model_id,
+                    messages=self._messages(message),
+                    max_tokens=self.max_tokens,
+                    temperature=self.temperature,
+                    top_p=self.top_p,
+                    stream=True,
+                )
+                break
+            except RateLimitError as e:
+                if attempt < max_retries:
+                    delay = (2 ** attempt) + random.uniform(0, 1)
+                    logger.warning(f"Rate limit hit. Retrying in {delay:.2f}s...")
+                    await asyncio.sleep(delay)
+                else:
+                    logger.error("Max retries reached for rate limit.")
+                    raise Exception(f"Rate limit error after {max_retries} retries.") from e
+            except APIError as e:
+                logger.error(f"Azure OpenAI API error: {e}")
+                raise Exception("API error during conversation.") from e
+
+        async for chunk in stream:
+            # Azure sends a first chunk without choices (content filter results)
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
@@ -1,9 +1,11 @@
 import requests
 import json
 import time
+import asyncio
 import logging
-from typing import Tuple, Dict, Optional
+from typing import AsyncIterator, Tuple, Dict, Optional
 from .llm_interface import LLM
+from .telemetry import record_attempt
 
 logging.basicConfig(level=logging.INFO,
                     format="%(asctime)s - %(levelname)s - %(message)s")
@@ -43,26 +45,85 @@ class OpenRouterLLM(LLM):
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
+        self._async_client = None
 
-    def conv(self, message: str, max_retries: int = 3) -> Tuple[str, Optional[Dict[str, int]]]:
+    @property
+    def async_client(self):
         """
-        Sends a message to the OpenRouter API and retrieves the response.
-        Implements retry logic for handling transient errors.
+        A pooled `httpx.AsyncClient`, created on first use and kept open so
+        later requests reuse its connections.
         """
-        messages = [
-            {"role": "system", "content": self.system_message},
-            {"role": "user", "content": message}
-        ]
+        if self._async_client is None:
+            import httpx
+            self._async_client = httpx.AsyncClient(headers=self.headers, timeout=httpx.Timeout(120.0, connect=10.0))
+        return self._async_client
 
-        data = {
+    async def aclose(self):
+        """Closes the async client's connections."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    def _payload(self, message: str) -> dict:
+        return {
             "model": self.model_id,
-            "messages": messages,
+            "messages": [
+                {"role": "system", "content": self.system_message},
+                {"role": "user", "content": message}
+            ],
             "max_tokens": self.max_tokens,
             "temperature": self.temperature,
             "top_p": self.top_p,
         }
 
+    @staticmethod
+    def _api_error(json_response: dict) -> requests.exceptions.HTTPError:
+        """Builds the exception for an error reported in a 200 OK body."""
+        error_details = json_response.get('error', {})
+        error_code = error_details.get('code', 'Unknown code')
+        error_message = error_details.get('message', 'Unknown API error')
+
+        # Include metadata if available for easier debugging
+        metadata = error_details.get('metadata')
+        if isinstance(metadata, dict):
+            meta_info = ", ".join(f"{k}={v}" for k, v in metadata.items())
+            error_message = f"{error_message} ({meta_info})"
+
+        return requests.exceptions.HTTPError(
+            f"OpenRouter API Error [{error_code}]: {error_message}"
+        )
+
+    @staticmethod
+    def _result(json_response: dict) -> Tuple[str, Optional[Dict[str, int]]]:
+        # Extract the response text
+        response_text = json_response['choices'][0]['message']['content']
+
+        # Extract token usage and map to the interface's expected keys
+        token_usage = None
+        if 'usage' in json_response and json_response['usage']:
+            usage_data = json_response['usage']
+            token_usage = {
+                'input_tokens': usage_data.get('prompt_tokens'),
+                'output_tokens': usage_data.get('completion_tokens'),
+                'total_tokens': usage_data.get('total_tokens')
+            }
+
+        return response_text, token_usage
+
+    def _status_error(self, response) -> requests.exceptions.HTTPError:
+        return requests.exceptions.HTTPError(
+            f"{response.status_code} Error for url {self.API_URL}: {response.text}"
+        )
+
+    def conv(self, message: str, max_retries: int = 3) -> Tuple[str, Optional[Dict[str, int]]]:
+        """
+        Sends a message to the OpenRouter API and retrieves the response.
+        Implements retry logic for handling transient errors.
+        """
+        data = self._payload(message)
+
         for attempt in range(max_retries):
+            record_attempt(self.model_id)
             try:
                 response = requests.post(
                     self.API_URL,
@@ -76,35 +137,9 @@ class OpenRouterLLM(LLM):
 
                 # Check for an error key in the successful (200 OK) response
                 if 'error' in json_response:
-                    error_details = json_response.get('error', {})
-                    error_code = error_details.get('code', 'Unknown code')
-                    error_message = error_details.get('message', 'Unknown API error')
-
-                    # Include metadata if available for easier debugging
-                    metadata = error_details.get('metadata')
-                    if isinstance(metadata, dict):
-                        meta_info = ", ".join(f"{k}={v}" for k, v in metadata.items())
-                        error_message = f"{error_message} ({meta_info})"
-
-                    raise requests.exceptions.HTTPError(
-                        f"OpenRouter API Error [{error_code}]: {error_message}"
-                    )
-                
-
-                # Extract the response text
-                response_text = json_response['choices'][0]['message']['content']
-
-                # Extract token usage and map to the interface's expected keys
-                token_usage = None
-                if 'usage' in json_response and json_response['usage']:
-                    usage_data = json_response['usage']
-                    token_usage = {
-                        'input_tokens': usage_data.get('prompt_tokens'),
-                        'output_tokens': usage_data.get('completion_tokens'),
-                        'total_tokens': usage_data.get('total_tokens')
-                    }
-                
-                return response_text, token_usage
+                    raise self._api_error(json_response)
+
+                return self._result(json_response)
 
             except requests.exceptions.RequestException as e:
                 logger.warning(
@@ -118,3 +153,83 @@ class OpenRouterLLM(LLM):
 
         # This part should not be reached if max_retries > 0
         raise Exception("Failed to get a response after all retries.")
+
+    async def aconv(self, message: str, max_retries: int = 3) -> Tuple[str, Optional[Dict[str, int]]]:
+        """
+        The coroutine counterpart of `conv` on the pooled async client, with
+        the same retries. Errors are raised as the same `requests` exceptions.
+        """
+        import httpx
+
+        data = self._payload(message)
+
+        for attempt in range(max_retries):
+            record_attempt(self.model_id)
+            try:
+                try:
+                    response = await self.async_client.post(self.API_URL, json=data)
+                except httpx.TimeoutException as e:
+                    raise requests.exceptions.Timeout(str(e)) from e
+                except httpx.TransportError as e:
+                    raise requests.exceptions.ConnectionError(str(e)) from e
+                if response.is_error:
+                    raise self._status_error(response)
+
+                try:
+                    json_response = response.json()
+                except json.JSONDecodeError as e:
+                    # requests raises its own JSONDecodeError, a RequestException, so
+                    # a truncated body is retried as it is in `conv`
+                    raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+                if 'error' in json_response:
+                    raise self._api_error(json_response)
+                return self._result(json_response)
+
+            except requests.exceptions.RequestException as e:
+                logger.warning(
+                    f"Request failed on attempt {attempt + 1}/{max_retries}: {e}"
+                )
+                if 'OpenRouter API Error' in str(e):
+                    raise
+                if attempt + 1 == max_retries:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+
+        raise Exception("Failed to get a response after all retries.")
+
+    async def stream(self, message: str) -> AsyncIterator[str]:
+        """
+        Streams the response over server-sent events. Errors are raised as
+        the same `requests` exceptions `conv` raises, so callers handle both
+        paths alike.
+        """
+        import httpx
+
+        data = {**self._payload(message), "stream": True}
+        record_attempt(self.model_id)
+        try:
+            async with self.async_client.stream("POST", self.API_URL, json=data) as response:
+                if response.is_error:
+                    await response.aread()
+                    raise self._status_error(response)
+                async for line in response.aiter_lines():
+                    # Lines starting with ':' are keep-alive comments
+                    if not line.startswith("data:"):
+                        continue
+                    payload = line[len("data:"):].strip()
+                    if payload == "[DONE]":
+                        break
+                    try:
+                        chunk = json.loads(payload)
+                    except json.JSONDecodeError as e:
+                        raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+                    if 'error' in chunk:
+                        raise self._api_error(chunk)
+                    choices = chunk.get('choices') or [{}]
+                    content = choices[0].get('delta', {}).get('content')
+                    if content:
+                        yield content
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
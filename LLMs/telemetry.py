@@ -0,0 +1,269 @@
+import os
+import time
+import asyncio
+import sqlite3
+import logging
+import argparse
+import contextvars
+from contextlib import closing, contextmanager
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from .llm_interface import LLM
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+class CallStats:
+    """What the providers report about one instrumented call."""
+
+    def __init__(self):
+        self.attempts = 0
+        self.last_attempt_started = None
+        self.model_id = None
+        self.answered = False
+
+
+_current_call = contextvars.ContextVar("llm_call_stats", default=None)
+
+
+def record_attempt(model_id: str):
+    """
+    Called by providers at the start of every request attempt. Outside an
+    instrumented call it does nothing.
+    """
+    stats = _current_call.get()
+    if stats is not None:
+        stats.attempts += 1
+        stats.last_attempt_started = time.monotonic()
+        stats.model_id = model_id
+
+
+@contextmanager
+def attempt_scope():
+    """
+    Collects the attempts made inside it in their own `CallStats`, for
+    callers that run attempts concurrently (e.g. hedged requests). Their
+    count is added to the enclosing instrumented call; only a scope marked
+    `answered` also sets that call's model and final-attempt start, so a
+    concurrent attempt that lost cannot take the credit or count as retry time.
+    """
+    parent = _current_call.get()
+    scope = CallStats()
+    token = _current_call.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_call.reset(token)
+        if parent is not None:
+            parent.attempts += scope.attempts
+            if scope.answered:
+                parent.model_id = scope.model_id
+                parent.last_attempt_started = scope.last_attempt_started
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else None
+
+
+class MetricsStore:
+    """
+    An embedded SQLite log of LLM calls, one row per call, indexed by job
+    and time so per-job summaries over a recent window stay cheap.
+    """
+
+    def __init__(self, path, clock=time.time):
+        self.path = str(path)
+        self._clock = clock
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_calls (
+                    ts REAL NOT NULL,
+                    job TEXT NOT NULL,
+                    model_id TEXT,
+                    method TEXT NOT NULL,
+                    latency REAL NOT NULL,
+                    first_token_latency REAL,
+                    retry_time REAL NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    input_tokens INTEGER,
+                    output_tokens INTEGER,
+                    total_tokens INTEGER,
+                    error TEXT
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_calls_job_ts ON llm_calls (job, ts)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def record(self, job, model_id, method, latency, retry_time, attempts, usage=None,
+               first_token_latency=None, error=None):
+        usage = usage or {}
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO llm_calls VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self._clock(), job, model_id, method, latency, first_token_latency, retry_time, attempts,
+                 usage.get('input_tokens'), usage.get('output_tokens'), usage.get('total_tokens'), error),
+            )
+
+    def summary(self, since: float = None):
+        """
+        Aggregates calls per (job, model).
+
+        Args:
+            since (float): Only calls at or after this UNIX time; None for all.
+
+        Returns:
+            list: One dict per (job, model_id) with the number of calls,
+                  errors and cache hits (calls that needed no attempt),
+                  p50/p95 latency, mean retry time and total tokens.
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT job, model_id, latency, retry_time, attempts, total_tokens, error "
+                "FROM llm_calls WHERE ts >= ? ORDER BY job, model_id",
+                (since if since is not None else float("-inf"),),
+            ).fetchall()
+
+        groups = {}
+        for job, model_id, latency, retry_time, attempts, total_tokens, error in rows:
+            groups.setdefault((job, model_id), []).append((latency, retry_time, attempts, total_tokens, error))
+
+        summary = []
+        for (job, model_id), calls in groups.items():
+            latencies = [call[0] for call in calls]
+            summary.append({
+                'job': job,
+                'model_id': model_id,
+                'calls': len(calls),
+                'errors': sum(1 for call in calls if call[4] is not None),
+                'cache_hits': sum(1 for call in calls if call[2] == 0 and call[4] is None),
+                'p50_latency': _percentile(latencies, 0.5),
+                'p95_latency': _percentile(latencies, 0.95),
+                'mean_retry_time': sum(call[1] for call in calls) / len(calls),
+                'total_tokens': sum(call[3] or 0 for call in calls),
+            })
+        return summary
+
+
+class InstrumentedLLM(LLM):
+    """
+    Wraps any `LLM` and records every call in a `MetricsStore`: latency, the
+    time spent before the final attempt (failed attempts and backoff), the
+    number of attempts, token usage and the model that answered. Streams
+    also record the time to the first piece.
+
+    Attributes:
+        llm (LLM): The wrapped model.
+        store (MetricsStore): Where calls are recorded.
+        job (str): Name the calls are aggregated under.
+    """
+
+    def __init__(self, llm: LLM, store: MetricsStore, job: str):
+        self.llm = llm
+        super().__init__(llm.model_id, llm.system_message, llm.max_tokens, llm.temperature, llm.top_p)
+        self.store = store
+        self.job = job
+
+    @property
+    def model_id(self):
+        """The wrapped model's id, e.g. the provider that produced the last response."""
+        return self.llm.model_id
+
+    @model_id.setter
+    def model_id(self, value):
+        self.llm.model_id = value
+
+    def _record(self, method, stats, started, usage=None, first_token_latency=None, error=None):
+        ended = time.monotonic()
+        retry_time = 0.0
+        if stats.last_attempt_started is not None:
+            retry_time = stats.last_attempt_started - started
+        if stats.attempts == 0:
+            # Answered without a request (e.g. from the cache): no tokens were spent
+            usage = None
+        try:
+            self.store.record(
+                self.job, stats.model_id or self.llm.model_id, method, ended - started, retry_time,
+                stats.attempts, usage=usage, first_token_latency=first_token_latency,
+                error=None if error is None else f"{type(error).__name__}: {error}",
+            )
+        except sqlite3.Error as e:
+            # Telemetry must never break the job
+            logger.warning(f"Could not record LLM metrics: {e}")
+
+    def conv(self, message: str, max_retries: int = 3) -> Tuple[str, Optional[Dict[str, int]]]:
+        stats, started = CallStats(), time.monotonic()
+        token = _current_call.set(stats)
+        try:
+            response, usage = self.llm.conv(message, max_retries)
+        except Exception as e:
+            self._record("conv", stats, started, error=e)
+            raise
+        finally:
+            _current_call.reset(token)
+        self._record("conv", stats, started, usage=usage)
+        return response, usage
+
+    async def aconv(self, message: str, max_retries: int = 3) -> Tuple[str, Optional[Dict[str, int]]]:
+        stats, started = CallStats(), time.monotonic()
+        token = _current_call.set(stats)
+        try:
+            response, usage = await self.llm.aconv(message, max_retries)
+        except Exception as e:
+            self._record("aconv", stats, started, error=e)
+            raise
+        finally:
+            _current_call.reset(token)
+        self._record("aconv", stats, started, usage=usage)
+        return response, usage
+
+    async def stream(self, message: str) -> AsyncIterator[str]:
+        stats, started = CallStats(), time.monotonic()
+        first_token_latency = None
+        chunks = self.llm.stream(message)
+        while True:
+            # The context is set around each step only: a generator may be
+            # resumed from a different context than the one it started in
+            token = _current_call.set(stats)
+            try:
+                piece = await anext(chunks)
+            except StopAsyncIteration:
+                break
+            except Exception as e:
+                self._record("stream", stats, started, first_token_latency=first_token_latency, error=e)
+                raise
+            finally:
+                _current_call.reset(token)
+            if first_token_latency is None:
+                first_token_latency = time.monotonic() - started
+            yield piece
+        self._record("stream", stats, started, first_token_latency=first_token_latency)
+
+    async def aclose(self):
+        await self.llm.aclose()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize LLM call metrics by job and model.")
+    parser.add_argument("--db", required=True, help="Path to the metrics database.")
+    parser.add_argument("--days", type=float, default=7, help="Only calls from the last N days.")
+    args = parser.parse_args(argv)
+
+    rows = MetricsStore(args.db).summary(since=time.time() - args.days * 86400)
+    print(f"{'job':<22}{'model':<40}{'calls':>6}{'errors':>7}{'cached':>7}{'p50 s':>8}{'p95 s':>8}{'retry s':>8}{'tokens':>9}")
+    for row in rows:
+        print(
+            f"{row['job']:<22}{str(row['model_id']):<40}{row['calls']:>6}{row['errors']:>7}{row['cache_hits']:>7}"
+            f"{row['p50_latency']:>8.2f}{row['p95_latency']:>8.2f}{row['mean_retry_time']:>8.2f}{row['total_tokens']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,112 @@
+import re
+
 import pandas as pd
 
-def create_trading_prompt(historical_data: pd.DataFrame, ta: str, last_n_days: int) -> str:
+# Roughly how GPT-style BPE tokenizers split text: runs of letters, groups of
+# up to three digits, and each punctuation mark
+_TOKEN_PATTERN = re.compile(r"[^\W\d_]+|\d{1,3}|[^\w\s]|_")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of tokens in `text` without a tokenizer download.
+    Numeric tables come out close to a real BPE count; long or rare words
+    are undercounted slightly.
+    """
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def _downsample(df: pd.DataFrame, full_rows: int, stride: int) -> pd.DataFrame:
+    """Keeps the last `full_rows` rows and every `stride`-th row before them, counted back from the newest."""
+    if full_rows is None or stride <= 1 or len(df) <= full_rows:
+        return df
+    older = df.iloc[:len(df) - full_rows]
+    keep = older.iloc[::-1].iloc[stride - 1::stride].iloc[::-1]
+    return pd.concat([keep, df.iloc[len(df) - full_rows:]])
+
+
+def _encode(df: pd.DataFrame, encoding: str) -> str:
+    if encoding == "table":
+        return df.to_string()
+    if encoding == "csv":
+        return df.to_csv(index=False).strip()
+    if encoding == "delta":
+        numeric = df.select_dtypes("number").columns
+        deltas = df.copy()
+        deltas[numeric] = df[numeric].diff().round(4)
+        deltas.iloc[0] = df.iloc[0]
+        return deltas.to_csv(index=False).strip()
+    raise ValueError(f"Unknown encoding: {encoding}")
+
+
+def compact_table(df: pd.DataFrame, columns=None, encoding: str = "csv", full_rows: int = None,
+                  stride: int = 1, max_tokens: int = None) -> str:
+    """
+    Renders a DataFrame for a prompt in as few tokens as needed.
+
+    Args:
+        df (pd.DataFrame): Rows in chronological order.
+        columns (list): Columns to include; missing ones are ignored. None keeps all.
+        encoding (str): "table" (padded `to_string`), "csv", or "delta" (CSV
+                        whose first row is absolute and whose later rows hold
+                        the change of each numeric column from the row before).
+        full_rows (int): Number of most recent rows kept at full resolution.
+        stride (int): Older rows are thinned to one in `stride`.
+        max_tokens (int): Token budget (see `estimate_tokens`). The oldest
+                          rows are dropped until the table fits.
+
+    Returns:
+        str: The encoded table.
+    """
+    if columns is not None:
+        df = df[[column for column in columns if column in df.columns]]
+    df = _downsample(df, full_rows, stride)
+
+    text = _encode(df, encoding)
+    if max_tokens is None or estimate_tokens(text) <= max_tokens or len(df) <= 1:
+        return text
+
+    # Largest number of most recent rows that fits; the count is monotonic in rows
+    low, high = 1, len(df) - 1
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(_encode(df.tail(middle), encoding)) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return _encode(df.tail(low), encoding)
+
+
+def create_trading_prompt(historical_data: pd.DataFrame, ta: str, last_n_days: int, columns=None,
+                          encoding: str = "table", full_rows: int = None, stride: int = 1,
+                          max_tokens: int = None) -> str:
     """
     Creates a prompt for the LLM based on Bitcoin market data.
+
+    By default the last `last_n_days` rows are included as a plain table; the
+    other arguments are passed to `compact_table` to shrink it.
     """
+    data = compact_table(
+        historical_data.tail(last_n_days),
+        columns=columns,
+        encoding=encoding,
+        full_rows=full_rows,
+        stride=stride,
+        max_tokens=max_tokens,
+    )
+    note = ""
+    if encoding == "delta":
+        note = "The first row holds absolute values; each later row holds the change from the row before.\n"
     prompt = f"""
-        Analyze the following Bitcoin market data and return a trading strategy with clear buy/sell signals, 
+        Analyze the following Bitcoin market data and return a trading strategy with clear buy/sell signals,
         technical justification, and a risk assessment.
 
         Below is the recent historical price data with calculated technical indicators (MA, MACD, RSI):
 
         HISTORICAL_DATA:
-        {historical_data.tail(last_n_days).to_string()}
+        {note}{data}
 
         Technical Analysis Summary:
         {ta}
     """
-    return prompt
\ No newline at end of file
+    return prompt
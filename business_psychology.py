@@ -5,8 +5,10 @@ import logging
 from dotenv import load_dotenv
 
 import config.business_psychology_config as business_psychology_config
+import config.subscribers_config as subscribers_config
 
 from telegram_service.bot import TelegramNotifier
+from telegram_service.subscribers import load_chat_ids
 
 from LLMs.factory import get_llm_instance
 
@@ -19,35 +21,36 @@ logger = logging.getLogger(__name__)
 BUSINESS_BOT_TOKEN = os.getenv("BUSINESS_BOT_TOKEN")
 TELEGRAM_USER_ID = int(os.getenv("TELEGRAM_USER_ID", "0"))
 
-async def main():
+async def main(chat_instance=None, notifier=None, schedule=None):
+    chat_ids = load_chat_ids(subscribers_config.DB_PATH, "business_psychology", schedule, default_chat_id=TELEGRAM_USER_ID)
+    if not chat_ids:
+        logger.info("No subscribers for this run.")
+        return
+
     # Initialize LLM and notifier
-    chat_instance = get_llm_instance(business_psychology_config)
-    notifier = TelegramNotifier(token=BUSINESS_BOT_TOKEN)
+    chat_instance = chat_instance or get_llm_instance(business_psychology_config)
+    notifier = notifier or TelegramNotifier(token=BUSINESS_BOT_TOKEN)
 
     # Generate advice from LLM
     scenario = random.choice(business_psychology_config.SCENARIOS)
     context_twist = random.choice(business_psychology_config.CONTEXT_TWISTS)
     alternative_context_twist = random.choice(business_psychology_config.CONTEXT_TWISTS)
-    logger.info("Generating LLM response...")
+    logger.info("Generating LLM response and streaming it to Telegram...")
     prompt = (
         f"Provide psychological advice for the following situation in a business context: {scenario}. "
         f"Consider the following context twist: {context_twist}. Alternative context twist: {alternative_context_twist}"
     )
-    response, usage = chat_instance.conv(prompt)
-    logger.info("LLM response received.")
-
-    final_message = (
+    header = (
         f"Scenario: {scenario}\n"
         f"Context Twist: {context_twist}\n"
         f"Alternative Context Twist: {alternative_context_twist}\n\n"
-        f"{response}\n\n"
-        f"LLM: {chat_instance.model_id}"
     )
+    # Built once the stream ends: with failover, the answering model is known only then
+    footer = lambda: f"\n\nLLM: {chat_instance.model_id}"
 
-    # Send advice to Telegram
-    logger.info("Sending notifications to Telegram...")
-    await notifier.send_message(msg=final_message, chat_id=TELEGRAM_USER_ID)
-    logger.info("Notification sent.")
+    # Stream the advice to Telegram as it is generated
+    await notifier.broadcast_stream(chat_instance.stream(prompt), chat_ids, header=header, footer=footer)
+    logger.info("LLM response received and sent.")
 
 
 if __name__ == "__main__":
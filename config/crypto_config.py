@@ -3,18 +3,35 @@ from pathlib import Path
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent
 _DATA_DIR = _PROJECT_ROOT / "data"
 
-BTC_DATA_PATH = _DATA_DIR / "btc_data.csv"
+BTC_DATA_PATH = _DATA_DIR / "btc_data.csv"  # legacy snapshot log, imported into SNAPSHOT_DB_PATH once
+SNAPSHOT_DB_PATH = _DATA_DIR / "btc_snapshots.sqlite"
 HISTORICAL_DATA_PATH = _DATA_DIR / "historical_data.csv"
 CRYPTO_INDICATORS_PATH = _DATA_DIR / "crypto_indicators.png"
 OHLC_DATA_PATH = _DATA_DIR / "ohlc_data.csv"
+TELEGRAM_FILE_ID_CACHE_PATH = _DATA_DIR / "btc_bot_file_ids.json"  # file_ids of charts the BTC bot has uploaded
+HISTORY_STORE_DIR = _DATA_DIR / "history"  # raw bars synced incrementally from CoinGecko
+# "npy": typed, memory-mapped columnar files next to the paths above; "csv": plain CSV
+STORAGE_BACKEND = "npy"
 LAST_N_DAYS=50
+# Compaction of the historical data in the LLM prompt (see LLMs/utils.compact_table)
+PROMPT_COLUMNS = [
+    'date', 'price', 'volume', 'MA50', 'MA200', 'RSI', 'MACD', 'Signal_Line',
+    'bollinger_upper', 'bollinger_lower', 'dominance_percentage',
+]
+PROMPT_ENCODING = "csv"  # "table", "csv" or "delta"
+PROMPT_FULL_ROWS = 14  # the last two weeks day by day...
+PROMPT_STRIDE = 3  # ...and every third day before that
+PROMPT_MAX_TOKENS = 1500
 WINDOW = 50
+FETCH_MAX_CONCURRENCY = 4  # max CoinGecko requests in flight
 
 LLM_PROVIDER = "AZURE" # Options: "AZURE", "OPEN_ROUTER"
+LLM_FALLBACK_PROVIDERS = ["OPEN_ROUTER"]  # take over when LLM_PROVIDER fails; skipped without credentials
 AZURE_MODEL_ID = "gpt-4o"
 OPEN_ROUTER_MODEL_ID = "deepseek/deepseek-chat-v3-0324:free"
 TEMPERATURE = 0.3
 TOP_P = 0.7
+LLM_CACHE_TTL_SECONDS = 6 * 60 * 60  # a rerun of the same day's report reuses the analysis
 SYSTEM_MESSAGE = """
     You are a seasoned crypto trading expert specializing in **long-term Bitcoin (BTC) investment strategies**. 
     Your role is to provide **clear, data-driven advice** on whether to **buy BTC today or wait** for a better entry 
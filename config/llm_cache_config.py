@@ -0,0 +1,3 @@
+# SQLite cache of LLM responses, shared by every bot (see LLMs/cache.py)
+DB_PATH = 'data/llm_cache.sqlite'
+MAX_ENTRIES = 1000  # least recently used responses beyond this are evicted
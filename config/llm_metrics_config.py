@@ -0,0 +1,3 @@
+# SQLite log of every LLM call's latency, retries and tokens (see LLMs/telemetry.py)
+ENABLED = True
+DB_PATH = 'data/llm_metrics.sqlite'
@@ -1,9 +1,13 @@
 FILEPATH = 'data/words_of_the_day.txt'
+UPDATE_OFFSET_PATH = 'data/qotd_update_offset.json'  # next Telegram update offset for the QOTD bot
 LLM_PROVIDER = "OPEN_ROUTER" # "AZURE", "OPEN_ROUTER"
+LLM_FALLBACK_PROVIDERS = ["AZURE"]  # take over when LLM_PROVIDER fails; skipped without credentials
+LLM_HEDGE = True  # also ask the fallback when the free model is slower than its usual p95
 AZURE_MODEL_ID = "gpt-4o"
 OPEN_ROUTER_MODEL_ID = "moonshotai/kimi-k2:free" # "z-ai/glm-4.5-air:free", "deepseek/deepseek-chat-v3-0324:free"
 TEMPERATURE = 0.4
 TOP_P = 1.0
+LLM_CACHE_TTL_SECONDS = 12 * 60 * 60  # reruns after a failed send reuse the quote
 TOPICS = [
     "inspiration", 
     "motivation", 
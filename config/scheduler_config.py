@@ -0,0 +1,9 @@
+# Crontab-style schedules ("m h dom mon dow", local time) for the jobs hosted
+# by run_scheduler.py. Remove a job to disable it.
+JOBS = {
+    "fetch_all_data": "20 8 * * *",
+    "crypto_main": "25 8 * * *",
+    "business_psychology": "2 20 * * *",
+    "quote_of_the_day": "20 20 * * *",
+    "word_quiz": "0 13 * * *",
+}
@@ -0,0 +1,2 @@
+# SQLite registry of report subscribers, shared by every bot
+DB_PATH = 'data/subscribers.sqlite'
@@ -1,11 +1,13 @@
-from .quote_of_the_day_config import FILEPATH
+from .quote_of_the_day_config import FILEPATH, UPDATE_OFFSET_PATH
 WAIT_FOR_REPLY_SECONDS = 30 * 60  # 30 minutes
-SLEEP_BETWEEN_CHECKS_SECONDS = 20 
 LLM_PROVIDER = "OPEN_ROUTER" # "AZURE", "OPEN_ROUTER"
+LLM_FALLBACK_PROVIDERS = ["AZURE"]  # take over when LLM_PROVIDER fails; skipped without credentials
+LLM_HEDGE = True  # also ask the fallback when the free model is slower than its usual p95
 AZURE_MODEL_ID = "gpt-4o"
 OPEN_ROUTER_MODEL_ID = "moonshotai/kimi-k2:free" # "z-ai/glm-4.5-air:free", "deepseek/deepseek-chat-v3-0324:free"
 TEMPERATURE = 0.4
 TOP_P = 1.0
+LLM_CACHE_TTL_SECONDS = 12 * 60 * 60  # reruns after a failed send reuse the sentences
 N_WORDS = 4
 SYSTEM_MESSAGE = """
     You are a master creator of sentences. Your goal is to create example sentences for each word provided. Instead of
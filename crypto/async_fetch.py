@@ -0,0 +1,131 @@
+import os
+import asyncio
+import logging
+
+import requests
+
+from .coingecko_client import get_client
+from .get_btc_data import (
+    current_price_params,
+    parse_current_data,
+    get_historical_price_data,
+    get_historical_ohlc_data,
+)
+from .history_store import HistoryStore, sync_historical_price_data, sync_ohlc_data
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+async def _in_thread(semaphore, func, *args, **kwargs):
+    """Runs a blocking fetch in a worker thread, bounded by the semaphore."""
+    async with semaphore:
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+
+async def fetch_current_data(coins, semaphore, client=None):
+    """
+    Fetches the current price snapshot for several coins concurrently with the
+    global market data used for dominance.
+
+    /simple/price accepts a comma-separated id list, so all coins share one
+    request; it runs alongside the /global request.
+
+    Args:
+        coins (dict): Mapping of CoinGecko coin id to symbol, e.g. {'bitcoin': 'btc'}.
+        semaphore (asyncio.Semaphore): Bounds the number of in-flight requests.
+        client (CoinGeckoClient): Optional client; the shared one is used by default.
+
+    Returns:
+        dict: coin id -> data dict as returned by `get_current_price_and_dominance`,
+              or None for coins that could not be fetched.
+    """
+    client = client or get_client()
+    try:
+        price_payload, global_payload = await asyncio.gather(
+            _in_thread(semaphore, client.get_json, "/simple/price", params=current_price_params(",".join(coins))),
+            _in_thread(semaphore, client.get_json, "/global"),
+        )
+    except requests.RequestException as e:
+        logger.error(f"Error fetching current data: {e}")
+        return {coin_id: None for coin_id in coins}
+
+    global_data = global_payload['data']
+    current = {}
+    for coin_id, symbol in coins.items():
+        if coin_id not in price_payload:
+            logger.error(f"No current price returned for {coin_id}.")
+            current[coin_id] = None
+            continue
+        current[coin_id] = parse_current_data(coin_id, symbol, price_payload[coin_id], global_data)
+
+    return current
+
+
+async def fetch_all(coins, history_days=300, ohlc_days=30, max_concurrency=4, client=None, store_dir=None,
+                    storage_backend='csv'):
+    """
+    Runs the historical, current and OHLC fetches for every coin concurrently.
+
+    When `store_dir` is given, historical and OHLC data are synced into local
+    per-coin stores there and only the bars missing since the last run are
+    downloaded.
+
+    Args:
+        coins (dict): Mapping of CoinGecko coin id to symbol, e.g. {'bitcoin': 'btc'}.
+        history_days (int): Days of daily price/volume history to fetch.
+        ohlc_days (int): Days of OHLC candles to fetch.
+        max_concurrency (int): Maximum number of requests in flight at once.
+        client (CoinGeckoClient): Optional client; the shared one is used by default.
+        store_dir (str | Path): Optional directory for the local history stores.
+        storage_backend (str): Storage backend for the history stores ('csv' or 'npy').
+
+    Returns:
+        dict: coin id -> {'historical': DataFrame | None,
+                          'current': dict | None,
+                          'ohlc': DataFrame | None}
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    if store_dir is None:
+        historical_tasks = [
+            _in_thread(semaphore, get_historical_price_data, days=history_days, coin_id=coin_id, client=client)
+            for coin_id in coins
+        ]
+        ohlc_tasks = [
+            _in_thread(semaphore, get_historical_ohlc_data, coin_id=coin_id, days=ohlc_days, client=client)
+            for coin_id in coins
+        ]
+    else:
+        historical_tasks = [
+            _in_thread(
+                semaphore, sync_historical_price_data,
+                HistoryStore(os.path.join(store_dir, f"{coin_id}_prices.csv"), backend=storage_backend),
+                coin_id=coin_id, days=history_days, client=client,
+            )
+            for coin_id in coins
+        ]
+        ohlc_tasks = [
+            _in_thread(
+                semaphore, sync_ohlc_data,
+                HistoryStore(os.path.join(store_dir, f"{coin_id}_ohlc.csv"), backend=storage_backend),
+                coin_id=coin_id, days=ohlc_days, client=client,
+            )
+            for coin_id in coins
+        ]
+
+    current, historical, ohlc = await asyncio.gather(
+        fetch_current_data(coins, semaphore, client=client),
+        asyncio.gather(*historical_tasks),
+        asyncio.gather(*ohlc_tasks),
+    )
+
+    return {
+        coin_id: {
+            'historical': historical[i],
+            'current': current[coin_id],
+            'ohlc': ohlc[i],
+        }
+        for i, coin_id in enumerate(coins)
+    }
@@ -1,4 +1,7 @@
+import sys
 import logging
+import numpy as np
+import pandas as pd
 
 logging.basicConfig(level=logging.INFO,
                     format="%(asctime)s - %(levelname)s - %(message)s")
@@ -106,3 +109,123 @@ def calculate_purchase_amount(historical_data):
     purchase = 100 * (ma200 / current_price) * (dom200/current_dominance)
 
     return int(purchase)
+
+
+def calculate_indicators_batch(prices, rsi_period=14, fast=12, slow=26, signal=9,
+                               bollinger_window=20, num_std_dev=2):
+    """
+    Calculate MA50/MA200, RSI, MACD and Bollinger Bands for many assets at once.
+
+    Every indicator is computed column-wise over the whole (time x asset) matrix
+    in a single vectorized call, with the same rounding as the per-Series
+    functions above, so each asset's values are identical to running them one
+    asset at a time.
+
+    Parameters:
+    - prices: DataFrame (or 2-D array) of prices, one column per asset.
+    - rsi_period, fast, slow, signal, bollinger_window, num_std_dev: same meaning
+      as in `calculate_rsi`, `calculate_macd` and `calculate_bollinger_bands`.
+
+    Returns:
+    - DataFrame with ('asset', 'indicator') MultiIndex columns. `result[asset]`
+      has the same columns as a single-asset historical_data frame.
+    """
+    if prices is None or len(prices) == 0:
+        logger.warning("Input price matrix is empty or None.")
+        return None
+
+    prices = pd.DataFrame(prices).astype(float)
+
+    delta = prices.diff()
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    avg_gain = gain.rolling(window=rsi_period).mean().round(2)
+    avg_loss = loss.rolling(window=rsi_period).mean().round(2)
+
+    ema_fast = prices.ewm(span=fast, adjust=False).mean().round(2)
+    ema_slow = prices.ewm(span=slow, adjust=False).mean().round(2)
+    macd = (ema_fast - ema_slow).round(2)
+
+    bollinger_mid = prices.rolling(bollinger_window).mean().round(2)
+    bollinger_std = prices.rolling(bollinger_window).std().round(2)
+
+    indicators = {
+        'price': prices,
+        'MA50': prices.rolling(window=50).mean().round(2),
+        'MA200': prices.rolling(window=200).mean().round(2),
+        'MACD': macd,
+        'Signal_Line': macd.ewm(span=signal, adjust=False).mean().round(2),
+        'RSI': (100 - (100 / (1 + avg_gain / avg_loss))).round(2),
+        'bollinger_mid': bollinger_mid,
+        'bollinger_std': bollinger_std,
+        'bollinger_upper': (bollinger_mid + num_std_dev * bollinger_std).round(2),
+        'bollinger_lower': (bollinger_mid - num_std_dev * bollinger_std).round(2),
+    }
+
+    result = pd.concat(indicators, axis=1, names=['indicator', 'asset']).swaplevel(axis=1)
+    columns = pd.MultiIndex.from_product([prices.columns, list(indicators)], names=['asset', 'indicator'])
+
+    return result.reindex(columns=columns)
+
+
+# pandas_ta zeroes directional movement below machine epsilon and nudges
+# zero-width bars by it; the same constant keeps the results identical.
+_EPSILON = sys.float_info.epsilon
+
+
+def _wilder(values, period):
+    """Wilder's smoothing (RMA): an EWM with alpha = 1 / period."""
+    return values.ewm(alpha=1.0 / period, min_periods=period).mean()
+
+
+def calculate_dmi(high, low, close, period=14):
+    """
+    Calculate the ADX with its +DI and -DI directional indicators.
+
+    The arithmetic follows `pandas_ta.adx` (Wilder-smoothed true range and
+    directional movement), so the values match `df.ta.adx()` without
+    importing pandas_ta.
+
+    Parameters:
+    - high, low, close: Series for one asset, or (time x asset) DataFrames to
+      compute every asset column-wise in one pass.
+    - period: Smoothing period for the ATR, the directional movement and the ADX.
+
+    Returns:
+    - For Series input, a DataFrame with 'ADX', 'DMP' (+DI) and 'DMN' (-DI)
+      columns, or None when there are fewer than `period` rows.
+    - For DataFrame input, the same indicators with ('asset', 'indicator')
+      MultiIndex columns, as expected by `scan_signals`.
+    """
+    if high is None or len(high) < period:
+        logger.warning("Not enough OHLC data to calculate the ADX.")
+        return None
+
+    high, low, close = (values.astype(float) for values in (high, low, close))
+
+    high_low = high - low
+    # pandas_ta adds epsilon to every bar of a series that has a zero-width bar
+    high_low = high_low + _EPSILON * high_low.eq(0).any()
+    prev_close = close.shift(1)
+    true_range = np.fmax(np.fmax(high_low.abs(), (high - prev_close).abs()), (prev_close - low).abs())
+    true_range.iloc[:1] = np.nan
+    k = 100 / _wilder(true_range, period)
+
+    up = high - high.shift(1)
+    down = low.shift(1) - low
+    pos = ((up > down) & (up > 0)) * up
+    neg = ((down > up) & (down > 0)) * down
+    pos = pos.where(~(pos.abs() < _EPSILON), 0)
+    neg = neg.where(~(neg.abs() < _EPSILON), 0)
+
+    dmp = k * _wilder(pos, period)
+    dmn = k * _wilder(neg, period)
+    dx = 100 * (dmp - dmn).abs() / (dmp + dmn)
+    adx = _wilder(dx, period)
+
+    if isinstance(close, pd.Series):
+        return pd.DataFrame({'ADX': adx, 'DMP': dmp, 'DMN': dmn})
+
+    result = pd.concat({'ADX': adx, 'DMP': dmp, 'DMN': dmn}, axis=1, names=['indicator', 'asset'])
+    columns = pd.MultiIndex.from_product([close.columns, ['ADX', 'DMP', 'DMN']], names=['asset', 'indicator'])
+    return result.swaplevel(axis=1).reindex(columns=columns)
@@ -0,0 +1,215 @@
+import time
+import random
+import logging
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://api.coingecko.com/api/v3"
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket used to pace requests below the API rate limit.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        capacity (float): Maximum burst size.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Blocks until a token is available. Returns the time spent waiting."""
+        with self._lock:
+            now = self._clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+            self._last = now
+
+            wait = 0.0
+            if self.tokens < 1:
+                wait = (1 - self.tokens) / self.rate
+                self._sleep(wait)
+                self.tokens = 1.0
+                self._last = self._clock()
+
+            self.tokens -= 1
+            return wait
+
+
+def parse_retry_after(value):
+    """
+    Parses a Retry-After header (delta-seconds or HTTP-date) into seconds.
+    Returns None if the header is missing or malformed.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class CoinGeckoClient:
+    """
+    A shared HTTP client for the CoinGecko API.
+
+    Keeps a pooled keep-alive session, applies timeouts, paces requests with a
+    token bucket, retries 429/5xx responses with exponential backoff that honors
+    `Retry-After`, and revalidates repeated requests with ETag/Last-Modified.
+    """
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        timeout=(3.05, 30),
+        requests_per_minute: float = 30,
+        burst: int = 5,
+        max_retries: int = 5,
+        backoff_factor: float = 1.0,
+        max_backoff: float = 60.0,
+        pool_maxsize: int = 10,
+        session: requests.Session = None,
+        sleep=time.sleep,
+    ):
+        """
+        Args:
+            base_url (str): API root URL.
+            timeout (float | tuple): (connect, read) timeout passed to requests.
+            requests_per_minute (float): Sustained request rate allowed.
+            burst (int): Number of requests that may be sent back to back.
+            max_retries (int): Retries for 429/5xx responses and connection errors.
+            backoff_factor (float): Base delay for exponential backoff in seconds.
+            max_backoff (float): Upper bound on a single backoff delay.
+            pool_maxsize (int): Maximum number of pooled keep-alive connections.
+            session (requests.Session): Optional pre-built session (mainly for tests).
+            sleep (callable): Sleep function (mainly for tests).
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self._sleep = sleep
+        self.bucket = TokenBucket(requests_per_minute / 60.0, burst, sleep=sleep)
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"Accept": "application/json"})
+        self.session = session
+
+        # (url, sorted params) -> (validators, decoded json)
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+
+    def _backoff_delay(self, attempt: int, response=None) -> float:
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+        delay = self.backoff_factor * (2 ** attempt) + random.uniform(0, 1)
+        return min(delay, self.max_backoff)
+
+    def get_json(self, path: str, params: dict = None):
+        """
+        Performs a GET request against the API and returns the decoded JSON body.
+
+        Args:
+            path (str): Endpoint path, e.g. '/simple/price'.
+            params (dict): Query parameters.
+
+        Returns:
+            The decoded JSON response.
+
+        Raises:
+            requests.RequestException: If the request still fails after all retries.
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        cache_key = (url, tuple(sorted((params or {}).items())))
+
+        with self._cache_lock:
+            cached = self._cache.get(cache_key)
+        headers = {}
+        if cached:
+            validators, _ = cached
+            if validators.get('ETag'):
+                headers['If-None-Match'] = validators['ETag']
+            if validators.get('Last-Modified'):
+                headers['If-Modified-Since'] = validators['Last-Modified']
+
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                logger.warning(f"Request to {url} failed ({e}). Retrying in {delay:.2f}s...")
+                self._sleep(delay)
+                continue
+
+            if response.status_code == 304 and cached:
+                return cached[1]
+
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                delay = self._backoff_delay(attempt, response)
+                logger.warning(f"HTTP {response.status_code} from {url}. Retrying in {delay:.2f}s...")
+                self._sleep(delay)
+                continue
+
+            response.raise_for_status()
+            data = response.json()
+
+            validators = {
+                key: response.headers[key]
+                for key in ('ETag', 'Last-Modified')
+                if response.headers.get(key)
+            }
+            if validators:
+                with self._cache_lock:
+                    self._cache[cache_key] = (validators, data)
+
+            return data
+
+        # Only reachable if max_retries < 0
+        raise requests.RequestException(f"Failed to fetch {url}.")
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_client() -> CoinGeckoClient:
+    """Returns the process-wide shared CoinGecko client."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = CoinGeckoClient()
+        return _default_client
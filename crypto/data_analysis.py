@@ -1,6 +1,8 @@
-import pandas_ta as ta
+import numpy as np
 import pandas as pd
 
+from .calculations import calculate_dmi
+
 def analyze_moving_averages(df, window=3):
     """Check recent trend in MA50 vs MA200 over a few days"""
     recent = df.tail(window)
@@ -19,29 +21,62 @@ def analyze_moving_averages(df, window=3):
         return "MAs are converging (Unclear trend) ⚪"
 
 
+def find_macd_crossovers(df):
+    """
+    Find every MACD/Signal Line crossover in the DataFrame in one vectorized pass.
+
+    A bullish crossover is a bar where MACD is above the Signal Line after being
+    below it on the previous bar; a bearish crossover is the opposite.
+
+    Returns:
+    - DataFrame indexed by the crossover rows with columns 'signal'
+      ('bullish' or 'bearish') and 'days_ago' (calendar days before the last
+      row for a datetime index, otherwise number of rows), plus 'date' when the
+      input has a 'date' column.
+    """
+    macd = df['MACD'].to_numpy()
+    signal_line = df['Signal_Line'].to_numpy()
+    below = macd < signal_line
+    above = macd > signal_line
+
+    bullish = np.zeros(len(df), dtype=bool)
+    bearish = np.zeros(len(df), dtype=bool)
+    bullish[1:] = below[:-1] & above[1:]
+    bearish[1:] = above[:-1] & below[1:]
+    positions = np.flatnonzero(bullish | bearish)
+
+    if pd.api.types.is_datetime64_any_dtype(df.index):
+        days_ago = (df.index[-1] - df.index[positions]).days.to_numpy() if len(df) else positions
+    else:
+        days_ago = len(df) - 1 - positions
+
+    crossovers = pd.DataFrame(
+        {
+            'signal': np.where(bullish[positions], 'bullish', 'bearish'),
+            'days_ago': days_ago,
+        },
+        index=df.index[positions],
+    )
+    if 'date' in df.columns:
+        crossovers.insert(0, 'date', df['date'].to_numpy()[positions])
+
+    return crossovers
+
+
 def analyze_macd(df, window=3):
     """Analyze MACD crossovers over the recent days"""
     recent = df.tail(window)
-    signals = []
+    crossovers = find_macd_crossovers(recent)
 
-    last_index = recent.index[-1]
-    is_datetime = pd.api.types.is_datetime64_any_dtype(recent.index)
-
-    for i in range(1, len(recent)):
-        prev = recent.iloc[i - 1]
-        curr = recent.iloc[i]
-        curr_index = recent.index[i]
-
-        if prev['MACD'] < prev['Signal_Line'] and curr['MACD'] > curr['Signal_Line']:
-            days_ago = (last_index - curr_index).days if is_datetime else len(recent) - i - 1
-            signals.append(f"Bullish crossover {days_ago} days ago 🟢")
-        elif prev['MACD'] > prev['Signal_Line'] and curr['MACD'] < curr['Signal_Line']:
-            days_ago = (last_index - curr_index).days if is_datetime else len(recent) - i - 1
-            signals.append(f"Bearish crossover {days_ago} days ago 🔴")
+    signals = [
+        f"Bullish crossover {days_ago} days ago 🟢" if signal == 'bullish'
+        else f"Bearish crossover {days_ago} days ago 🔴"
+        for signal, days_ago in zip(crossovers['signal'], crossovers['days_ago'])
+    ]
 
     if signals:
         return f"MACD Crossovers Detected:\n{',\n'.join(signals)}"
-    elif recent.iloc[-1]['MACD'] > recent.iloc[-1]['Signal_Line']:
+    elif recent['MACD'].iloc[-1] > recent['Signal_Line'].iloc[-1]:
         return "MACD shows bullish momentum 🟢"
     else:
         return "MACD shows bearish momentum 🔴"
@@ -87,17 +122,12 @@ def analyze_volume(df, ma_period=20, spike_multiplier=1.5):
     Analyzes the most recent volume against its moving average.
     A price move on high volume is more significant than one on low volume.
     """
-    df_copy = df.copy()
-    volume_ma_col = f'volume_ma_{ma_period}'
-    df_copy[volume_ma_col] = df_copy['volume'].rolling(window=ma_period).mean()
-    
-    recent = df_copy.iloc[-1]
+    volume_ma = df['volume'].rolling(window=ma_period).mean().iloc[-1]
     
-    if pd.isna(recent[volume_ma_col]):
+    if pd.isna(volume_ma):
         return "Volume (Not enough data)"
         
-    volume = recent['volume']
-    volume_ma = recent[volume_ma_col]
+    volume = df['volume'].iloc[-1]
     
     if volume > volume_ma * spike_multiplier:
         return f"High Volume Spike ({volume/volume_ma:.1f}x average) 🟢"
@@ -106,6 +136,16 @@ def analyze_volume(df, ma_period=20, spike_multiplier=1.5):
     else:
         return "Below Average Volume 🔴"
 
+def calculate_adx(df, adx_period=14):
+    """
+    Calculate the ADX with its directional indicators from OHLC data.
+
+    Returns:
+    - DataFrame with 'ADX', 'DMP' (+DI) and 'DMN' (-DI) columns, or None when
+      there is not enough data.
+    """
+    return calculate_dmi(df['high'], df['low'], df['close'], period=adx_period)
+
 def analyze_market_regime(df, adx_period=14):
     """
     Determines if the market is trending or ranging using the ADX.
@@ -113,27 +153,15 @@ def analyze_market_regime(df, adx_period=14):
     - ADX < 20: Ranging market (weak or no trend)
     - Direction is determined by comparing DMP and DMN lines.
     """
-    df_copy = df.copy()
-    
-    df_copy.ta.adx(
-        high=df_copy['high'], 
-        low=df_copy['low'],
-        close=df_copy['close'],
-        length=adx_period, 
-        append=True
-    )
-    
-    adx_col = f'ADX_{adx_period}'
-    dmp_col = f'DMP_{adx_period}' 
-    dmn_col = f'DMN_{adx_period}' 
+    adx = calculate_adx(df, adx_period=adx_period)
     
     # Handle cases where there isn't enough data
-    if adx_col not in df_copy.columns or df_copy[adx_col].isna().all():
+    if adx is None or 'ADX' not in adx.columns or adx['ADX'].isna().all():
         return "Regime (Not enough data)"
         
-    recent_adx = df_copy[adx_col].iloc[-1]
-    recent_dmp = df_copy[dmp_col].iloc[-1]
-    recent_dmn = df_copy[dmn_col].iloc[-1]
+    recent_adx = adx['ADX'].iloc[-1]
+    recent_dmp = adx['DMP'].iloc[-1]
+    recent_dmn = adx['DMN'].iloc[-1]
     
     if recent_adx > 25:
         if recent_dmp > recent_dmn:
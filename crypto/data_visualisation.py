@@ -1,8 +1,10 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 
 def plot_crypto_indicators(df, last_n_days=None, savepath="crypto_indicators.png"):
+    # matplotlib is slow to import, so it is only loaded when a chart is drawn
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
+
     # Use dark background
     plt.style.use('dark_background')
 
@@ -1,75 +1,72 @@
 import requests
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta, timezone
 import csv
 import os
 import logging
+from .coingecko_client import get_client
 
 logging.basicConfig(level=logging.INFO,
                     format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
-BASE_URL = "https://api.coingecko.com/api/v3"
+def current_price_params(ids):
+    """Query parameters for the /simple/price endpoint (ids may be comma-separated)."""
+    return {
+        'ids': ids,
+        'vs_currencies': 'usd',
+        'include_market_cap': 'true',
+        'include_24hr_vol': 'true',
+        'include_24hr_change': 'true',            
+    }
+
+def parse_current_data(id, symbol, price_data, global_data):
+    """Build the current-data dict from /simple/price and /global payloads."""
+    current_price = price_data.get('usd', 0)
+    usd_market_cap = price_data.get('usd_market_cap', 0)
+    usd_24h_vol = price_data.get('usd_24h_vol', 0)
+    usd_24h_change = price_data.get('usd_24h_change', 0)
+    current_btc_dominance = global_data.get('market_cap_percentage', {}).get(symbol, 0)
+
+    return {
+        'cryptocurrency': id,
+        'symbol': symbol,
+        'current_price': current_price,
+        'current_dominance': round(current_btc_dominance, 2),
+        'usd_market_cap': round(usd_market_cap, 2),
+        'usd_24h_vol': round(usd_24h_vol, 2),
+        'usd_24h_change': round(usd_24h_change, 2)
+    }
 
-def get_current_price_and_dominance(id='bitcoin', symbol='btc'):
+def get_current_price_and_dominance(id='bitcoin', symbol='btc', client=None):
     """Get current Bitcoin price and market dominance"""
+    client = client or get_client()
     try:
         # Get Bitcoin price
-        price_url = f"{BASE_URL}/simple/price"
-        price_params = {
-            'ids': id,
-            'vs_currencies': 'usd',
-            'include_market_cap': 'true',
-            'include_24hr_vol': 'true',
-            'include_24hr_change': 'true',            
-        }
-        
-        price_response = requests.get(price_url, params=price_params)
-        price_response.raise_for_status()
-        price_data = price_response.json()[id]
+        price_data = client.get_json("/simple/price", params=current_price_params(id))[id]
         
         # Get global market data for dominance
-        global_url = f"{BASE_URL}/global"
-        global_response = requests.get(global_url)
-        global_response.raise_for_status()
-        global_data = global_response.json()['data']
-        
-        current_price = price_data.get('usd', 0)
-        usd_market_cap = price_data.get('usd_market_cap', 0)
-        usd_24h_vol = price_data.get('usd_24h_vol', 0)
-        usd_24h_change = price_data.get('usd_24h_change', 0)
-        current_btc_dominance = global_data.get('market_cap_percentage', {}).get(symbol, 0)
-
-        data={
-            'cryptocurrency': id,
-            'symbol': symbol,
-            'current_price': current_price,
-            'current_dominance': round(current_btc_dominance, 2),
-            'usd_market_cap': round(usd_market_cap, 2),
-            'usd_24h_vol': round(usd_24h_vol, 2),
-            'usd_24h_change': round(usd_24h_change, 2)
-        }
+        global_data = client.get_json("/global")['data']
 
-        return data
+        return parse_current_data(id, symbol, price_data, global_data)
 
     except requests.RequestException as e:
         logger.error(f"Error fetching current data: {e}")
         return None
     
-def get_historical_price_data(days=300):
-    """Get historical Bitcoin price and volume data."""
+def get_historical_price_data(days=300, coin_id='bitcoin', client=None):
+    """Get historical price and volume data for a coin (Bitcoin by default)."""
+    client = client or get_client()
     try:
-        url = f"{BASE_URL}/coins/bitcoin/market_chart"
         params = {
             'vs_currency': 'usd',
             'days': days, 
             'interval': 'daily'
         }
         
-        response = requests.get(url, params=params)
-        response.raise_for_status() # Raises an exception for bad status codes (4xx or 5xx)
-        
-        data = response.json()
+        # Raises an exception for bad status codes (4xx or 5xx) once retries are exhausted
+        data = client.get_json(f"/coins/{coin_id}/market_chart", params=params)
         
         # 1. Extract both prices and total_volumes
         prices = data['prices']
@@ -101,22 +98,19 @@ def get_historical_price_data(days=300):
         logger.error(f"Error fetching historical data: {e}")
         return None
 
-def get_historical_ohlc_data(coin_id='bitcoin', days=300):
+def get_historical_ohlc_data(coin_id='bitcoin', days=300, client=None):
     """
     Get historical Open, High, Low, Close (OHLC) data for a specific coin.
     This function provides the daily high and low prices.
     """
+    client = client or get_client()
     try:
-        url = f"{BASE_URL}/coins/{coin_id}/ohlc"
         params = {
             'vs_currency': 'usd',
             'days': days,
         }
         
-        response = requests.get(url, params=params)
-        response.raise_for_status()  
-        
-        data = response.json()
+        data = client.get_json(f"/coins/{coin_id}/ohlc", params=params)
         
         df = pd.DataFrame(data, columns=['timestamp', 'open', 'high', 'low', 'close'])
         
@@ -136,6 +130,29 @@ def get_historical_ohlc_data(coin_id='bitcoin', days=300):
         logger.error(f"An unexpected error occurred: {e}")
         return None
 
+SNAPSHOT_FIELDS = [
+    'date',
+    'current_price',
+    'dominance_percentage',
+    'market_cap_usd',
+    '24h_volume_usd',
+    '24h_change_percentage'
+]
+
+def snapshot_row(data):
+    """
+    Builds a snapshot row (as stored in btc_data.csv) from the dict returned by
+    `get_current_price_and_dominance`, timestamped with the current time.
+    """
+    return {
+        'date': datetime.now(timezone(timedelta(hours=2))).strftime('%Y-%m-%d %H:%M:%S'),
+        'current_price': round(data.get('current_price', 0), 2),
+        'dominance_percentage': round(data.get('current_dominance', 0), 2),
+        'market_cap_usd': round(data.get('usd_market_cap', 0), 2),
+        '24h_volume_usd': round(data.get('usd_24h_vol', 0), 2),
+        '24h_change_percentage': round(data.get('usd_24h_change', 0), 2)
+    }
+
 def save_data_to_csv(filename, data):
     """
     Appends a new row of Bitcoin data to a CSV file.
@@ -146,24 +163,10 @@ def save_data_to_csv(filename, data):
         data (dict): A dictionary containing the data to save.
     """
     # Define the headers for our CSV file
-    fieldnames = [
-        'date',
-        'current_price',
-        'dominance_percentage',
-        'market_cap_usd',
-        '24h_volume_usd',
-        '24h_change_percentage'
-    ]
+    fieldnames = SNAPSHOT_FIELDS
     
     # Prepare the data row as a dictionary
-    data_row = {
-        'date': datetime.now(timezone(timedelta(hours=2))).strftime('%Y-%m-%d %H:%M:%S'),
-        'current_price': round(data.get('current_price', 0), 2),
-        'dominance_percentage': round(data.get('current_dominance', 0), 2),
-        'market_cap_usd': round(data.get('usd_market_cap', 0), 2),
-        '24h_volume_usd': round(data.get('usd_24h_vol', 0), 2),
-        '24h_change_percentage': round(data.get('usd_24h_change', 0), 2)
-    }
+    data_row = snapshot_row(data)
     
     try:
         # Check if the file already exists to decide if we need to write headers
@@ -188,21 +191,48 @@ def save_data_to_csv(filename, data):
         logger.error(f"An unexpected error occurred: {e}")
 
 
-def merge_dataframes(btc_data: pd.DataFrame, historical_data: pd.DataFrame) -> pd.DataFrame:
-    btc_data['date'] = pd.to_datetime(btc_data['date'])
-    historical_data['date'] = pd.to_datetime(historical_data['date'])
+def merge_dataframes(btc_data: pd.DataFrame, historical_data: pd.DataFrame, tolerance_days: int = 0) -> pd.DataFrame:
+    """
+    Joins the daily snapshot columns (dominance, market cap, 24h change) onto the
+    price history by calendar day and replaces the last price with the latest
+    snapshot price.
+
+    Days are aligned as sorted `datetime64[D]` arrays with a binary search, so
+    the join is O(n log m) without object-dtype columns. Neither input is
+    modified. When several snapshots fall on the same day, the latest one wins.
+
+    Args:
+        btc_data (pd.DataFrame): Snapshots with 'date', 'current_price',
+            'dominance_percentage', 'market_cap_usd' and '24h_change_percentage'.
+        historical_data (pd.DataFrame): Daily price history with a 'date' column.
+        tolerance_days (int): How many days a snapshot may be carried forward to
+            fill days without one (0 = exact day match only).
+
+    Returns:
+        pd.DataFrame: A new DataFrame with the snapshot columns added.
+    """
+    snapshot_columns = ['dominance_percentage', 'market_cap_usd', '24h_change_percentage']
+
+    snapshot_times = pd.to_datetime(btc_data['date']).to_numpy()
+    order = np.argsort(snapshot_times, kind='stable')
+    snapshot_days = snapshot_times[order].astype('datetime64[D]')
+
+    history_dates = pd.to_datetime(historical_data['date'])
+    history_days = history_dates.to_numpy().astype('datetime64[D]')
+
+    # Index of the latest snapshot taken on or before each history day
+    positions = np.searchsorted(snapshot_days, history_days, side='right') - 1
+    valid = positions >= 0
+    lag = np.full(len(history_days), np.iinfo(np.int64).max)
+    lag[valid] = (history_days[valid] - snapshot_days[positions[valid]]).astype(np.int64)
+    matched = valid & (lag <= tolerance_days)
+    source_rows = order[np.where(matched, positions, 0)]
 
-    # Normalize both to just date (remove time part)
-    btc_data['date_only'] = btc_data['date'].dt.date
-    historical_data['date_only'] = historical_data['date'].dt.date
+    merged_df = historical_data.assign(date=history_dates)
+    for column in snapshot_columns:
+        values = btc_data[column].to_numpy()[source_rows]
+        merged_df[column] = pd.Series(values, index=merged_df.index).where(matched)
 
-    # Merge the two based on date_only
-    merged_df = historical_data.merge(
-        btc_data[['date_only', 'dominance_percentage', 'market_cap_usd', '24h_change_percentage']],
-        on='date_only',
-        how='left'
-    )
-    merged_df.loc[merged_df.index[-1], 'price'] = btc_data['current_price'].iloc[-1]
-    merged_df.drop(columns='date_only', inplace=True)
+    merged_df.loc[merged_df.index[-1], 'price'] = btc_data['current_price'].to_numpy()[order[-1]]
 
     return merged_df
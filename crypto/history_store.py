@@ -0,0 +1,154 @@
+import logging
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from .get_btc_data import get_historical_price_data, get_historical_ohlc_data
+from .storage import read_table, write_table, table_exists
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# The /ohlc endpoint only accepts these values; candle size depends on the range.
+OHLC_DAY_OPTIONS = (1, 7, 14, 30, 90, 180, 365)
+
+
+def _ohlc_granularity(days):
+    """Candle size CoinGecko uses for a given `days` value (30m, 4h or 4d)."""
+    if days <= 2:
+        return '30m'
+    if days <= 30:
+        return '4h'
+    return '4d'
+
+
+class HistoryStore:
+    """
+    A local store of time-indexed bars kept on disk.
+
+    Rows are keyed by `key`; upserting newer rows replaces existing rows with
+    the same key, so a refetched partial bar overwrites the stale one.
+    """
+
+    def __init__(self, path, key='date', backend='csv'):
+        self.path = path
+        self.key = key
+        self.backend = backend
+
+    def load(self):
+        """Returns the stored bars sorted by key, or None if nothing is stored yet."""
+        if not table_exists(self.path, self.backend):
+            return None
+        df = read_table(self.path, backend=self.backend)
+        if df.empty:
+            return None
+        df[self.key] = pd.to_datetime(df[self.key])
+        return df.sort_values(self.key).reset_index(drop=True)
+
+    def save(self, df):
+        write_table(df, self.path, backend=self.backend)
+
+    def upsert(self, new_rows, keep_since=None):
+        """
+        Merges `new_rows` into the store and persists the result.
+
+        Args:
+            new_rows (pd.DataFrame): Bars to insert; they win over stored bars with the same key.
+            keep_since: Optional lower bound; older bars are dropped from the store.
+
+        Returns:
+            pd.DataFrame: The full merged history.
+        """
+        new_rows = new_rows.copy()
+        new_rows[self.key] = pd.to_datetime(new_rows[self.key])
+
+        stored = self.load()
+        merged = new_rows if stored is None else pd.concat([stored, new_rows], ignore_index=True)
+        merged = (
+            merged.drop_duplicates(subset=self.key, keep='last')
+            .sort_values(self.key)
+            .reset_index(drop=True)
+        )
+        if keep_since is not None:
+            merged = merged[merged[self.key] >= keep_since].reset_index(drop=True)
+
+        self.save(merged)
+        return merged
+
+
+def sync_historical_price_data(store, coin_id='bitcoin', days=300, client=None, today=None):
+    """
+    Brings the stored daily price/volume history up to date, fetching only the
+    days missing since the last stored bar.
+
+    On the first run the full `days` window is fetched. Afterwards the window
+    starts at the last stored bar, which was partial (intraday) when it was
+    written, so it is refetched and replaced. The "drop the second-to-last
+    partial row" correction is applied by `get_historical_price_data` to each
+    fetched window before it is merged.
+
+    Args:
+        store (HistoryStore): Store holding this coin's daily bars.
+        coin_id (str): CoinGecko coin id.
+        days (int): History window to fetch when the store is empty.
+        client (CoinGeckoClient): Optional client.
+        today (datetime.date): Current UTC date (mainly for tests).
+
+    Returns:
+        pd.DataFrame: The full stored history in the same layout as
+                      `get_historical_price_data`, or None if the fetch failed.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    stored = store.load()
+
+    fetch_days = days
+    if stored is not None:
+        last_date = stored[store.key].iloc[-1].date()
+        # +1 to refetch the partial last bar, +1 because the correction drops a row
+        fetch_days = max((today - last_date).days, 0) + 2
+
+    logger.info(f"Syncing {coin_id} price history: fetching {fetch_days} day(s).")
+    fresh = get_historical_price_data(days=fetch_days, coin_id=coin_id, client=client)
+    if fresh is None:
+        return None
+
+    merged = store.upsert(fresh)
+    merged['date'] = merged['date'].dt.date
+    return merged
+
+
+def sync_ohlc_data(store, coin_id='bitcoin', days=30, client=None, now=None):
+    """
+    Brings the stored OHLC candles up to date, fetching the smallest range that
+    covers the gap while keeping the same candle size as a full `days` request.
+
+    Args:
+        store (HistoryStore): Store holding this coin's OHLC candles.
+        coin_id (str): CoinGecko coin id.
+        days (int): Window of candles to keep.
+        client (CoinGeckoClient): Optional client.
+        now (pd.Timestamp): Current UTC time (mainly for tests).
+
+    Returns:
+        pd.DataFrame: The last `days` of candles, or None if the fetch failed.
+    """
+    now = now or pd.Timestamp.now(tz='UTC').tz_localize(None)
+    stored = store.load()
+
+    fetch_days = days
+    if stored is not None:
+        missing_days = (now - stored[store.key].iloc[-1]) / pd.Timedelta(days=1)
+        candidates = [
+            d for d in OHLC_DAY_OPTIONS
+            if d <= days and d >= missing_days + 1 and _ohlc_granularity(d) == _ohlc_granularity(days)
+        ]
+        if candidates:
+            fetch_days = candidates[0]
+
+    logger.info(f"Syncing {coin_id} OHLC data: fetching {fetch_days} day(s).")
+    fresh = get_historical_ohlc_data(coin_id=coin_id, days=fetch_days, client=client)
+    if fresh is None:
+        return None
+
+    return store.upsert(fresh, keep_since=now - pd.Timedelta(days=days))
@@ -0,0 +1,454 @@
+import sys
+import json
+import math
+import logging
+from collections import deque
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+NAN = float('nan')
+_EPSILON = sys.float_info.epsilon
+
+
+def _round2(value):
+    """Round the same way pandas' Series.round(2) does (numpy rounding)."""
+    return float(np.round(np.float64(value), 2))
+
+
+def _is_negative(value):
+    return math.copysign(1.0, value) < 0
+
+
+class RollingMean:
+    """
+    O(1) rolling mean over a fixed window.
+
+    Mirrors pandas' `rolling(window).mean()` arithmetic (Kahan-compensated
+    running sum, remove-then-add) so results are bit-for-bit identical.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.nobs = 0
+        self.sum_x = 0.0
+        self.neg_ct = 0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.num_consecutive_same_value = 0
+        self.prev_value = NAN
+
+    def _add(self, val):
+        if math.isnan(val):
+            return
+        self.nobs += 1
+        y = val - self.compensation_add
+        t = self.sum_x + y
+        self.compensation_add = t - self.sum_x - y
+        self.sum_x = t
+        if _is_negative(val):
+            self.neg_ct += 1
+        if val == self.prev_value:
+            self.num_consecutive_same_value += 1
+        else:
+            self.num_consecutive_same_value = 1
+        self.prev_value = val
+
+    def _remove(self, val):
+        if math.isnan(val):
+            return
+        self.nobs -= 1
+        y = -val - self.compensation_remove
+        t = self.sum_x + y
+        self.compensation_remove = t - self.sum_x - y
+        self.sum_x = t
+        if _is_negative(val):
+            self.neg_ct -= 1
+
+    def update(self, val):
+        """Push one value and return the mean of the current window."""
+        val = float(val)
+        if len(self.values) == self.window:
+            self._remove(self.values.popleft())
+        self._add(val)
+        self.values.append(val)
+        return self.value
+
+    @property
+    def value(self):
+        if self.nobs < self.window or self.nobs == 0:
+            return NAN
+        result = self.sum_x / self.nobs
+        if self.num_consecutive_same_value >= self.nobs:
+            result = self.prev_value
+        elif self.neg_ct == 0 and result < 0:
+            result = 0.0
+        elif self.neg_ct == self.nobs and result > 0:
+            result = 0.0
+        return result
+
+    def to_dict(self):
+        return {
+            'window': self.window,
+            'values': list(self.values),
+            'nobs': self.nobs,
+            'sum_x': self.sum_x,
+            'neg_ct': self.neg_ct,
+            'compensation_add': self.compensation_add,
+            'compensation_remove': self.compensation_remove,
+            'num_consecutive_same_value': self.num_consecutive_same_value,
+            'prev_value': self.prev_value,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls(state['window'])
+        obj.__dict__.update(state)
+        obj.values = deque(state['values'])
+        return obj
+
+
+class RollingStd:
+    """
+    O(1) rolling sample standard deviation (ddof=1) using Welford accumulators.
+
+    Mirrors pandas' `rolling(window).std()` arithmetic.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.nobs = 0
+        self.mean_x = 0.0
+        self.ssqdm_x = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.num_consecutive_same_value = 0
+        self.prev_value = NAN
+
+    def _add(self, val):
+        if math.isnan(val):
+            return
+        if val == self.prev_value:
+            self.num_consecutive_same_value += 1
+        else:
+            self.num_consecutive_same_value = 1
+        self.prev_value = val
+
+        self.nobs += 1
+        prev_mean = self.mean_x - self.compensation_add
+        y = val - self.compensation_add
+        t = y - self.mean_x
+        self.compensation_add = t + self.mean_x - y
+        self.mean_x += t / self.nobs
+        self.ssqdm_x += (val - prev_mean) * (val - self.mean_x)
+
+    def _remove(self, val):
+        if math.isnan(val):
+            return
+        self.nobs -= 1
+        if self.nobs:
+            prev_mean = self.mean_x - self.compensation_remove
+            y = val - self.compensation_remove
+            t = y - self.mean_x
+            self.compensation_remove = t + self.mean_x - y
+            self.mean_x -= t / self.nobs
+            self.ssqdm_x -= (val - prev_mean) * (val - self.mean_x)
+        else:
+            self.mean_x = 0.0
+            self.ssqdm_x = 0.0
+
+    def update(self, val):
+        """Push one value and return the standard deviation of the current window."""
+        val = float(val)
+        if len(self.values) == self.window:
+            self._remove(self.values.popleft())
+        self._add(val)
+        self.values.append(val)
+        return self.value
+
+    @property
+    def value(self):
+        if self.nobs < self.window or self.nobs <= 1:
+            return NAN
+        if self.num_consecutive_same_value >= self.nobs:
+            return 0.0
+        variance = self.ssqdm_x / (self.nobs - 1)
+        return math.sqrt(variance) if variance > 0 else 0.0
+
+    def to_dict(self):
+        return {
+            'window': self.window,
+            'values': list(self.values),
+            'nobs': self.nobs,
+            'mean_x': self.mean_x,
+            'ssqdm_x': self.ssqdm_x,
+            'compensation_add': self.compensation_add,
+            'compensation_remove': self.compensation_remove,
+            'num_consecutive_same_value': self.num_consecutive_same_value,
+            'prev_value': self.prev_value,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls(state['window'])
+        obj.__dict__.update(state)
+        obj.values = deque(state['values'])
+        return obj
+
+
+class EwmMean:
+    """
+    O(1) exponentially weighted mean.
+
+    Mirrors pandas' `ewm(...).mean()` for both `adjust=False` (used by MACD)
+    and `adjust=True` (Wilder's smoothing as used by ADX).
+    """
+
+    def __init__(self, span=None, alpha=None, adjust=False, min_periods=0):
+        if (span is None) == (alpha is None):
+            raise ValueError("Exactly one of span or alpha must be provided.")
+        # pandas converts everything to a centre of mass before computing alpha
+        com = (span - 1) / 2.0 if span is not None else 1.0 / alpha - 1.0
+        self.alpha = 1.0 / (1.0 + com)
+        self.adjust = adjust
+        self.min_periods = max(int(min_periods), 1)
+        self.weighted = NAN
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, val):
+        """Push one value and return the current exponentially weighted mean."""
+        cur = float(val)
+        is_observation = not math.isnan(cur)
+        self.nobs += int(is_observation)
+        new_wt = 1.0 if self.adjust else self.alpha
+
+        if not math.isnan(self.weighted):
+            self.old_wt *= 1.0 - self.alpha
+            if is_observation:
+                if self.weighted != cur:
+                    self.weighted = (self.old_wt * self.weighted + new_wt * cur) / (self.old_wt + new_wt)
+                if self.adjust:
+                    self.old_wt += new_wt
+                else:
+                    self.old_wt = 1.0
+        elif is_observation:
+            self.weighted = cur
+
+        return self.value
+
+    @property
+    def value(self):
+        return self.weighted if self.nobs >= self.min_periods else NAN
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls.__new__(cls)
+        obj.__dict__.update(state)
+        return obj
+
+
+class IndicatorEngine:
+    """
+    Stateful indicator engine that updates MA, RSI, MACD and Bollinger Bands
+    from one new bar in O(1).
+
+    The outputs are identical to `calculate_moving_averages`, `calculate_rsi`,
+    `calculate_macd` and `calculate_bollinger_bands` run over the full history,
+    including their intermediate rounding.
+    """
+
+    def __init__(self, rsi_period=14, fast=12, slow=26, signal=9,
+                 bollinger_window=20, num_std_dev=2):
+        self.num_std_dev = num_std_dev
+        self.prev_price = NAN
+        self.ma50 = RollingMean(50)
+        self.ma200 = RollingMean(200)
+        self.avg_gain = RollingMean(rsi_period)
+        self.avg_loss = RollingMean(rsi_period)
+        self.ema_fast = EwmMean(span=fast)
+        self.ema_slow = EwmMean(span=slow)
+        self.signal_line = EwmMean(span=signal)
+        self.bollinger_mean = RollingMean(bollinger_window)
+        self.bollinger_std = RollingStd(bollinger_window)
+
+    def update(self, price):
+        """
+        Feeds one new closing price into the engine.
+
+        Args:
+            price (float): The latest bar's price.
+
+        Returns:
+            dict: Indicator values for this bar, keyed by the same column names
+                  the batch functions in `crypto.calculations` produce.
+        """
+        price = float(price)
+
+        # RSI gains/losses: the first bar has no delta and counts as 0 / -0.0,
+        # exactly like `delta.where(...)` does in the batch version.
+        delta = price - self.prev_price
+        gain = delta if delta > 0 else 0.0
+        loss = -(delta if delta < 0 else 0.0)
+        self.prev_price = price
+
+        avg_gain = np.float64(_round2(self.avg_gain.update(gain)))
+        avg_loss = np.float64(_round2(self.avg_loss.update(loss)))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = avg_gain / avg_loss
+            rsi = _round2(100 - (100 / (1 + rs)))
+
+        macd = _round2(_round2(self.ema_fast.update(price)) - _round2(self.ema_slow.update(price)))
+        signal_line = _round2(self.signal_line.update(macd))
+
+        mid = _round2(self.bollinger_mean.update(price))
+        std = _round2(self.bollinger_std.update(price))
+
+        return {
+            'MA50': _round2(self.ma50.update(price)),
+            'MA200': _round2(self.ma200.update(price)),
+            'MACD': macd,
+            'Signal_Line': signal_line,
+            'RSI': rsi,
+            'bollinger_mid': mid,
+            'bollinger_std': std,
+            'bollinger_upper': _round2(mid + self.num_std_dev * std),
+            'bollinger_lower': _round2(mid - self.num_std_dev * std),
+        }
+
+    def apply(self, df):
+        """
+        Feeds every row of `df['price']` through the engine and adds the
+        indicator columns to the DataFrame.
+
+        Args:
+            df (pd.DataFrame): Must contain a 'price' column.
+
+        Returns:
+            pd.DataFrame: The same DataFrame with indicator columns added.
+        """
+        if df is None or df.empty:
+            logger.warning("Input DataFrame is empty or None.")
+            return None
+
+        rows = [self.update(price) for price in df['price'].to_numpy()]
+        for column in rows[0]:
+            df[column] = [row[column] for row in rows]
+
+        return df
+
+    def to_dict(self):
+        return {
+            'num_std_dev': self.num_std_dev,
+            'prev_price': self.prev_price,
+            'ma50': self.ma50.to_dict(),
+            'ma200': self.ma200.to_dict(),
+            'avg_gain': self.avg_gain.to_dict(),
+            'avg_loss': self.avg_loss.to_dict(),
+            'ema_fast': self.ema_fast.to_dict(),
+            'ema_slow': self.ema_slow.to_dict(),
+            'signal_line': self.signal_line.to_dict(),
+            'bollinger_mean': self.bollinger_mean.to_dict(),
+            'bollinger_std': self.bollinger_std.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        engine = cls.__new__(cls)
+        engine.num_std_dev = state['num_std_dev']
+        engine.prev_price = state['prev_price']
+        for name in ('ma50', 'ma200', 'avg_gain', 'avg_loss', 'bollinger_mean'):
+            setattr(engine, name, RollingMean.from_dict(state[name]))
+        for name in ('ema_fast', 'ema_slow', 'signal_line'):
+            setattr(engine, name, EwmMean.from_dict(state[name]))
+        engine.bollinger_std = RollingStd.from_dict(state['bollinger_std'])
+        return engine
+
+    def save(self, path):
+        """Persists the engine state as JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        """Restores an engine previously written with `save`."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+class AdxEngine:
+    """
+    Stateful ADX/+DI/-DI that updates from one new OHLC bar in O(1).
+
+    Matches `calculate_dmi` run over the full history. The one exception is a
+    series containing a bar with high == low: the batch version then widens
+    every bar's range by machine epsilon, which cannot be known bar by bar, so
+    only the zero-width bar itself is widened here.
+    """
+
+    def __init__(self, period=14):
+        self.prev_high = NAN
+        self.prev_low = NAN
+        self.prev_close = NAN
+        self.atr = EwmMean(alpha=1.0 / period, adjust=True, min_periods=period)
+        self.pos = EwmMean(alpha=1.0 / period, adjust=True, min_periods=period)
+        self.neg = EwmMean(alpha=1.0 / period, adjust=True, min_periods=period)
+        self.adx = EwmMean(alpha=1.0 / period, adjust=True, min_periods=period)
+
+    def update(self, high, low, close):
+        """
+        Feeds one new bar into the engine.
+
+        Returns:
+            dict: 'ADX', 'DMP' and 'DMN' for this bar, as in `calculate_dmi`.
+        """
+        high, low, close = float(high), float(low), float(close)
+
+        high_low = high - low
+        if high_low == 0:
+            high_low += _EPSILON
+        true_range = NAN
+        if not math.isnan(self.prev_close):
+            true_range = max(abs(high_low), abs(high - self.prev_close), abs(self.prev_close - low))
+
+        up = high - self.prev_high
+        down = self.prev_low - low
+        pos = up if up > down and up > 0 else (NAN if math.isnan(up) else 0.0)
+        neg = down if down > up and down > 0 else (NAN if math.isnan(down) else 0.0)
+        pos = 0.0 if abs(pos) < _EPSILON else pos
+        neg = 0.0 if abs(neg) < _EPSILON else neg
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k = np.float64(100) / np.float64(self.atr.update(true_range))
+            dmp = float(k * self.pos.update(pos))
+            dmn = float(k * self.neg.update(neg))
+            dx = float(np.float64(100) * abs(dmp - dmn) / np.float64(dmp + dmn))
+
+        return {'ADX': self.adx.update(dx), 'DMP': dmp, 'DMN': dmn}
+
+    def to_dict(self):
+        return {
+            'prev_high': self.prev_high,
+            'prev_low': self.prev_low,
+            'prev_close': self.prev_close,
+            **{name: getattr(self, name).to_dict() for name in ('atr', 'pos', 'neg', 'adx')},
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        engine = cls.__new__(cls)
+        engine.prev_high = state['prev_high']
+        engine.prev_low = state['prev_low']
+        engine.prev_close = state['prev_close']
+        for name in ('atr', 'pos', 'neg', 'adx'):
+            setattr(engine, name, EwmMean.from_dict(state[name]))
+        return engine
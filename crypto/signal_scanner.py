@@ -0,0 +1,230 @@
+import numpy as np
+import pandas as pd
+
+MA_MESSAGES = {
+    'consistent_uptrend': "Consistent Uptrend (Golden Cross for {window} days) 🟢",
+    'consistent_downtrend': "Consistent Downtrend (Death Cross for {window} days) 🔴",
+    'potential_golden_cross': "MA50 just crossed above MA200 (Potential Golden Cross) 🟢",
+    'potential_death_cross': "MA50 just crossed below MA200 (Potential Death Cross) 🔴",
+    'converging': "MAs are converging (Unclear trend) ⚪",
+}
+
+MACD_MESSAGES = {
+    'bullish': "MACD shows bullish momentum 🟢",
+    'bearish': "MACD shows bearish momentum 🔴",
+}
+
+RSI_MESSAGES = {
+    'consistently_overbought': "RSI consistently overbought ({rsi:.2f}) 🔴",
+    'consistently_oversold': "RSI consistently oversold ({rsi:.2f}) 🟢",
+    'overbought': "RSI just entered overbought ({rsi:.2f}) 🔴",
+    'oversold': "RSI just entered oversold ({rsi:.2f}) 🟢",
+    'neutral': "RSI neutral range ({rsi:.2f}) ⚪",
+}
+
+BOLLINGER_MESSAGES = {
+    'consistently_above': "Price consistently above upper band ({window} days) → Overbought 🔴",
+    'consistently_below': "Price consistently below lower band ({window} days) → Oversold 🟢",
+    'above': "Price above upper band → Overbought 🔴",
+    'below': "Price below lower band → Oversold 🟢",
+    'within': "Price within Bollinger Bands (Normal) ⚪",
+}
+
+VOLUME_MESSAGES = {
+    'insufficient_data': "Volume (Not enough data)",
+    'spike': "High Volume Spike ({ratio:.1f}x average) 🟢",
+    'above_average': "Above Average Volume 🟢",
+    'below_average': "Below Average Volume 🔴",
+}
+
+REGIME_MESSAGES = {
+    'insufficient_data': "Regime (Not enough data)",
+    'strong_bullish': "Strong Bullish Trend (ADX: {adx:.1f}) 🟢",
+    'strong_bearish': "Strong Bearish Trend (ADX: {adx:.1f}) 🔴",
+    'ranging': "Sideways / Ranging Market (ADX: {adx:.1f}) ⚪",
+    'developing': "Neutral / Trend Developing (ADX: {adx:.1f}) ⚪",
+}
+
+
+def asset_table(frames):
+    """
+    Stacks per-asset DataFrames into one table with ('asset', 'indicator')
+    MultiIndex columns. Assets whose frame is None are left out.
+    """
+    frames = {asset: df for asset, df in frames.items() if df is not None}
+    if not frames:
+        return None
+    return pd.concat(frames, axis=1, names=['asset', 'indicator'])
+
+
+def _panel(table, indicator, assets):
+    """One indicator as a (time x asset) frame, NaN-filled for assets that lack it."""
+    if indicator not in table.columns.get_level_values('indicator'):
+        return pd.DataFrame(np.nan, index=table.index, columns=assets)
+    return table.xs(indicator, axis=1, level='indicator').reindex(columns=assets)
+
+
+def _select(conditions, choices, default):
+    return np.select(conditions, choices, default=default).astype(object)
+
+
+def _streak_states(upper_hits, lower_hits, last_upper, last_lower, window, names, default):
+    """Shared "N days in a row / just now / otherwise" classification."""
+    return _select(
+        [upper_hits == window, lower_hits == window, last_upper, last_lower],
+        names,
+        default,
+    )
+
+
+def scan_signals(indicators, adx=None, window=3, overbought=70, oversold=30,
+                 volume_ma_period=20, spike_multiplier=1.5):
+    """
+    Evaluates every technical-analysis rule for many assets at once.
+
+    The rules are the same as the analyze_* functions in `crypto.data_analysis`,
+    but each one is a vectorized boolean mask over all assets, and only the
+    last `window` rows are read.
+
+    Args:
+        indicators (pd.DataFrame): Precomputed indicator table with
+            ('asset', 'indicator') MultiIndex columns, as returned by
+            `calculate_indicators_batch` (plus 'volume' for the volume rule).
+        adx (pd.DataFrame): Optional ('asset', 'indicator') table with 'ADX',
+            'DMP' and 'DMN' columns for the market-regime rule.
+        window (int): Look-back for the MA, MACD, RSI and Bollinger rules.
+        overbought, oversold (float): RSI thresholds.
+        volume_ma_period (int): Volume moving-average period.
+        spike_multiplier (float): Volume/average ratio that counts as a spike.
+
+    Returns:
+        pd.DataFrame: One row per asset with the state of each rule and the
+                      values needed to describe it. Use `render_signals` to turn
+                      a row into the report text.
+    """
+    assets = indicators.columns.get_level_values('asset').unique()
+    recent = indicators.tail(window)
+
+    def panel(name):
+        return _panel(recent, name, assets).to_numpy(dtype=float)
+
+    ma50, ma200 = panel('MA50'), panel('MA200')
+    macd, signal_line = panel('MACD'), panel('Signal_Line')
+    rsi = panel('RSI')
+    price, upper, lower = panel('price'), panel('bollinger_upper'), panel('bollinger_lower')
+
+    signals = pd.DataFrame(index=assets)
+
+    # --- Moving averages ---
+    signals['ma_state'] = _streak_states(
+        (ma50 > ma200).sum(axis=0), (ma50 < ma200).sum(axis=0),
+        ma50[-1] > ma200[-1], ma50[-1] < ma200[-1], window,
+        ['consistent_uptrend', 'consistent_downtrend', 'potential_golden_cross', 'potential_death_cross'],
+        'converging',
+    )
+
+    # --- MACD crossovers inside the window ---
+    below, above = macd < signal_line, macd > signal_line
+    bullish = below[:-1] & above[1:]
+    bearish = above[:-1] & below[1:]
+    if pd.api.types.is_datetime64_any_dtype(recent.index):
+        days_ago = (recent.index[-1] - recent.index[1:]).days.to_numpy()
+    else:
+        days_ago = len(recent) - 2 - np.arange(len(recent) - 1)
+    crossed = bullish | bearish
+    counts = crossed.sum(axis=0)
+    # Transposed, so the crossovers come grouped by asset and oldest first
+    columns, rows = np.nonzero(crossed.T)
+    events = list(zip(
+        np.where(bullish[rows, columns], 'bullish', 'bearish').tolist(),
+        days_ago[rows].astype(int).tolist(),
+    ))
+    ends = np.cumsum(counts)
+    signals['macd_crossovers'] = [events[start:end] for start, end in zip(ends - counts, ends)]
+    signals['macd_state'] = _select(
+        [crossed.any(axis=0), macd[-1] > signal_line[-1]],
+        ['crossover', 'bullish'],
+        'bearish',
+    )
+
+    # --- RSI ---
+    signals['rsi'] = rsi[-1]
+    signals['rsi_state'] = _streak_states(
+        (rsi > overbought).sum(axis=0), (rsi < oversold).sum(axis=0),
+        rsi[-1] > overbought, rsi[-1] < oversold, window,
+        ['consistently_overbought', 'consistently_oversold', 'overbought', 'oversold'],
+        'neutral',
+    )
+
+    # --- Bollinger Bands ---
+    signals['bollinger_state'] = _streak_states(
+        (price > upper).sum(axis=0), (price < lower).sum(axis=0),
+        price[-1] > upper[-1], price[-1] < lower[-1], window,
+        ['consistently_above', 'consistently_below', 'above', 'below'],
+        'within',
+    )
+
+    # --- Volume against its moving average ---
+    volume_tail = _panel(indicators.tail(volume_ma_period), 'volume', assets)
+    volume = volume_tail.to_numpy(dtype=float)[-1] if len(volume_tail) else np.full(len(assets), np.nan)
+    volume_ma = volume_tail.mean().where(volume_tail.count() == volume_ma_period).to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        signals['volume_ratio'] = volume / volume_ma
+    signals['volume_state'] = _select(
+        [np.isnan(volume_ma), volume > volume_ma * spike_multiplier, volume > volume_ma],
+        ['insufficient_data', 'spike', 'above_average'],
+        'below_average',
+    )
+
+    # --- Market regime from the ADX ---
+    if adx is not None and len(adx):
+        has_data = _panel(adx, 'ADX', assets).notna().any().to_numpy()
+        last_adx, last_dmp, last_dmn = (
+            _panel(adx.tail(1), name, assets).to_numpy(dtype=float)[0]
+            for name in ('ADX', 'DMP', 'DMN')
+        )
+    else:
+        has_data = np.zeros(len(assets), dtype=bool)
+        last_adx = last_dmp = last_dmn = np.full(len(assets), np.nan)
+    signals['adx'] = last_adx
+    signals['dmp'] = last_dmp
+    signals['dmn'] = last_dmn
+    signals['regime_state'] = _select(
+        [~has_data, (last_adx > 25) & (last_dmp > last_dmn), last_adx > 25, last_adx < 20],
+        ['insufficient_data', 'strong_bullish', 'strong_bearish', 'ranging'],
+        'developing',
+    )
+
+    return signals
+
+
+def render_signals(signal, window=3):
+    """
+    Renders one asset's row from `scan_signals` as the report lines produced by
+    the analyze_* functions, in the same order as the daily report.
+
+    Args:
+        signal (pd.Series): One row of the `scan_signals` result.
+        window (int): The window passed to `scan_signals`.
+
+    Returns:
+        list[str]: One line per rule.
+    """
+    if signal['macd_state'] == 'crossover':
+        crossover_lines = [
+            f"Bullish crossover {days_ago} days ago 🟢" if kind == 'bullish'
+            else f"Bearish crossover {days_ago} days ago 🔴"
+            for kind, days_ago in signal['macd_crossovers']
+        ]
+        macd_line = "MACD Crossovers Detected:\n" + ",\n".join(crossover_lines)
+    else:
+        macd_line = MACD_MESSAGES[signal['macd_state']]
+
+    return [
+        MA_MESSAGES[signal['ma_state']].format(window=window),
+        macd_line,
+        RSI_MESSAGES[signal['rsi_state']].format(rsi=signal['rsi']),
+        BOLLINGER_MESSAGES[signal['bollinger_state']].format(window=window),
+        VOLUME_MESSAGES[signal['volume_state']].format(ratio=signal['volume_ratio']),
+        REGIME_MESSAGES[signal['regime_state']].format(adx=signal['adx']),
+    ]
@@ -0,0 +1,125 @@
+import os
+import sqlite3
+import logging
+from contextlib import closing
+
+import pandas as pd
+
+from .get_btc_data import SNAPSHOT_FIELDS, snapshot_row
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+_VALUE_FIELDS = SNAPSHOT_FIELDS[1:]
+_COLUMNS_SQL = ", ".join(f'"{field}"' for field in SNAPSHOT_FIELDS)
+
+
+class SnapshotStore:
+    """
+    An embedded SQLite time-series store for the current-price snapshots that
+    used to be appended to btc_data.csv.
+
+    Snapshots are appended as they arrive and indexed by day, so range queries
+    only touch the requested days. `compact` keeps the latest snapshot per day.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    day TEXT NOT NULL,
+                    "date" TEXT NOT NULL,
+                    {", ".join(f'"{field}" REAL' for field in _VALUE_FIELDS)}
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_day_date ON snapshots (day, \"date\")")
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def append(self, data):
+        """
+        Appends one snapshot built from the dict returned by
+        `get_current_price_and_dominance`.
+        """
+        self.append_rows([snapshot_row(data)])
+
+    def append_rows(self, rows):
+        """Appends snapshot rows that already have the btc_data.csv layout."""
+        values = [
+            (str(row['date'])[:10], str(row['date']), *(row.get(field) for field in _VALUE_FIELDS))
+            for row in rows
+        ]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                f"INSERT INTO snapshots (day, {_COLUMNS_SQL}) VALUES ({', '.join('?' * (len(SNAPSHOT_FIELDS) + 1))})",
+                values,
+            )
+
+    def import_csv(self, filename):
+        """Imports an existing btc_data.csv file. Returns the number of rows imported."""
+        df = pd.read_csv(filename, index_col=False)
+        df = df.reindex(columns=SNAPSHOT_FIELDS)
+        df = df.astype(object).where(df.notna(), None)
+        self.append_rows(df.to_dict('records'))
+        return len(df)
+
+    def compact(self):
+        """Deletes every snapshot that is not the latest one of its day. Returns the number removed."""
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                """
+                DELETE FROM snapshots
+                WHERE EXISTS (
+                    SELECT 1 FROM snapshots AS t
+                    WHERE t.day = snapshots.day
+                      AND (t."date" > snapshots."date"
+                           OR (t."date" = snapshots."date" AND t.rowid > snapshots.rowid))
+                )
+                """
+            )
+            removed = cursor.rowcount
+        if removed:
+            logger.info(f"Compacted {removed} duplicate same-day snapshot(s).")
+        return removed
+
+    def count(self):
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+
+    def query(self, start=None, end=None):
+        """
+        Returns the latest snapshot for each day in [start, end] (inclusive).
+
+        Args:
+            start: First day to include (date, datetime or 'YYYY-MM-DD'); None for no lower bound.
+            end: Last day to include; None for no upper bound.
+
+        Returns:
+            pd.DataFrame: Snapshots in the btc_data.csv layout, ordered by date.
+        """
+        start = pd.Timestamp(start).strftime('%Y-%m-%d') if start is not None else '0000-00-00'
+        end = pd.Timestamp(end).strftime('%Y-%m-%d') if end is not None else '9999-99-99'
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"""
+                SELECT {_COLUMNS_SQL} FROM snapshots AS s
+                WHERE s.day BETWEEN ? AND ?
+                  AND s.rowid = (
+                    SELECT t.rowid FROM snapshots AS t
+                    WHERE t.day = s.day
+                    ORDER BY t."date" DESC, t.rowid DESC
+                    LIMIT 1
+                  )
+                ORDER BY s."date"
+                """,
+                (start, end),
+            ).fetchall()
+
+        return pd.DataFrame(rows, columns=SNAPSHOT_FIELDS)
@@ -0,0 +1,185 @@
+import os
+import json
+import uuid
+import shutil
+import logging
+import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+class CsvBackend:
+    """Plain CSV files, exactly as the scripts have always written them."""
+
+    def location(self, path):
+        return Path(path)
+
+    def exists(self, path):
+        return self.location(path).is_file()
+
+    def read(self, path, columns=None, mmap=True):
+        return pd.read_csv(self.location(path), index_col=False, usecols=columns)
+
+    def write(self, df, path):
+        location = self.location(path)
+        location.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(location, index=False)
+
+
+class NpyColumnBackend:
+    """
+    Typed columnar storage: one `.npy` file per column in a `<name>.cols`
+    directory next to the configured CSV path, plus a small schema file.
+
+    Reads memory-map the column files, so loading is zero-copy and only the
+    requested columns are touched. Values keep their binary dtype, so there is
+    no text parsing or float round-tripping. Missing values in text columns
+    are stored as empty strings and read back as NaN.
+
+    Each write goes to a fresh `<name>.cols.<id>` directory, and `<name>.cols`
+    is a symlink that is swapped to it in one step. The version it replaced is
+    kept until the next write, so a reader that resolved it just before the
+    swap can finish; a reader that is still slower retries on the new one.
+    Older versions are removed, so stale column files do not accumulate.
+    """
+
+    SCHEMA_FILE = "_schema.json"
+
+    def location(self, path):
+        return Path(path).with_suffix(".cols")
+
+    def exists(self, path):
+        return (self.location(path) / self.SCHEMA_FILE).is_file()
+
+    def read(self, path, columns=None, mmap=True):
+        try:
+            return self._read_version(self.location(path).resolve(), columns, mmap)
+        except FileNotFoundError:
+            # Two writes replaced the version while it was being read; the
+            # link now points to a complete one
+            return self._read_version(self.location(path).resolve(), columns, mmap)
+
+    def _read_version(self, location, columns, mmap):
+        # One resolved version directory, so a read never mixes two tables
+        with open(location / self.SCHEMA_FILE, 'r', encoding='utf-8') as f:
+            schema = json.load(f)
+
+        names = schema['columns'] if columns is None else [c for c in schema['columns'] if c in columns]
+        missing = set(columns or []) - set(names)
+        if missing:
+            raise KeyError(f"Columns not found in {location}: {sorted(missing)}")
+
+        data = {}
+        for index, name in enumerate(schema['columns']):
+            if name not in names:
+                continue
+            array = np.load(location / f"{index}.npy", mmap_mode='r' if mmap else None)
+            if array.dtype.kind == 'U':
+                # pandas holds strings as objects anyway, so this costs no extra copy
+                empty = array == ''
+                array = array.astype(object)
+                array[empty] = np.nan
+            data[name] = array
+        return pd.DataFrame(data, columns=names, copy=False)
+
+    def write(self, df, path):
+        location = self.location(path)
+        location.parent.mkdir(parents=True, exist_ok=True)
+        version = location.with_name(f"{location.name}.{uuid.uuid4().hex}")
+        version.mkdir()
+
+        for index, name in enumerate(df.columns):
+            values = df[name]
+            non_null = values.dropna()
+            if values.dtype != object:
+                array = values.to_numpy()
+            elif len(non_null) and isinstance(non_null.iloc[0], datetime.date):
+                # python date objects, as in the fetched historical 'date' column
+                array = pd.to_datetime(values).to_numpy()
+            else:
+                # fixed-width unicode keeps strings memory-mappable; astype(str)
+                # would turn missing values into 'nan' or 'None'
+                array = values.where(values.notna(), '').to_numpy().astype(str)
+            np.save(version / f"{index}.npy", array)
+
+        # Columns are stored by position so arbitrary column names are safe on disk
+        with open(version / self.SCHEMA_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'columns': [str(c) for c in df.columns]}, f)
+
+        previous = location.resolve() if location.is_symlink() else None
+        if location.is_dir() and previous is None:
+            # a table written before versioned directories; it cannot be swapped out in one step
+            shutil.rmtree(location)
+        link = version.with_name(f"{version.name}.link")
+        os.symlink(version.name, link)
+        os.replace(link, location)
+        if previous is not None:
+            self._remove_versions_before(location, previous)
+
+    @staticmethod
+    def _remove_versions_before(location, previous):
+        """Deletes the versions older than `previous`, the one just replaced."""
+        cutoff = previous.stat().st_mtime
+        for candidate in location.parent.glob(f"{location.name}.*"):
+            if candidate.is_symlink() or not candidate.is_dir() or candidate == previous:
+                continue
+            # a newer directory may be another writer's version in progress
+            if candidate.stat().st_mtime < cutoff:
+                shutil.rmtree(candidate, ignore_errors=True)
+
+
+BACKENDS = {
+    'csv': CsvBackend(),
+    'npy': NpyColumnBackend(),
+}
+
+
+def get_backend(name):
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown storage backend: {name}") from None
+
+
+def table_exists(path, backend='csv'):
+    """Whether a table is stored at `path` in the given backend or as a legacy CSV."""
+    return get_backend(backend).exists(path) or BACKENDS['csv'].exists(path)
+
+
+def read_table(path, columns=None, backend='csv', mmap=True):
+    """
+    Reads a table stored behind one of the configured data paths.
+
+    Falls back to the CSV file at `path` when the selected backend has not
+    written the table yet, so switching backends needs no migration step.
+
+    Args:
+        path (str | Path): The configured data path (e.g. HISTORICAL_DATA_PATH).
+        columns (list): Optional column projection.
+        backend (str): 'csv' or 'npy'.
+        mmap (bool): Memory-map columnar files instead of reading them into memory.
+
+    Returns:
+        pd.DataFrame: The stored table.
+
+    Raises:
+        FileNotFoundError: If nothing is stored at `path`.
+    """
+    store = get_backend(backend)
+    if not store.exists(path):
+        if not BACKENDS['csv'].exists(path):
+            raise FileNotFoundError(f"No table stored at {path}")
+        store = BACKENDS['csv']
+    return store.read(path, columns=columns, mmap=mmap)
+
+
+def write_table(df, path, backend='csv'):
+    """Writes `df` behind the configured data path using the given backend."""
+    get_backend(backend).write(df, path)
+    logger.info(f"Saved {len(df)} rows to {get_backend(backend).location(path)}")
@@ -1,18 +1,18 @@
 import datetime
-import pandas as pd
 import os
 import asyncio
 import logging
 from dotenv import load_dotenv
 
 import config.crypto_config as crypto_config
+import config.subscribers_config as subscribers_config
 from LLMs.utils import create_trading_prompt
 from telegram_service.bot import TelegramNotifier
-from crypto.data_analysis import (
-    analyze_bollinger, analyze_macd, analyze_moving_averages,
-    analyze_rsi, analyze_volume, analyze_market_regime
-)
+from telegram_service.subscribers import load_audiences, deliver
+from crypto.data_analysis import calculate_adx
+from crypto.signal_scanner import asset_table, scan_signals, render_signals
 from crypto.calculations import calculate_purchase_amount
+from crypto.storage import read_table
 from LLMs.factory import get_llm_instance
 
 logging.basicConfig(level=logging.INFO,
@@ -46,9 +46,14 @@ def save_message_to_daily_log(msg: str, log_directory: str):
         logger.error(f"Error: Could not write to file '{filename}'. Reason: {e}")
 
 # --- Main Asynchronous Logic ---
-async def main():
+async def main(chat_instance=None, notifier=None, schedule=None):
     """
     Main execution function to perform analysis and send notifications.
+
+    The LLM client and notifier are created here unless they are passed in,
+    e.g. by the scheduler daemon, which keeps them warm between runs.
+    `schedule` selects the subscribers on that custom schedule; None means
+    those on the default one.
     """
     # --- Setup ---
     load_dotenv(override=True)
@@ -56,19 +61,41 @@ async def main():
     BTC_BOT_TOKEN = os.getenv("BTC_BOT_TOKEN")
     TELEGRAM_USER_ID = int(os.getenv("TELEGRAM_USER_ID", "0"))
 
-    if not BTC_BOT_TOKEN or not TELEGRAM_USER_ID:
+    if not BTC_BOT_TOKEN:
         logger.error("Error: Telegram environment variables not set.")
         return
 
+    audiences = load_audiences(
+        subscribers_config.DB_PATH, "crypto_main", schedule,
+        default_chat_id=TELEGRAM_USER_ID, default_key="BTC",
+    )
+    # Only the BTC history is fetched so far: subscribers who didn't pick an
+    # asset, or picked one without a report yet, get the BTC report
+    btc_chat_ids = set(audiences.pop("BTC", []))
+    for asset, chat_ids in audiences.items():
+        if asset is not None and chat_ids:
+            logger.warning(f"No {asset} report yet; sending the BTC report to {len(chat_ids)} subscriber(s).")
+        btc_chat_ids.update(chat_ids)
+    audiences = {"BTC": sorted(btc_chat_ids)} if btc_chat_ids else {}
+    if not audiences:
+        logger.info("No subscribers for this run.")
+        return
+
     try:
         # --- Initialization ---
-        chat_instance = get_llm_instance(crypto_config)
-        notifier = TelegramNotifier(token=BTC_BOT_TOKEN)
+        chat_instance = chat_instance or get_llm_instance(crypto_config)
+        notifier = notifier or TelegramNotifier(
+            token=BTC_BOT_TOKEN, file_id_cache_path=crypto_config.TELEGRAM_FILE_ID_CACHE_PATH,
+        )
 
         # --- Load Data (with error handling) ---
         logger.info("Loading data...")
-        historical_data = pd.read_csv(crypto_config.HISTORICAL_DATA_PATH, index_col=False)
-        df_ohcl = pd.read_csv(crypto_config.OHLC_DATA_PATH, index_col=False)
+        historical_data = read_table(crypto_config.HISTORICAL_DATA_PATH, backend=crypto_config.STORAGE_BACKEND)
+        df_ohcl = read_table(
+            crypto_config.OHLC_DATA_PATH,
+            columns=['high', 'low', 'close'],
+            backend=crypto_config.STORAGE_BACKEND,
+        )
         logger.info("Data loaded successfully.")
 
     except FileNotFoundError as e:
@@ -78,53 +105,59 @@ async def main():
         logger.error(f"An error occurred during setup or data loading: {e}")
         return
         
-    # --- Perform Technical Analysis ---
-    logger.info("Performing technical analysis...")
-    analyses = [
-        analyze_moving_averages(historical_data, window=crypto_config.WINDOW),
-        analyze_macd(historical_data, window=crypto_config.WINDOW),
-        analyze_rsi(historical_data, window=crypto_config.WINDOW),
-        analyze_bollinger(historical_data, window=crypto_config.WINDOW),
-        analyze_volume(historical_data),
-        analyze_market_regime(df_ohcl)
-    ]
-    ta = "\n".join(analyses)
-    logger.info("Analysis complete.")
-
-    # --- LLM Interaction ---
-    logger.info("Generating LLM response...")
-    message = create_trading_prompt(
-        historical_data=historical_data,
-        ta=ta,
-        last_n_days=crypto_config.LAST_N_DAYS
-    )
-    response, usage = chat_instance.conv(message)
-    logger.info("LLM response received.")
-
-    # --- Final Calculations and Message Formatting ---
-    current_price = historical_data['price'].iloc[-1]
-    purchase_amount = calculate_purchase_amount(historical_data)
-    btc_dominance = historical_data['dominance_percentage'].iloc[-1]
-
-    final_message = (
-        f"Current Price: ${current_price:,.2f}\n"
-        f"Suggested Purchase: ${purchase_amount:,.2f}\n\n"
-        f"Technical Analysis Summary: \n{ta}\n"
-        f"BTC Dominance: {btc_dominance:.2f}%\n\n"
-        f"{response}\n\n"
-        f"LLM: {chat_instance.model_id}"
-    )
-    save_message_to_daily_log(final_message, "reports")
-
-    # --- Send Notifications (within the same async context) ---
+    async def render(asset):
+        # --- Perform Technical Analysis ---
+        logger.info("Performing technical analysis...")
+        signals = scan_signals(
+            asset_table({'BTC': historical_data}),
+            adx=asset_table({'BTC': calculate_adx(df_ohcl)}),
+            window=crypto_config.WINDOW,
+        )
+        ta = "\n".join(render_signals(signals.loc['BTC'], window=crypto_config.WINDOW))
+        logger.info("Analysis complete.")
+
+        # --- LLM Interaction ---
+        logger.info("Generating LLM response...")
+        message = create_trading_prompt(
+            historical_data=historical_data,
+            ta=ta,
+            last_n_days=crypto_config.LAST_N_DAYS,
+            columns=crypto_config.PROMPT_COLUMNS,
+            encoding=crypto_config.PROMPT_ENCODING,
+            full_rows=crypto_config.PROMPT_FULL_ROWS,
+            stride=crypto_config.PROMPT_STRIDE,
+            max_tokens=crypto_config.PROMPT_MAX_TOKENS,
+        )
+        response, usage = await chat_instance.aconv(message)
+        logger.info("LLM response received.")
+
+        # --- Final Calculations and Message Formatting ---
+        current_price = historical_data['price'].iloc[-1]
+        purchase_amount = calculate_purchase_amount(historical_data)
+        btc_dominance = historical_data['dominance_percentage'].iloc[-1]
+
+        final_message = (
+            f"Current Price: ${current_price:,.2f}\n"
+            f"Suggested Purchase: ${purchase_amount:,.2f}\n\n"
+            f"Technical Analysis Summary: \n{ta}\n"
+            f"BTC Dominance: {btc_dominance:.2f}%\n\n"
+            f"{response}\n\n"
+            f"LLM: {chat_instance.model_id}"
+        )
+        save_message_to_daily_log(final_message, "reports")
+        return final_message
+
+    async def send(report, chat_ids):
+        await notifier.broadcast_message(report, chat_ids)
+        await notifier.broadcast_photos(
+            [crypto_config.CRYPTO_INDICATORS_PATH],
+            caption="Crypto Indicators Chart",
+            chat_ids=chat_ids,
+        )
+
+    # --- Render each report once and send it to all its subscribers ---
     logger.info("Sending notifications to Telegram...")
-    # These two tasks will run sequentially.
-    await notifier.send_message(msg=final_message, chat_id=TELEGRAM_USER_ID)
-    await notifier.send_photo(
-        image_path=crypto_config.CRYPTO_INDICATORS_PATH,
-        caption="Crypto Indicators Chart",
-        chat_id=TELEGRAM_USER_ID
-    )
+    await deliver(audiences, render, send)
     logger.info("Notifications sent.")
 
 
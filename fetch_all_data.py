@@ -1,10 +1,4 @@
-from crypto.get_btc_data import (
-    get_historical_price_data,
-    get_current_price_and_dominance,
-    merge_dataframes,
-    save_data_to_csv,
-    get_historical_ohlc_data
-)
+from crypto.get_btc_data import merge_dataframes
 
 from crypto.calculations import (
     calculate_macd,
@@ -13,52 +7,76 @@ from crypto.calculations import (
     calculate_bollinger_bands
 )
 
+from crypto.async_fetch import fetch_all
+from crypto.storage import write_table
+from crypto.snapshot_store import SnapshotStore
 from crypto.data_visualisation import plot_crypto_indicators
 import config.crypto_config as crypto_config
 import os
 from dotenv import load_dotenv
 from telegram_service.bot import TelegramNotifier
 import asyncio
-import pandas as pd
 
 load_dotenv(override=True)
 
 BTC_BOT_TOKEN = os.getenv("BTC_BOT_TOKEN")
 TELEGRAM_USER_ID = int(os.getenv("TELEGRAM_USER_ID", "0"))
 
-notifier = TelegramNotifier(token=BTC_BOT_TOKEN)
-
-def notify_and_exit(message: str):
-    asyncio.run(notifier.send_message(msg=message, chat_id=TELEGRAM_USER_ID))
+async def notify_and_exit(notifier: TelegramNotifier, message: str):
+    await notifier.send_message(msg=message, chat_id=TELEGRAM_USER_ID)
     exit(1)
 
-historical_data = get_historical_price_data()
-if historical_data is not None:
-    historical_data = calculate_moving_averages(historical_data)
-    historical_data = calculate_macd(historical_data)
-    historical_data = calculate_rsi(historical_data)
-    historical_data = calculate_bollinger_bands(historical_data)        
-else:
-    notify_and_exit("Failed to fetch historical Bitcoin data.")
+async def main(notifier=None):
+    notifier = notifier or TelegramNotifier(token=BTC_BOT_TOKEN)
+
+    snapshots = SnapshotStore(crypto_config.SNAPSHOT_DB_PATH)
+    if snapshots.count() == 0 and os.path.isfile(crypto_config.BTC_DATA_PATH):
+        # One-off migration of the old append-only CSV log
+        snapshots.import_csv(crypto_config.BTC_DATA_PATH)
+
+    # All requests run concurrently; wall-clock time is roughly the slowest one.
+    # Only bars missing from the local history store are downloaded.
+    fetched = await fetch_all(
+        {'bitcoin': 'btc'},
+        history_days=300,
+        ohlc_days=30,
+        max_concurrency=crypto_config.FETCH_MAX_CONCURRENCY,
+        store_dir=crypto_config.HISTORY_STORE_DIR,
+        storage_backend=crypto_config.STORAGE_BACKEND,
+    )
+    historical_data = fetched['bitcoin']['historical']
+    current_data = fetched['bitcoin']['current']
+    ohcl_data = fetched['bitcoin']['ohlc']
+
+    if historical_data is not None:
+        historical_data = calculate_moving_averages(historical_data)
+        historical_data = calculate_macd(historical_data)
+        historical_data = calculate_rsi(historical_data)
+        historical_data = calculate_bollinger_bands(historical_data)
+    else:
+        await notify_and_exit(notifier, "Failed to fetch historical Bitcoin data.")
+
+    if current_data is None:
+        await notify_and_exit(notifier, "Failed to fetch current Bitcoin data.")
+    else:
+        snapshots.append(current_data)
+        snapshots.compact()
 
+    if ohcl_data is not None:
+        write_table(ohcl_data, crypto_config.OHLC_DATA_PATH, backend=crypto_config.STORAGE_BACKEND)
+    else:
+        await notify_and_exit(notifier, "Failed to fetch OHLC data for Bitcoin.")
 
-current_data = get_current_price_and_dominance()
-if current_data is None:
-    notify_and_exit("Failed to fetch current Bitcoin data.")
-else:
-    save_data_to_csv(crypto_config.BTC_DATA_PATH, current_data)    
+    try:
+        # Only the snapshots for the days covered by the price history are read
+        current_data = snapshots.query(start=min(historical_data['date']))
+        historical_data = merge_dataframes(current_data, historical_data)
+        write_table(historical_data, crypto_config.HISTORICAL_DATA_PATH, backend=crypto_config.STORAGE_BACKEND)
+    except Exception as e:
+        await notify_and_exit(notifier, f"Error merging dataframes: {e}")
 
-ohcl_data = get_historical_ohlc_data(coin_id='bitcoin', days=30)
-if ohcl_data is not None:
-    ohcl_data.to_csv(crypto_config.OHLC_DATA_PATH, index=False)
-else:
-    notify_and_exit("Failed to fetch OHLC data for Bitcoin.")
+    plot_crypto_indicators(historical_data, last_n_days=crypto_config.LAST_N_DAYS, savepath=crypto_config.CRYPTO_INDICATORS_PATH)
 
-try:
-    current_data = pd.read_csv(crypto_config.BTC_DATA_PATH, index_col=False)
-    historical_data = merge_dataframes(current_data, historical_data)
-    historical_data.to_csv(crypto_config.HISTORICAL_DATA_PATH, index=False)
-except Exception as e:
-    notify_and_exit(f"Error merging dataframes: {e}")
 
-plot_crypto_indicators(historical_data, last_n_days=crypto_config.LAST_N_DAYS, savepath=crypto_config.CRYPTO_INDICATORS_PATH)
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(main())
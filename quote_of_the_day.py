@@ -6,8 +6,10 @@ import logging
 from dotenv import load_dotenv
 
 import config.quote_of_the_day_config as quote_of_the_day_config
+import config.subscribers_config as subscribers_config
 
 from telegram_service.bot import TelegramNotifier
+from telegram_service.subscribers import load_chat_ids
 
 from LLMs.factory import get_llm_instance
 from requests.exceptions import HTTPError, RequestException
@@ -86,41 +88,42 @@ def get_learned_words(filename: str) -> str:
         return ""
     
 # --- Main Asynchronous Logic ---
-async def main():
+async def main(chat_instance=None, notifier=None, schedule=None):
+    chat_ids = load_chat_ids(subscribers_config.DB_PATH, "quote_of_the_day", schedule, default_chat_id=TELEGRAM_USER_ID)
+    if not chat_ids:
+        logger.info("No subscribers for this run.")
+        return
+
     # --- Initialization ---
-    chat_instance = get_llm_instance(quote_of_the_day_config)
-    notifier = TelegramNotifier(token=QOTD_BOT_TOKEN)
+    chat_instance = chat_instance or get_llm_instance(quote_of_the_day_config)
+    notifier = notifier or TelegramNotifier(token=QOTD_BOT_TOKEN, cursor_path=quote_of_the_day_config.UPDATE_OFFSET_PATH)
     learned_words = get_learned_words(quote_of_the_day_config.FILEPATH)
 
     # --- LLM Interaction ---
-    logger.info("Generating LLM response...")
+    logger.info("Generating LLM response and streaming it to Telegram...")
     topic = random.choice(quote_of_the_day_config.TOPICS)
     message = f"Quote of the day about {topic}, please. DO NOT repeat following words: {learned_words}"
+    header = f"Topic: {topic}\n\n"
+    # Built once the stream ends: with failover, the answering model is known only then
+    footer = lambda: f"\n\nLLM: {chat_instance.model_id}"
     try:
-        response, usage = chat_instance.conv(message)
+        # The quote appears in every chat as it is generated
+        response, _ = await notifier.broadcast_stream(
+            chat_instance.stream(message), chat_ids, header=header, footer=footer,
+        )
     except HTTPError as e:
         logger.error(f"OpenRouter API error: {e}")
         return
     except RequestException as e:
         logger.error(f"Network error contacting OpenRouter: {e}")
         return
-    logger.info("LLM response received.")
+    logger.info("LLM response received and sent.")
 
-    final_message = (
-        f"Topic: {topic}\n\n"
-        f"{response}\n\n"
-        f"LLM: {chat_instance.model_id}"
-    )
+    final_message = header + response + footer()
     advanced_word = extract_word_from_message(final_message)
     if advanced_word != "":
         save_word_to_file(advanced_word, quote_of_the_day_config.FILEPATH)
 
-    # --- Send Notifications (within the same async context) ---
-    logger.info("Sending notifications to Telegram...")
-    # These two tasks will run sequentially.
-    await notifier.send_message(msg=final_message, chat_id=TELEGRAM_USER_ID)
-    logger.info("Notification sent.")
-
 
 if __name__ == "__main__":
     # Run the entire async main function once.
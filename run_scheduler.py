@@ -0,0 +1,120 @@
+import os
+import signal
+import functools
+import asyncio
+import logging
+from dotenv import load_dotenv
+
+import config.scheduler_config as scheduler_config
+import config.subscribers_config as subscribers_config
+import config.crypto_config as crypto_config
+import config.quote_of_the_day_config as quote_of_the_day_config
+import config.word_quiz_config as word_quiz_config
+import config.business_psychology_config as business_psychology_config
+
+from scheduler.daemon import Scheduler
+from telegram_service.bot import TelegramNotifier
+from telegram_service.subscribers import SubscriberRegistry
+from LLMs.factory import get_llm_instance
+
+import fetch_all_data
+import crypto_main
+import quote_of_the_day
+import word_quiz
+import business_psychology
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+load_dotenv(override=True)
+
+
+class SharedClients:
+    """
+    Clients created on first use and reused by every job run, so their
+    connection pools (and TLS sessions) stay warm for the life of the daemon.
+    """
+
+    def __init__(self):
+        self._notifiers = {}
+        self._llms = {}
+
+    def notifier(self, env_var, cursor_path=None, file_id_cache_path=None):
+        token = os.getenv(env_var)
+        if token not in self._notifiers:
+            self._notifiers[token] = TelegramNotifier(
+                token=token, cursor_path=cursor_path, file_id_cache_path=file_id_cache_path,
+            )
+        return self._notifiers[token]
+
+    def llm(self, config):
+        if config.__name__ not in self._llms:
+            self._llms[config.__name__] = get_llm_instance(config)
+        return self._llms[config.__name__]
+
+    async def aclose(self):
+        """Closes the LLM clients' pooled connections."""
+        await asyncio.gather(*(llm.aclose() for llm in self._llms.values()), return_exceptions=True)
+
+
+def build_scheduler(clients=None, subscribers=None):
+    """
+    Registers every job from `config.scheduler_config.JOBS`, plus one extra
+    run per custom schedule that subscribers of a job have picked.
+    """
+    clients = clients or SharedClients()
+    subscribers = subscribers or SubscriberRegistry(subscribers_config.DB_PATH)
+    jobs = {
+        "fetch_all_data": lambda schedule=None: fetch_all_data.main(
+            notifier=clients.notifier("BTC_BOT_TOKEN", file_id_cache_path=crypto_config.TELEGRAM_FILE_ID_CACHE_PATH),
+        ),
+        "crypto_main": lambda schedule=None: crypto_main.main(
+            chat_instance=clients.llm(crypto_config),
+            notifier=clients.notifier("BTC_BOT_TOKEN", file_id_cache_path=crypto_config.TELEGRAM_FILE_ID_CACHE_PATH),
+            schedule=schedule,
+        ),
+        "quote_of_the_day": lambda schedule=None: quote_of_the_day.main(
+            chat_instance=clients.llm(quote_of_the_day_config),
+            notifier=clients.notifier("QOTD_BOT_TOKEN", quote_of_the_day_config.UPDATE_OFFSET_PATH),
+            schedule=schedule,
+        ),
+        "word_quiz": lambda schedule=None: word_quiz.main(
+            chat_instance=clients.llm(word_quiz_config),
+            notifier=clients.notifier("QOTD_BOT_TOKEN", word_quiz_config.UPDATE_OFFSET_PATH),
+            schedule=schedule,
+        ),
+        "business_psychology": lambda schedule=None: business_psychology.main(
+            chat_instance=clients.llm(business_psychology_config),
+            notifier=clients.notifier("BUSINESS_BOT_TOKEN"),
+            schedule=schedule,
+        ),
+    }
+
+    scheduler = Scheduler()
+    for name, schedule in scheduler_config.JOBS.items():
+        if name not in jobs:
+            raise ValueError(f"Unknown job in scheduler config: {name}")
+        scheduler.add_job(name, schedule, jobs[name])
+        for custom in subscribers.schedules(name):
+            scheduler.add_job(f"{name} [{custom}]", custom, functools.partial(jobs[name], schedule=custom))
+    return scheduler
+
+
+async def main():
+    clients = SharedClients()
+    scheduler = build_scheduler(clients)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    logger.info("Scheduler started.")
+    await scheduler.run(stop)
+    await clients.aclose()
+    logger.info("Scheduler stopped.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+# (name, lowest value, highest value) for the five crontab fields
+_FIELDS = (
+    ('minute', 0, 59),
+    ('hour', 0, 23),
+    ('day of month', 1, 31),
+    ('month', 1, 12),
+    ('day of week', 0, 7),
+)
+
+# Leap days only come around every four years (eight across a skipped century)
+_MAX_SEARCH_DAYS = 366 * 8
+
+
+def _parse_field(text, name, low, high):
+    values = set()
+    for part in text.split(','):
+        range_part, _, step = part.partition('/')
+        step = int(step) if step else 1
+        if range_part == '*':
+            start, end = low, high
+        elif '-' in range_part:
+            start, end = (int(v) for v in range_part.split('-', 1))
+        else:
+            start = int(range_part)
+            end = high if step > 1 else start
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError(f"Invalid {name} field in cron expression: {text!r}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """
+    A standard five-field crontab schedule ("m h dom mon dow").
+
+    Fields accept '*', numbers, ranges ('1-5'), lists ('1,15') and steps
+    ('*/10'). As in cron, when both day of month and day of week are
+    restricted a day matches if either one does (a field starting with '*',
+    such as '*/2', is not restricted), and Sunday is 0 or 7.
+    """
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: {expression!r}")
+        self.expression = expression
+        minutes, hours, days, months, weekdays = (
+            _parse_field(text, *spec) for text, spec in zip(fields, _FIELDS)
+        )
+        self.minutes = sorted(minutes)
+        self.hours = sorted(hours)
+        self.days = days
+        self.months = months
+        # cron counts Sunday as 0 (or 7), datetime.weekday() counts Monday as 0
+        self.weekdays = {(day - 1) % 7 for day in weekdays}
+        # A field starting with '*' (including '*/2') counts as unrestricted here
+        self.any_day = fields[2].startswith('*')
+        self.any_weekday = fields[4].startswith('*')
+
+    def _matches_day(self, day):
+        if day.month not in self.months:
+            return False
+        in_month = day.day in self.days
+        in_week = day.weekday() in self.weekdays
+        if self.any_day or self.any_weekday:
+            return in_month and in_week
+        return in_month or in_week
+
+    def next_after(self, moment):
+        """
+        Returns the first time strictly after `moment` that matches the schedule.
+
+        Args:
+            moment (datetime): Reference time (naive or aware, kept as is).
+
+        Returns:
+            datetime: The next fire time, with seconds and microseconds zeroed.
+        """
+        start = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.date()
+        for _ in range(_MAX_SEARCH_DAYS):
+            if self._matches_day(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        candidate = datetime.combine(day, datetime.min.time(), tzinfo=start.tzinfo).replace(
+                            hour=hour, minute=minute
+                        )
+                        if candidate >= start:
+                            return candidate
+            day += timedelta(days=1)
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+    def __repr__(self):
+        return f"CronSchedule({self.expression!r})"
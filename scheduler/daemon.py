@@ -0,0 +1,111 @@
+import asyncio
+import logging
+from datetime import datetime
+
+from .cron import CronSchedule
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """A named coroutine function that the scheduler runs on a cron schedule."""
+
+    def __init__(self, name, schedule, func):
+        self.name = name
+        self.schedule = schedule if isinstance(schedule, CronSchedule) else CronSchedule(schedule)
+        self.func = func
+        self.next_run = None
+        self.task = None
+
+    @property
+    def running(self):
+        return self.task is not None and not self.task.done()
+
+
+class Scheduler:
+    """
+    Runs several async jobs on cron-like schedules inside one event loop.
+
+    Jobs share the process, so clients created once (Telegram bots, LLM
+    clients, HTTP sessions) stay warm between runs. Due jobs run concurrently;
+    a job that is still running when it is due again is skipped for that slot.
+    A failing job is logged and does not stop the scheduler, and neither does
+    a job that calls `exit()` the way the standalone scripts do.
+    """
+
+    def __init__(self, clock=datetime.now, sleep=asyncio.sleep, max_sleep=60):
+        self.jobs = {}
+        self.clock = clock
+        self.sleep = sleep
+        # Waking up at least once a minute keeps the schedule right after a
+        # system suspend or a clock change.
+        self.max_sleep = max_sleep
+
+    def add_job(self, name, schedule, func):
+        """
+        Registers a job.
+
+        Args:
+            name (str): Unique job name, used in the logs.
+            schedule (str | CronSchedule): Crontab expression, e.g. "20 8 * * *".
+            func: Coroutine function called with no arguments on each run.
+        """
+        if name in self.jobs:
+            raise ValueError(f"Job already registered: {name}")
+        self.jobs[name] = Job(name, schedule, func)
+        return self.jobs[name]
+
+    async def run_job(self, job):
+        """Runs one job to completion, logging instead of raising on failure."""
+        logger.info(f"Starting job '{job.name}'.")
+        started = self.clock()
+        try:
+            await job.func()
+        except asyncio.CancelledError:
+            logger.info(f"Job '{job.name}' cancelled.")
+            raise
+        except SystemExit as e:
+            logger.error(f"Job '{job.name}' exited with status {e.code}.")
+        except Exception:
+            logger.exception(f"Job '{job.name}' failed.")
+        else:
+            logger.info(f"Finished job '{job.name}' in {(self.clock() - started).total_seconds():.1f}s.")
+
+    def _start(self, job):
+        if job.running:
+            logger.warning(f"Job '{job.name}' is still running; skipping this run.")
+            return
+        job.task = asyncio.create_task(self.run_job(job), name=job.name)
+
+    async def run(self, stop=None):
+        """
+        Runs the scheduler until `stop` (an asyncio.Event) is set, then waits
+        for running jobs to finish.
+        """
+        stop = stop or asyncio.Event()
+        now = self.clock()
+        for job in self.jobs.values():
+            job.next_run = job.schedule.next_after(now)
+            logger.info(f"Scheduled job '{job.name}' ({job.schedule.expression}); next run at {job.next_run}.")
+
+        while not stop.is_set():
+            now = self.clock()
+            for job in self.jobs.values():
+                if job.next_run <= now:
+                    self._start(job)
+                    job.next_run = job.schedule.next_after(now)
+
+            next_run = min((job.next_run for job in self.jobs.values()), default=None)
+            delay = self.max_sleep if next_run is None else (next_run - self.clock()).total_seconds()
+            sleeper = asyncio.ensure_future(self.sleep(min(max(delay, 0), self.max_sleep)))
+            stopper = asyncio.ensure_future(stop.wait())
+            await asyncio.wait({sleeper, stopper}, return_when=asyncio.FIRST_COMPLETED)
+            for waiter in (sleeper, stopper):
+                waiter.cancel()
+
+        tasks = [job.task for job in self.jobs.values() if job.running]
+        if tasks:
+            logger.info(f"Waiting for {len(tasks)} running job(s) to finish.")
+            await asyncio.gather(*tasks, return_exceptions=True)
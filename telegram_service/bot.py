@@ -1,66 +1,303 @@
-from telegram import Bot
-from telegram.error import TelegramError
+from telegram import Bot, InputMediaPhoto
+from telegram.error import BadRequest, TelegramError
+import asyncio
 import logging
 
+from .cursor import UpdateCursor
+from .dispatcher import UpdateDispatcher
+from .file_cache import FileIdCache, content_hash
+from .send_queue import SendQueue
+
 logging.basicConfig(level=logging.INFO,
                     format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
+# Telegram rejects longer text messages
+MAX_MESSAGE_LENGTH = 4096
+
+
+def split_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> list:
+    """Splits text into messages of at most `limit` characters, at line breaks where possible."""
+    parts = []
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit)
+        if cut <= 0:
+            cut = limit
+        parts.append(text[:cut])
+        text = text[cut:].lstrip("\n")
+    parts.append(text)
+    return parts
+
+
 class TelegramNotifier:
     """
     A class to handle sending messages and photos via a Telegram Bot.
     """
-    def __init__(self, token: str):
+    def __init__(self, token: str, cursor_path: str = None, file_id_cache_path: str = None):
+        """
+        Args:
+            token (str): Bot token.
+            cursor_path (str): Optional file that persists the next update
+                               offset between runs.
+            file_id_cache_path (str): Optional file that persists the
+                                      file_ids of uploaded images between runs.
+        """
         if not token:
             raise ValueError("Bot token cannot be empty.")
             
         self.bot = Bot(token=token)
+        self.cursor = UpdateCursor(cursor_path)
+        # Long-poll dispatcher for jobs that consume updates; shares the cursor
+        self.updates = UpdateDispatcher(self.bot, cursor=self.cursor)
+        # Every outgoing call goes through the rate-limited, retrying send queue
+        self.queue = SendQueue(self.bot)
+        # Images Telegram already has are sent by file_id instead of re-uploaded
+        self.file_ids = FileIdCache(file_id_cache_path)
+        # digests -> [lock, number of senders using it] for uploads in progress
+        self._uploads = {}
 
-    async def send_message(self, msg: str, chat_id: int):
-        """Sends a text message to the specified Telegram user."""
+    async def send_message(self, msg: str, chat_id: int) -> bool:
+        """Sends a text message to the specified Telegram user. Returns whether it was sent."""
         try:
-            await self.bot.send_message(
-                chat_id=chat_id,
-                text=msg
-            )            
+            await self.queue.send('send_message', chat_id, text=msg)
+            return True
         except TelegramError as e:
             logger.error(f"Error sending message: {e}")
         except Exception as e:
             logger.error(f"An unexpected error occurred: {e}")
+        return False
 
-    async def send_photo(self, image_path: str, caption: str, chat_id: int):
-        """Sends a photo to the specified Telegram user."""
+    async def send_photo(self, image_path: str, caption: str, chat_id: int) -> bool:
+        """Sends a photo to the specified Telegram user. Returns whether it was sent."""
         try:
             with open(image_path, 'rb') as photo_file:
-                await self.bot.send_photo(
-                    chat_id=chat_id,
-                    photo=photo_file,
-                    caption=caption
-                )
+                # bytes rather than the open file, so a retry can resend them
+                photo = photo_file.read()
+            await self._send_files('send_photo', chat_id, [photo],
+                                   lambda files: {'photo': files[0], 'caption': caption})
+            return True
         except FileNotFoundError:
             logger.error(f"Error: The file at {image_path} was not found.")
         except TelegramError as e:
             logger.error(f"Error sending photo: {e}")
         except Exception as e:
             logger.error(f"An unexpected error occurred: {e}")
+        return False
 
-    async def get_updates(self):
-        """Fetches updates, returns their texts, then acknowledges them on Telegram."""
+    async def send_media_group(self, image_paths: list, chat_id: int, caption: str = None) -> bool:
+        """
+        Sends several images as albums of up to 10, which counts as one message
+        per album against the rate limits. The caption goes on the first image.
+        """
         try:
-            updates = await self.bot.get_updates()
-            texts = [u.message.text for u in updates if getattr(u, "message", None) and u.message.text]
+            photos = []
+            for image_path in image_paths:
+                with open(image_path, 'rb') as photo_file:
+                    photos.append(photo_file.read())
+            for start in range(0, len(photos), 10):
+                first = start == 0
+                await self._send_files('send_media_group', chat_id, photos[start:start + 10], lambda files: {
+                    'media': [InputMediaPhoto(f, caption=caption if first and i == 0 else None)
+                              for i, f in enumerate(files)],
+                })
+            return True
+        except FileNotFoundError as e:
+            logger.error(f"Error: The file at {e.filename} was not found.")
+        except TelegramError as e:
+            logger.error(f"Error sending media group: {e}")
+        except Exception as e:
+            logger.error(f"An unexpected error occurred: {e}")
+        return False
+
+    async def _send_files(self, method, chat_id, blobs, build):
+        """
+        Sends images by their cached file_id, uploading only those Telegram
+        does not have yet.
+
+        Args:
+            method (str): Bot API method, 'send_photo' or 'send_media_group'.
+            chat_id (int): Target chat.
+            blobs (list): Image contents.
+            build: Function mapping the files to send (a file_id or the bytes
+                   for each blob) to the method's keyword arguments.
+        """
+        digests = [content_hash(blob) for blob in blobs]
+
+        def files():
+            return [self.file_ids.get(digest) or blob for digest, blob in zip(digests, blobs)]
+
+        def uncached():
+            return any(self.file_ids.get(digest) is None for digest in digests)
+
+        if uncached():
+            # Concurrent sends of the same images (a broadcast) wait for the
+            # first upload and then reuse its file_ids
+            key = ":".join(digests)
+            upload = self._uploads.setdefault(key, [asyncio.Lock(), 0])
+            upload[1] += 1
+            try:
+                async with upload[0]:
+                    if uncached():
+                        result = await self.queue.send(method, chat_id, **build(files()))
+                        self._remember(digests, result)
+                        return result
+            finally:
+                # The last sender drops the lock, so a long-running daemon keeps none
+                upload[1] -= 1
+                if not upload[1]:
+                    del self._uploads[key]
+
+        try:
+            return await self.queue.send(method, chat_id, **build(files()))
+        except BadRequest as e:
+            # A file_id can stop working (e.g. the bot token changed); only
+            # then is the upload repeated
+            if "file" not in str(e).lower():
+                raise
+            logger.warning(f"Cached file_id rejected ({e}); uploading again.")
+            for digest in digests:
+                self.file_ids.discard(digest)
+            result = await self.queue.send(method, chat_id, **build(blobs))
+            self._remember(digests, result)
+            return result
+
+    def _remember(self, digests, result):
+        messages = result if isinstance(result, (list, tuple)) else [result]
+        for digest, message in zip(digests, messages):
+            sizes = getattr(message, "photo", None)
+            if sizes:
+                # The largest size's file_id resends the photo at full resolution
+                self.file_ids.put(digest, sizes[-1].file_id)
+
+    async def broadcast_message(self, msg: str, chat_ids) -> dict:
+        """Sends a text message to many chats concurrently. Returns chat_id -> whether it was sent."""
+        chat_ids = list(chat_ids)
+        results = await asyncio.gather(*(self.send_message(msg, chat_id) for chat_id in chat_ids))
+        return dict(zip(chat_ids, results))
+
+    async def broadcast_photos(self, image_paths: list, caption: str, chat_ids) -> dict:
+        """
+        Sends one image (as a photo) or several (as an album) to many chats
+        concurrently. Returns chat_id -> whether it was sent.
+        """
+        chat_ids = list(chat_ids)
+        if len(image_paths) == 1:
+            sends = (self.send_photo(image_paths[0], caption, chat_id) for chat_id in chat_ids)
+        else:
+            sends = (self.send_media_group(image_paths, chat_id, caption=caption) for chat_id in chat_ids)
+        results = await asyncio.gather(*sends)
+        return dict(zip(chat_ids, results))
+
+    async def broadcast_stream(self, chunks, chat_ids, header: str = "", footer="",
+                               placeholder: str = "…", min_interval: float = 1.0):
+        """
+        Shows a message to many chats while it is still being generated.
 
-            # Acknowledge: mark everything up to the newest update as "confirmed"
+        Every chat first gets `header` and a placeholder, which is then edited
+        to the text received so far. Edits go out at most every
+        `min_interval` seconds and only after the previous round has been
+        sent, so a large audience makes the updates coarser instead of
+        queueing them up. When `chunks` ends, each message is edited to its
+        final text (with `footer`); text over Telegram's length limit
+        continues in follow-up messages.
+
+        Args:
+            chunks: Async iterator of text deltas, e.g. `LLM.stream(...)`.
+            chat_ids: Chats to send to.
+            header (str): Text shown above the streamed content.
+            footer: Text appended once the stream has ended, or a function
+                    returning it, called then (e.g. to name the model
+                    that actually answered).
+            placeholder (str): Shown until the first edit, and after the
+                               text while it is still growing.
+            min_interval (float): Minimum seconds between edits of a message.
+
+        Returns:
+            tuple: (the streamed text, {chat_id: whether the final text was delivered}).
+
+        Raises:
+            Whatever `chunks` raises, after deleting the placeholders.
+        """
+        chat_ids = list(chat_ids)
+        sent = await asyncio.gather(*(self._send_for_edit(header + placeholder, chat_id) for chat_id in chat_ids))
+        messages = {chat_id: message_id for chat_id, message_id in zip(chat_ids, sent) if message_id is not None}
+
+        loop = asyncio.get_running_loop()
+        text, editing, last_edit = "", None, loop.time()
+        try:
+            async for delta in chunks:
+                text += delta
+                if (editing is None or editing.done()) and loop.time() - last_edit >= min_interval:
+                    last_edit = loop.time()
+                    preview = split_message(header + text + placeholder)[0]
+                    editing = asyncio.create_task(self._edit_all(messages, preview))
+        except BaseException:
+            if editing is not None:
+                editing.cancel()
+            await asyncio.gather(*(
+                self.queue.send('delete_message', chat_id, message_id=message_id)
+                for chat_id, message_id in messages.items()
+            ), return_exceptions=True)
+            raise
+        if editing is not None:
+            await editing
+
+        if callable(footer):
+            footer = footer()
+        first, *rest = split_message(header + text + footer)
+        delivered = await self._edit_all(messages, first)
+        for part in rest:
+            sent = await self.broadcast_message(part, [chat_id for chat_id, ok in delivered.items() if ok])
+            delivered.update(sent)
+        return text, {chat_id: delivered.get(chat_id, False) for chat_id in chat_ids}
+
+    async def _send_for_edit(self, text, chat_id):
+        """Sends a message to be edited later. Returns its message_id, or None if it wasn't sent."""
+        try:
+            message = await self.queue.send('send_message', chat_id, text=text)
+            return message.message_id
+        except TelegramError as e:
+            logger.error(f"Error sending message: {e}")
+        except Exception as e:
+            logger.error(f"An unexpected error occurred: {e}")
+        return None
+
+    async def _edit_all(self, messages, text) -> dict:
+        async def edit(chat_id, message_id):
+            try:
+                await self.queue.send('edit_message_text', chat_id, message_id=message_id, text=text)
+                return True
+            except BadRequest as e:
+                if "not modified" in str(e).lower():
+                    return True
+                logger.error(f"Error editing message: {e}")
+            except TelegramError as e:
+                logger.error(f"Error editing message: {e}")
+            return False
+
+        results = await asyncio.gather(*(edit(chat_id, message_id) for chat_id, message_id in messages.items()))
+        return dict(zip(messages, results))
+
+    async def get_updates(self, limit: int = 100, timeout: int = 0, allowed_updates=("message",)):
+        """
+        Fetches new updates in one request and returns their texts.
+
+        The request carries the cursor's offset, which also confirms the
+        updates returned by the previous call, so no separate acknowledgement
+        is needed. Don't call this while `self.updates` is polling; consume
+        `self.updates.stream()` instead.
+        """
+        try:
+            updates = await self.bot.get_updates(
+                offset=self.cursor.offset,
+                limit=limit,
+                timeout=timeout,
+                allowed_updates=list(allowed_updates),
+            )
             if updates:
-                last_id = updates[-1].update_id
-                # We don't care about the response; this call tells Telegram to skip old updates next time
-                try:
-                    await self.bot.get_updates(offset=last_id + 1, limit=1)
-                except TelegramError as ack_err:
-                    # Not fatal: worst case you'll see duplicates next run
-                    logger.warning(f"Ack failed (will retry next time): {ack_err}")
-
-            return texts
+                self.cursor.advance(updates[-1].update_id)
+
+            return [u.message.text for u in updates if getattr(u, "message", None) and u.message.text]
 
         except TelegramError as e:
             logger.error(f"Error fetching updates: {e}")
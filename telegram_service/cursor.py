@@ -0,0 +1,42 @@
+import os
+import json
+import logging
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+class UpdateCursor:
+    """
+    The next `getUpdates` offset for one bot.
+
+    Telegram confirms every update below the offset sent with a request, so
+    fetching with the cursor's offset both reads new updates and acknowledges
+    the ones already handled, in a single round trip. With a `path` the
+    cursor is persisted, so a restarted process continues where the last one
+    stopped instead of re-reading the backlog.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.offset = None
+        if path and os.path.isfile(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.offset = json.load(f).get('offset')
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable update cursor {path}: {e}")
+
+    def advance(self, update_id):
+        """Moves the cursor past `update_id` and persists it."""
+        if self.offset is not None and update_id < self.offset:
+            return
+        self.offset = update_id + 1
+        if self.path:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'offset': self.offset}, f)
+            os.replace(tmp_path, self.path)
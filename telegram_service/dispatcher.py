@@ -0,0 +1,158 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from telegram.error import TelegramError
+
+from .cursor import UpdateCursor
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+class UpdateDispatcher:
+    """
+    Routes incoming Telegram updates to the jobs consuming them.
+
+    There are two ways to consume updates:
+    - `expect_reply(chat_id)` returns a future for the next message in a chat;
+    - `stream()` is an async iterator over every update (or one chat's).
+
+    Each consumer gets its own copy of an update, so concurrent jobs do not
+    take updates away from each other. While anyone is consuming, the
+    dispatcher long-polls `getUpdates` with a server-side `timeout`, so an
+    update is delivered as soon as Telegram receives it and an idle chat
+    costs one request per `poll_timeout` seconds. With no consumers it does
+    not poll at all.
+
+    Updates can also be pushed in with `process_update` (e.g. from a webhook
+    handler) instead of being polled.
+    """
+
+    def __init__(self, bot, poll_timeout=50, retry_delay=5, cursor=None,
+                 allowed_updates=("message",)):
+        self.bot = bot
+        self.poll_timeout = poll_timeout
+        self.retry_delay = retry_delay
+        self.cursor = cursor or UpdateCursor()
+        self.allowed_updates = list(allowed_updates)
+        self._waiters = {}
+        self._streams = []
+        self._poller = None
+
+    @property
+    def offset(self):
+        return self.cursor.offset
+
+    def expect_reply(self, chat_id):
+        """
+        Returns a future resolved with the text of the next message sent in
+        `chat_id`. Register it before sending the prompt so a fast reply
+        cannot be missed. Messages older than the registration are ignored.
+
+        Cancelling the future (e.g. through `asyncio.wait_for`) unregisters it.
+        """
+        future = asyncio.get_running_loop().create_future()
+        since = datetime.now(timezone.utc).replace(microsecond=0)
+        self._waiters.setdefault(chat_id, []).append((future, since))
+        future.add_done_callback(lambda _: self._discard(chat_id, future))
+        self._ensure_polling()
+        return future
+
+    async def wait_for_reply(self, chat_id, timeout):
+        """Waits up to `timeout` seconds for a message in `chat_id`; returns its text or None."""
+        try:
+            return await asyncio.wait_for(self.expect_reply(chat_id), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def stream(self, chat_id=None):
+        """
+        Yields updates as they arrive, optionally only those from `chat_id`.
+        Polling continues for as long as the iteration does; wrap the stream
+        in `contextlib.aclosing` to unsubscribe promptly after a `break`.
+        """
+        queue = asyncio.Queue()
+        subscription = (chat_id, queue)
+        self._streams.append(subscription)
+        self._ensure_polling()
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._streams.remove(subscription)
+            self._stop_if_idle()
+
+    def process_update(self, update):
+        """
+        Hands an update to every matching stream and to the oldest matching
+        reply waiter. Returns whether a waiter took it.
+        """
+        message = getattr(update, "message", None)
+        chat_id = getattr(message, "chat_id", None)
+
+        for stream_chat, queue in self._streams:
+            if stream_chat is None or stream_chat == chat_id:
+                queue.put_nowait(update)
+
+        if message is None or not message.text:
+            return False
+        sent_at = getattr(message, "date", None)
+        for future, since in self._waiters.get(chat_id, []):
+            if future.done() or (sent_at is not None and sent_at < since):
+                continue
+            future.set_result(message.text)
+            return True
+        return False
+
+    @property
+    def waiting(self):
+        return bool(self._streams) or any(self._waiters.values())
+
+    def _discard(self, chat_id, future):
+        waiters = [w for w in self._waiters.get(chat_id, []) if w[0] is not future]
+        if waiters:
+            self._waiters[chat_id] = waiters
+        else:
+            self._waiters.pop(chat_id, None)
+        self._stop_if_idle()
+
+    def _stop_if_idle(self):
+        if not self.waiting and self._poller is not None and not self._poller.done():
+            # Nobody is consuming any more, so drop the in-flight long poll too
+            self._poller.cancel()
+
+    def _ensure_polling(self):
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll())
+
+    async def _poll(self):
+        while self.waiting:
+            try:
+                updates = await self.bot.get_updates(
+                    offset=self.cursor.offset,
+                    timeout=self.poll_timeout,
+                    allowed_updates=self.allowed_updates,
+                )
+            except TelegramError as e:
+                logger.warning(f"Long poll failed, retrying in {self.retry_delay}s: {e}")
+                await asyncio.sleep(self.retry_delay)
+                continue
+
+            for update in updates:
+                # The next request's offset confirms the update with Telegram
+                self.cursor.advance(update.update_id)
+                self.process_update(update)
+
+    async def close(self):
+        """Stops polling and cancels every pending reply waiter."""
+        for waiters in list(self._waiters.values()):
+            for future, _ in waiters:
+                future.cancel()
+        if self._poller is not None and not self._poller.done():
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
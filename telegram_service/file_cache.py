@@ -0,0 +1,68 @@
+import os
+import json
+import hashlib
+import logging
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class FileIdCache:
+    """
+    Telegram `file_id`s of files one bot has already uploaded, keyed by the
+    SHA-256 of their content.
+
+    Once Telegram has a file, sending its `file_id` instead of the bytes
+    delivers the same file without uploading it again. Keying by content
+    means a regenerated chart gets a new key (and a fresh upload) while an
+    unchanged one keeps reusing its `file_id`. File ids are only valid for
+    the bot that uploaded them, so each bot needs its own cache. With a
+    `path` the cache is persisted the same way as `UpdateCursor`; only the
+    `max_entries` most recent files are kept.
+    """
+
+    def __init__(self, path=None, max_entries=64):
+        self.path = path
+        self.max_entries = max_entries
+        self._file_ids = {}
+        if path and os.path.isfile(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._file_ids = dict(json.load(f))
+            except (OSError, ValueError, TypeError) as e:
+                logger.warning(f"Ignoring unreadable file_id cache {path}: {e}")
+
+    def get(self, digest):
+        return self._file_ids.get(digest)
+
+    def put(self, digest, file_id):
+        """Remembers `file_id` for `digest` and persists the cache."""
+        # Re-inserting moves the entry to the end, so eviction drops the oldest
+        self._file_ids.pop(digest, None)
+        self._file_ids[digest] = file_id
+        while len(self._file_ids) > self.max_entries:
+            del self._file_ids[next(iter(self._file_ids))]
+        self._save()
+
+    def discard(self, digest):
+        """Forgets `digest`, e.g. after Telegram rejected its file_id."""
+        if self._file_ids.pop(digest, None) is not None:
+            self._save()
+
+    def __len__(self):
+        return len(self._file_ids)
+
+    def _save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._file_ids, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,147 @@
+import time
+import asyncio
+import logging
+import warnings
+from datetime import timedelta
+
+from telegram.error import NetworkError, RetryAfter, TimedOut
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# Telegram's documented bot limits: about 30 messages per second overall,
+# one message per second in a chat and 20 messages per minute in a group.
+GLOBAL_RATE = 30
+PRIVATE_CHAT_RATE = 1
+GROUP_CHAT_RATE = 20 / 60
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket for coroutines, the asyncio counterpart of the CoinGecko
+    client's `TokenBucket`.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        capacity (float): Maximum burst size.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock=time.monotonic, sleep=asyncio.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        """Waits until a token is available. Returns the time spent waiting."""
+        async with self._lock:
+            now = self._clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+            self._last = now
+
+            wait = 0.0
+            if self.tokens < 1:
+                wait = (1 - self.tokens) / self.rate
+                await self._sleep(wait)
+                self.tokens = 1.0
+                self._last = self._clock()
+
+            self.tokens -= 1
+            return wait
+
+
+def _retry_after_seconds(error):
+    with warnings.catch_warnings():
+        # PTB warns that retry_after will become a timedelta; accept either
+        warnings.simplefilter("ignore", DeprecationWarning)
+        retry_after = error.retry_after
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+class SendQueue:
+    """
+    Paces and retries outbound Bot API calls.
+
+    Every call waits for a token from the global bucket and from its chat's
+    bucket (groups and channels, which have negative ids or '@username's,
+    get the slower group rate), so sending to many chats concurrently stays
+    under Telegram's flood limits.
+    A `RetryAfter` pauses all sends for the time Telegram asks for and then
+    retries; network errors are retried with exponential backoff. Other
+    errors (blocked bot, bad request) are raised to the caller.
+    """
+
+    def __init__(self, bot, global_rate=GLOBAL_RATE, chat_rate=PRIVATE_CHAT_RATE,
+                 group_rate=GROUP_CHAT_RATE, max_retries=3, backoff_factor=1.0,
+                 max_in_flight=16, clock=time.monotonic, sleep=asyncio.sleep):
+        self.bot = bot
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self._clock = clock
+        self._sleep = sleep
+        self._global = AsyncTokenBucket(global_rate, global_rate, clock=clock, sleep=sleep)
+        self._chats = {}
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._paused_until = 0.0
+
+    def _chat_bucket(self, chat_id):
+        if chat_id not in self._chats:
+            # '@channelname' usernames only address channels, which are paced like groups
+            is_group = not str(chat_id).lstrip('-').isdigit() or int(chat_id) < 0
+            rate = self.group_rate if is_group else self.chat_rate
+            self._chats[chat_id] = AsyncTokenBucket(rate, 1, clock=self._clock, sleep=self._sleep)
+        return self._chats[chat_id]
+
+    async def _wait_for_flood_control(self):
+        while (pause := self._paused_until - self._clock()) > 0:
+            await self._sleep(pause)
+
+    async def send(self, method, chat_id, **kwargs):
+        """
+        Calls `bot.<method>(chat_id=chat_id, **kwargs)` within the rate limits.
+
+        Args:
+            method (str): Bot API method name, e.g. 'send_message'.
+            chat_id (int): Target chat.
+            **kwargs: Method arguments. Values must be reusable across retries
+                      (bytes or file_ids rather than open files).
+
+        Returns:
+            The Bot API result.
+
+        Raises:
+            TelegramError: If the call fails for a reason other than flood
+                           control or the network, or retries run out.
+        """
+        attempt = 0
+        while True:
+            # Flood control first, so the buckets don't refill during the pause
+            await self._wait_for_flood_control()
+            await self._chat_bucket(chat_id).acquire()
+            await self._global.acquire()
+            try:
+                async with self._in_flight:
+                    return await getattr(self.bot, method)(chat_id=chat_id, **kwargs)
+            except RetryAfter as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = _retry_after_seconds(e)
+                logger.warning(f"Flood control on {method} to {chat_id}; pausing sends for {delay:.0f}s.")
+                self._paused_until = max(self._paused_until, self._clock() + delay)
+            except NetworkError as e:
+                # BadRequest is a NetworkError subclass, but retrying it cannot help
+                retryable = isinstance(e, TimedOut) or type(e) is NetworkError
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                delay = self.backoff_factor * (2 ** attempt)
+                logger.warning(f"{method} to {chat_id} failed ({e}); retrying in {delay:.1f}s.")
+                await self._sleep(delay)
+            attempt += 1
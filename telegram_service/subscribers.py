@@ -0,0 +1,190 @@
+import os
+import asyncio
+import sqlite3
+import logging
+import argparse
+from contextlib import closing
+
+logging.basicConfig(level=logging.INFO,
+                    format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# Stored instead of NULL so (chat_id, bot, asset, schedule) stays a usable key
+_ANY = ''
+
+
+class SubscriberRegistry:
+    """
+    An embedded SQLite registry of who receives which report.
+
+    Each row subscribes a chat to one bot (the job name, e.g. 'crypto_main'),
+    optionally for one asset and on its own cron schedule instead of the
+    bot's default one. Lookups go through an index on (bot, schedule, asset),
+    so finding a job's audience does not scan every subscription.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS subscriptions (
+                    chat_id INTEGER NOT NULL,
+                    bot TEXT NOT NULL,
+                    asset TEXT NOT NULL DEFAULT '',
+                    schedule TEXT NOT NULL DEFAULT '',
+                    PRIMARY KEY (chat_id, bot, asset)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_subscriptions_bot ON subscriptions (bot, schedule, asset)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def subscribe(self, chat_id, bot, assets=None, schedule=None):
+        """
+        Subscribes a chat to a bot, replacing its previous preferences for it.
+
+        Args:
+            chat_id (int): Telegram chat id.
+            bot (str): Job name, e.g. 'crypto_main' or 'quote_of_the_day'.
+            assets (list): Assets to receive reports for; None for bots
+                           without per-asset reports.
+            schedule (str): Cron expression, or None for the bot's default.
+        """
+        rows = [(int(chat_id), bot, asset.upper(), schedule or _ANY) for asset in (assets or [_ANY])]
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM subscriptions WHERE chat_id = ? AND bot = ?", (int(chat_id), bot))
+            conn.executemany("INSERT INTO subscriptions (chat_id, bot, asset, schedule) VALUES (?, ?, ?, ?)", rows)
+
+    def unsubscribe(self, chat_id, bot=None):
+        """Removes a chat from one bot, or from every bot. Returns the number of rows removed."""
+        query, params = "DELETE FROM subscriptions WHERE chat_id = ?", [int(chat_id)]
+        if bot is not None:
+            query += " AND bot = ?"
+            params.append(bot)
+        with closing(self._connect()) as conn, conn:
+            return conn.execute(query, params).rowcount
+
+    def audiences(self, bot, schedule=None):
+        """
+        Groups a bot's subscribers by the report they need.
+
+        Args:
+            bot (str): Job name.
+            schedule (str): The custom schedule being delivered, or None for
+                            subscribers on the bot's default schedule.
+
+        Returns:
+            dict: asset (None for bots without assets) -> sorted chat ids.
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT asset, chat_id FROM subscriptions WHERE bot = ? AND schedule = ? ORDER BY asset, chat_id",
+                (bot, schedule or _ANY),
+            ).fetchall()
+
+        audiences = {}
+        for asset, chat_id in rows:
+            audiences.setdefault(asset or None, []).append(chat_id)
+        return audiences
+
+    def schedules(self, bot):
+        """The distinct custom schedules used by a bot's subscribers."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT schedule FROM subscriptions WHERE bot = ? AND schedule != ? ORDER BY schedule",
+                (bot, _ANY),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self, bot=None):
+        with closing(self._connect()) as conn:
+            if bot is None:
+                return conn.execute("SELECT COUNT(DISTINCT chat_id) FROM subscriptions").fetchone()[0]
+            return conn.execute("SELECT COUNT(DISTINCT chat_id) FROM subscriptions WHERE bot = ?", (bot,)).fetchone()[0]
+
+
+def load_audiences(path, bot, schedule=None, default_chat_id=None, default_key=None):
+    """
+    A bot's audiences from the registry at `path`. Until anyone subscribes to
+    the bot, its default-schedule report goes to `default_chat_id` (the old
+    TELEGRAM_USER_ID behaviour) under `default_key`.
+    """
+    registry = SubscriberRegistry(path)
+    audiences = registry.audiences(bot, schedule)
+    if not audiences and schedule is None and default_chat_id and registry.count(bot) == 0:
+        audiences = {default_key: [default_chat_id]}
+    return audiences
+
+
+def load_chat_ids(path, bot, schedule=None, default_chat_id=None):
+    """Every chat in a bot's audiences, for bots that send one report to everyone."""
+    audiences = load_audiences(path, bot, schedule, default_chat_id=default_chat_id)
+    return sorted({chat_id for chat_ids in audiences.values() for chat_id in chat_ids})
+
+
+async def deliver(audiences, render, send):
+    """
+    Renders each distinct report once and fans it out to its audience.
+
+    Reports for different audiences are rendered and sent concurrently, so
+    the expensive part (data analysis, LLM calls) scales with the number of
+    distinct reports and only the sends scale with the number of subscribers.
+
+    Args:
+        audiences (dict): Report key -> chat ids, as from `SubscriberRegistry.audiences`.
+        render: Coroutine function taking a report key and returning the
+                report, or None when it cannot be produced.
+        send: Coroutine function taking (report, chat_ids) that broadcasts it.
+
+    Returns:
+        dict: Report key -> the rendered report (None if skipped).
+    """
+    async def one(key, chat_ids):
+        report = await render(key)
+        if report is None:
+            logger.warning(f"No report for {key!r}; skipping {len(chat_ids)} subscriber(s).")
+            return None
+        await send(report, chat_ids)
+        return report
+
+    keys = list(audiences)
+    reports = await asyncio.gather(*(one(key, audiences[key]) for key in keys))
+    return dict(zip(keys, reports))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage report subscribers.")
+    parser.add_argument("--db", required=True, help="Path to the subscriber database.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="Subscribe a chat to a bot.")
+    add.add_argument("chat_id", type=int)
+    add.add_argument("bot")
+    add.add_argument("--asset", action="append", dest="assets", help="Repeat for several assets.")
+    add.add_argument("--schedule", help="Cron expression overriding the bot's schedule.")
+
+    remove = commands.add_parser("remove", help="Unsubscribe a chat.")
+    remove.add_argument("chat_id", type=int)
+    remove.add_argument("bot", nargs="?")
+
+    show = commands.add_parser("list", help="Show a bot's audiences.")
+    show.add_argument("bot")
+
+    args = parser.parse_args(argv)
+    registry = SubscriberRegistry(args.db)
+    if args.command == "add":
+        registry.subscribe(args.chat_id, args.bot, assets=args.assets, schedule=args.schedule)
+    elif args.command == "remove":
+        registry.unsubscribe(args.chat_id, args.bot)
+    else:
+        for schedule in [None, *registry.schedules(args.bot)]:
+            for key, chat_ids in registry.audiences(args.bot, schedule).items():
+                print(f"{schedule or 'default'}\t{key or '-'}\t{', '.join(map(str, chat_ids))}")
+
+
+if __name__ == "__main__":
+    main()
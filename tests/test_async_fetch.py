@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import time
+
+import pandas as pd
+import requests
+
+from crypto import async_fetch
+
+
+class SlowClient:
+    """Fake CoinGecko client whose every request takes `delay` seconds."""
+
+    def __init__(self, delay=0.2, fail_global=False, rendezvous=None):
+        self.delay = delay
+        self.fail_global = fail_global
+        self.rendezvous = rendezvous
+        self.paths = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def get_json(self, path, params=None):
+        with self._lock:
+            self.paths.append(path)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self.rendezvous is not None:
+                # Only returns once another request is in flight at the same time
+                self.rendezvous.wait()
+            time.sleep(self.delay)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        if path == "/simple/price":
+            return {coin: {'usd': 100.0, 'usd_market_cap': 1.0, 'usd_24h_vol': 2.0, 'usd_24h_change': 3.0}
+                    for coin in params['ids'].split(",")}
+        if path == "/global":
+            if self.fail_global:
+                raise requests.ConnectionError("down")
+            return {'data': {'market_cap_percentage': {'btc': 55.5, 'eth': 12.0}}}
+        if path.endswith("/market_chart"):
+            return {'prices': [[0, 1.0], [86400000, 2.0], [172800000, 3.0]],
+                    'total_volumes': [[0, 10.0], [86400000, 20.0], [172800000, 30.0]]}
+        if path.endswith("/ohlc"):
+            return [[0, 1.0, 2.0, 0.5, 1.5]]
+        raise AssertionError(path)
+
+
+def test_fetch_all_runs_requests_concurrently():
+    max_concurrency = 2
+    client = SlowClient(delay=0, rendezvous=threading.Barrier(2, timeout=5))
+    result = asyncio.run(async_fetch.fetch_all({'bitcoin': 'btc'}, max_concurrency=max_concurrency, client=client))
+
+    # Sequential requests would break the barrier; the limit caps the overlap
+    assert 2 <= client.peak_in_flight <= max_concurrency
+    assert sorted(client.paths) == sorted(
+        ["/simple/price", "/global", "/coins/bitcoin/market_chart", "/coins/bitcoin/ohlc"]
+    )
+    assert isinstance(result['bitcoin']['historical'], pd.DataFrame)
+    assert isinstance(result['bitcoin']['ohlc'], pd.DataFrame)
+    assert result['bitcoin']['current']['current_dominance'] == 55.5
+
+
+def test_fetch_all_fans_out_over_coins_with_one_price_request():
+    client = SlowClient(delay=0)
+    result = asyncio.run(async_fetch.fetch_all({'bitcoin': 'btc', 'ethereum': 'eth'}, client=client))
+    assert set(result) == {'bitcoin', 'ethereum'}
+    assert client.paths.count("/simple/price") == 1
+    assert result['ethereum']['current']['current_dominance'] == 12.0
+
+
+def test_fetch_current_data_failure_returns_none_per_coin():
+    client = SlowClient(delay=0, fail_global=True)
+    result = asyncio.run(async_fetch.fetch_current_data({'bitcoin': 'btc'}, asyncio.Semaphore(2), client=client))
+    assert result == {'bitcoin': None}
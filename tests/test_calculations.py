@@ -8,6 +8,8 @@ from crypto.calculations import (
     calculate_macd,
     calculate_bollinger_bands,
     calculate_purchase_amount,
+    calculate_indicators_batch,
+    calculate_dmi,
 )
 
 
@@ -56,3 +58,34 @@ def test_calculate_purchase_amount():
     df = calculate_moving_averages(df)
     purchase = calculate_purchase_amount(df)
     assert purchase == 100
+
+
+def test_calculate_indicators_batch_matches_single_asset_functions():
+    prices = pd.DataFrame({
+        'bitcoin': [100 + (i % 7) * 3 + i for i in range(250)],
+        'ethereum': [50 + (i % 5) * 2 - i * 0.1 for i in range(250)],
+    })
+    result = calculate_indicators_batch(prices)
+
+    for asset in prices.columns:
+        single = prices[[asset]].rename(columns={asset: 'price'})
+        single = calculate_moving_averages(single)
+        single = calculate_macd(single)
+        single = calculate_rsi(single)
+        single = calculate_bollinger_bands(single)
+        expected = single[list(result[asset].columns)]
+        pd.testing.assert_frame_equal(result[asset], expected, check_names=False, check_dtype=False)
+
+
+def test_calculate_indicators_batch_empty_returns_none():
+    assert calculate_indicators_batch(pd.DataFrame()) is None
+
+
+def test_calculate_dmi_for_many_assets_matches_single_asset():
+    close = pd.DataFrame({'BTC': [float(i % 7 + i) for i in range(40)], 'ETH': [float(40 - i) for i in range(40)]})
+    high, low = close + 1.5, close - 1.0
+    result = calculate_dmi(high, low, close)
+    assert result.columns.names == ['asset', 'indicator']
+    for asset in close.columns:
+        expected = calculate_dmi(high[asset], low[asset], close[asset])
+        pd.testing.assert_frame_equal(result[asset], expected, check_names=False)
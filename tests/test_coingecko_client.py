@@ -0,0 +1,109 @@
+import pytest
+import requests
+
+from crypto.coingecko_client import CoinGeckoClient, TokenBucket, parse_retry_after
+
+
+class DummyResponse:
+    def __init__(self, status_code=200, json_data=None, headers=None):
+        self.status_code = status_code
+        self._json = json_data
+        self.headers = headers or {}
+
+    def json(self):
+        return self._json
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error")
+
+
+class DummySession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.calls.append({'url': url, 'params': params, 'headers': headers, 'timeout': timeout})
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def close(self):
+        pass
+
+
+def make_client(responses, **kwargs):
+    sleeps = []
+    session = DummySession(responses)
+    client = CoinGeckoClient(session=session, sleep=sleeps.append, requests_per_minute=6000, **kwargs)
+    return client, session, sleeps
+
+
+def test_get_json_passes_timeout_and_params():
+    client, session, _ = make_client([DummyResponse(json_data={'ok': True})], timeout=7)
+    assert client.get_json("/simple/price", params={'ids': 'bitcoin'}) == {'ok': True}
+    assert session.calls[0]['url'].endswith("/simple/price")
+    assert session.calls[0]['params'] == {'ids': 'bitcoin'}
+    assert session.calls[0]['timeout'] == 7
+
+
+def test_retry_after_header_is_honored_on_429():
+    client, session, sleeps = make_client([
+        DummyResponse(429, headers={'Retry-After': '12'}),
+        DummyResponse(json_data={'ok': True}),
+    ])
+    assert client.get_json("/global") == {'ok': True}
+    assert len(session.calls) == 2
+    assert 12 in sleeps
+
+
+def test_raises_after_retries_exhausted():
+    client, session, _ = make_client([DummyResponse(503)] * 3, max_retries=2)
+    with pytest.raises(requests.HTTPError):
+        client.get_json("/global")
+    assert len(session.calls) == 3
+
+
+def test_connection_errors_are_retried():
+    client, session, _ = make_client([
+        requests.ConnectionError("reset"),
+        DummyResponse(json_data=[1, 2]),
+    ])
+    assert client.get_json("/global") == [1, 2]
+    assert len(session.calls) == 2
+
+
+def test_conditional_request_reuses_cached_body_on_304():
+    client, session, _ = make_client([
+        DummyResponse(json_data={'v': 1}, headers={'ETag': '"abc"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}),
+        DummyResponse(304),
+    ])
+    assert client.get_json("/global") == {'v': 1}
+    assert client.get_json("/global") == {'v': 1}
+    assert session.calls[1]['headers']['If-None-Match'] == '"abc"'
+    assert session.calls[1]['headers']['If-Modified-Since'] == 'Mon, 01 Jan 2024 00:00:00 GMT'
+
+
+def test_token_bucket_waits_when_empty():
+    now = [0.0]
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=lambda: now[0], sleep=fake_sleep)
+    bucket.acquire()
+    bucket.acquire()
+    assert sleeps == []
+    bucket.acquire()
+    assert sleeps == [pytest.approx(0.5)]
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("garbage") is None
+    assert parse_retry_after("Mon, 01 Jan 2001 00:00:00 GMT") == 0.0
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from crypto.data_analysis import (
+    analyze_macd,
+    analyze_market_regime,
+    calculate_adx,
+    find_macd_crossovers,
+)
+
+
+def macd_frame(macd, signal_line, **kwargs):
+    return pd.DataFrame({'MACD': macd, 'Signal_Line': signal_line}, **kwargs)
+
+
+def test_find_macd_crossovers_over_whole_history():
+    df = macd_frame([-1, 1, 2, -1, -2, 1], [0, 0, 0, 0, 0, 0])
+    crossovers = find_macd_crossovers(df)
+    assert crossovers['signal'].tolist() == ['bullish', 'bearish', 'bullish']
+    assert crossovers['days_ago'].tolist() == [4, 2, 0]
+    assert crossovers.index.tolist() == [1, 3, 5]
+
+
+def test_find_macd_crossovers_uses_calendar_days_for_datetime_index():
+    index = pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-05'])
+    df = macd_frame([-1, 1, 2], [0, 0, 0], index=index)
+    assert find_macd_crossovers(df)['days_ago'].tolist() == [3]
+
+
+def test_find_macd_crossovers_includes_dates():
+    df = macd_frame([1, -1], [0, 0])
+    df['date'] = ['2024-01-01', '2024-01-02']
+    assert find_macd_crossovers(df)['date'].tolist() == ['2024-01-02']
+
+
+def test_analyze_macd_only_reports_crossovers_inside_window():
+    df = macd_frame([-1, 1, 2, 3, 4], [0, 0, 0, 0, 0])
+    assert analyze_macd(df, window=4) == "MACD shows bullish momentum 🟢"
+    assert analyze_macd(df, window=5) == "MACD Crossovers Detected:\nBullish crossover 3 days ago 🟢"
+
+
+def ohlc_frame(seed, n=120):
+    rng = np.random.default_rng(seed)
+    close = 30000 + np.cumsum(rng.normal(0, 300, n))
+    return pd.DataFrame({
+        'high': close + rng.uniform(0, 200, n),
+        'low': close - rng.uniform(0, 200, n),
+        'close': close,
+    })
+
+
+def test_calculate_adx_steady_uptrend():
+    close = np.arange(40, dtype=float)
+    df = pd.DataFrame({'high': close + 1, 'low': close - 1, 'close': close})
+    adx = calculate_adx(df)
+    assert adx.columns.tolist() == ['ADX', 'DMP', 'DMN']
+    assert adx['ADX'].iloc[:26].isna().all()
+    assert adx['ADX'].iloc[-1] == pytest.approx(100)
+    assert adx['DMP'].iloc[-1] == pytest.approx(50)
+    assert adx['DMN'].iloc[-1] == 0
+
+
+def test_calculate_adx_not_enough_data():
+    assert calculate_adx(ohlc_frame(0, n=10)) is None
+    assert analyze_market_regime(ohlc_frame(0, n=10)) == "Regime (Not enough data)"
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_calculate_adx_matches_pandas_ta(seed):
+    pytest.importorskip("pandas_ta")
+    df = ohlc_frame(seed)
+    expected = df.ta.adx(high=df['high'], low=df['low'], close=df['close'], length=14)
+    result = calculate_adx(df)
+    for column in ('ADX', 'DMP', 'DMN'):
+        np.testing.assert_allclose(result[column], expected[f'{column}_14'], rtol=1e-12)
@@ -18,3 +18,45 @@ def test_merge_dataframes_replaces_last_price():
     merged = merge_dataframes(btc_data, hist)
     assert merged['price'].iloc[-1] == 110
     assert merged['dominance_percentage'].iloc[-1] == 60
+
+
+def snapshots(dates, dominance):
+    return pd.DataFrame({
+        'date': dates,
+        'current_price': [100 + i for i in range(len(dates))],
+        'dominance_percentage': dominance,
+        'market_cap_usd': [1000] * len(dates),
+        '24h_change_percentage': [1] * len(dates),
+    })
+
+
+def test_merge_dataframes_does_not_mutate_inputs():
+    btc_data = snapshots(['2024-01-01 10:00:00', '2024-01-02 10:00:00'], [50, 60])
+    hist = pd.DataFrame({'date': ['2024-01-01', '2024-01-02'], 'price': [90, 95]})
+    btc_before, hist_before = btc_data.copy(), hist.copy()
+
+    merge_dataframes(btc_data, hist)
+
+    pd.testing.assert_frame_equal(btc_data, btc_before)
+    pd.testing.assert_frame_equal(hist, hist_before)
+
+
+def test_merge_dataframes_uses_latest_same_day_snapshot():
+    btc_data = snapshots(['2024-01-01 08:00:00', '2024-01-01 20:00:00', '2024-01-02 08:00:00'], [50, 55, 60])
+    hist = pd.DataFrame({'date': ['2024-01-01', '2024-01-02'], 'price': [90, 95]})
+    merged = merge_dataframes(btc_data, hist)
+    assert len(merged) == 2
+    assert merged['dominance_percentage'].tolist() == [55, 60]
+    assert merged['price'].iloc[-1] == 102
+
+
+def test_merge_dataframes_forward_fills_within_tolerance():
+    btc_data = snapshots(['2024-01-01 08:00:00', '2024-01-04 08:00:00'], [50, 60])
+    hist = pd.DataFrame({'date': ['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04'], 'price': [1, 2, 3, 4]})
+
+    exact = merge_dataframes(btc_data, hist)
+    assert exact['dominance_percentage'].isna().tolist() == [False, True, True, False]
+
+    filled = merge_dataframes(btc_data, hist, tolerance_days=1)
+    assert filled['dominance_percentage'].tolist()[:2] == [50, 50]
+    assert pd.isna(filled['dominance_percentage'].iloc[2])
@@ -0,0 +1,85 @@
+import datetime
+
+import pandas as pd
+
+from crypto import history_store
+from crypto.history_store import HistoryStore, sync_historical_price_data, sync_ohlc_data
+
+
+def daily_bars(start, n, partial_price=None):
+    """Emulates get_historical_price_data: one bar per day, last one partial."""
+    dates = [start + datetime.timedelta(days=i) for i in range(n)]
+    prices = [float(100 + i) for i in range(n)]
+    if partial_price is not None:
+        prices[-1] = partial_price
+    return pd.DataFrame({'price': prices, 'volume': [1.0] * n, 'date': dates})
+
+
+def test_first_sync_fetches_full_window(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_fetch(days, coin_id, client):
+        calls.append(days)
+        return daily_bars(datetime.date(2024, 1, 1), 5)
+
+    monkeypatch.setattr(history_store, "get_historical_price_data", fake_fetch)
+    store = HistoryStore(tmp_path / "prices.csv")
+    result = sync_historical_price_data(store, days=300, today=datetime.date(2024, 1, 5))
+
+    assert calls == [300]
+    assert len(result) == 5
+    assert result['date'].iloc[-1] == datetime.date(2024, 1, 5)
+
+
+def test_next_day_sync_fetches_only_missing_bars_and_replaces_partial(tmp_path, monkeypatch):
+    store = HistoryStore(tmp_path / "prices.csv")
+    store.upsert(daily_bars(datetime.date(2024, 1, 1), 5, partial_price=999.0))
+    calls = []
+
+    def fake_fetch(days, coin_id, client):
+        calls.append(days)
+        # final value for Jan 5 plus a new partial bar for Jan 6
+        return daily_bars(datetime.date(2024, 1, 5), 2, partial_price=555.0)
+
+    monkeypatch.setattr(history_store, "get_historical_price_data", fake_fetch)
+    result = sync_historical_price_data(store, days=300, today=datetime.date(2024, 1, 6))
+
+    assert calls == [3]
+    assert list(result['date']) == [datetime.date(2024, 1, d) for d in range(1, 7)]
+    assert result['price'].iloc[-2] == 100.0
+    assert result['price'].iloc[-1] == 555.0
+    assert result['date'].is_unique
+
+
+def test_failed_fetch_keeps_store_untouched(tmp_path, monkeypatch):
+    store = HistoryStore(tmp_path / "prices.csv")
+    store.upsert(daily_bars(datetime.date(2024, 1, 1), 3))
+    monkeypatch.setattr(history_store, "get_historical_price_data", lambda **kwargs: None)
+
+    assert sync_historical_price_data(store, today=datetime.date(2024, 1, 9)) is None
+    assert len(store.load()) == 3
+
+
+def test_ohlc_sync_uses_smallest_range_with_same_candle_size(tmp_path, monkeypatch):
+    store = HistoryStore(tmp_path / "ohlc.csv")
+    now = pd.Timestamp("2024-02-01 12:00")
+    old = pd.DataFrame({
+        'open': [1.0, 2.0], 'high': [1.0, 2.0], 'low': [1.0, 2.0], 'close': [1.0, 2.0],
+        'date': [pd.Timestamp("2023-12-01"), pd.Timestamp("2024-01-30 08:00")],
+    })
+    store.upsert(old)
+    calls = []
+
+    def fake_fetch(coin_id, days, client):
+        calls.append(days)
+        return pd.DataFrame({
+            'open': [3.0], 'high': [3.0], 'low': [3.0], 'close': [3.0],
+            'date': [pd.Timestamp("2024-02-01 12:00")],
+        })
+
+    monkeypatch.setattr(history_store, "get_historical_ohlc_data", fake_fetch)
+    result = sync_ohlc_data(store, days=30, now=now)
+
+    assert calls == [7]
+    # the candle older than 30 days is trimmed
+    assert list(result['close']) == [2.0, 3.0]
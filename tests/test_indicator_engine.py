@@ -0,0 +1,100 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from crypto.calculations import (
+    calculate_moving_averages,
+    calculate_rsi,
+    calculate_macd,
+    calculate_bollinger_bands,
+    calculate_dmi,
+)
+from crypto.indicator_engine import AdxEngine, IndicatorEngine, RollingMean, RollingStd, EwmMean
+
+COLUMNS = [
+    'MA50', 'MA200', 'MACD', 'Signal_Line', 'RSI',
+    'bollinger_mid', 'bollinger_std', 'bollinger_upper', 'bollinger_lower',
+]
+
+
+def batch_indicators(df):
+    df = calculate_moving_averages(df)
+    df = calculate_macd(df)
+    df = calculate_rsi(df)
+    return calculate_bollinger_bands(df)
+
+
+def random_walk(seed, n=300):
+    rng = np.random.default_rng(seed)
+    prices = np.round(30000 + np.cumsum(rng.normal(0, 500, n)), 2)
+    # a flat stretch exercises the "all values equal" branches
+    prices[100:130] = prices[100]
+    return pd.DataFrame({'price': prices})
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_engine_matches_batch_functions_exactly(seed):
+    df = random_walk(seed)
+    expected = batch_indicators(df.copy())
+    result = IndicatorEngine().apply(df.copy())
+    for column in COLUMNS:
+        pd.testing.assert_series_equal(result[column], expected[column], check_dtype=False)
+
+
+def test_engine_matches_batch_on_linear_prices():
+    df = pd.DataFrame({'price': range(1, 211)})
+    expected = batch_indicators(df.copy())
+    result = IndicatorEngine().apply(df.copy())
+    for column in COLUMNS:
+        pd.testing.assert_series_equal(result[column], expected[column], check_dtype=False)
+
+
+def test_engine_resumes_from_saved_state(tmp_path):
+    df = random_walk(3)
+    expected = batch_indicators(df.copy())
+
+    engine = IndicatorEngine()
+    for price in df['price'].iloc[:-1]:
+        engine.update(price)
+    state_path = tmp_path / "state.json"
+    engine.save(state_path)
+
+    restored = IndicatorEngine.load(state_path)
+    last_row = restored.update(df['price'].iloc[-1])
+    for column in COLUMNS:
+        assert last_row[column] == expected[column].iloc[-1]
+
+
+def test_rolling_primitives_match_pandas():
+    values = pd.Series(np.random.default_rng(4).normal(0, 1, 100))
+    mean, std, ewm = RollingMean(10), RollingStd(10), EwmMean(span=9)
+    got = [(mean.update(v), std.update(v), ewm.update(v)) for v in values]
+    got_mean, got_std, got_ewm = (pd.Series(col) for col in zip(*got))
+    pd.testing.assert_series_equal(got_mean, values.rolling(10).mean())
+    pd.testing.assert_series_equal(got_std, values.rolling(10).std())
+    pd.testing.assert_series_equal(got_ewm, values.ewm(span=9, adjust=False).mean())
+
+
+def test_apply_empty_dataframe_returns_none():
+    assert IndicatorEngine().apply(pd.DataFrame({'price': []})) is None
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_adx_engine_matches_batch_exactly(seed):
+    rng = np.random.default_rng(seed)
+    close = 30000 + np.cumsum(rng.normal(0, 300, 200))
+    df = pd.DataFrame({
+        'high': close + rng.uniform(1, 200, 200),
+        'low': close - rng.uniform(1, 200, 200),
+        'close': close,
+    })
+    expected = calculate_dmi(df['high'], df['low'], df['close'])
+
+    engine = AdxEngine()
+    rows = [engine.update(*bar) for bar in df[['high', 'low', 'close']].to_numpy()[:120]]
+    engine = AdxEngine.from_dict(json.loads(json.dumps(engine.to_dict())))
+    rows += [engine.update(*bar) for bar in df[['high', 'low', 'close']].to_numpy()[120:]]
+
+    pd.testing.assert_frame_equal(pd.DataFrame(rows), expected)
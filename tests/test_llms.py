@@ -0,0 +1,488 @@
+import asyncio
+import json
+import re
+import types
+
+import httpx
+import pytest
+import requests
+
+from LLMs.llm_interface import LLM
+from LLMs.open_router import OpenRouterLLM
+
+
+class EchoLLM(LLM):
+    def __init__(self):
+        super().__init__("echo", "system", 100, 0.0, 1.0)
+
+    def conv(self, message, max_retries=3):
+        return f"echo: {message}", None
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+def sse(*events):
+    lines = [": OPENROUTER PROCESSING", ""]
+    for event in events:
+        lines += [f"data: {json.dumps(event) if isinstance(event, dict) else event}", ""]
+    return "\n".join(lines).encode()
+
+
+def open_router_with(handler):
+    llm = OpenRouterLLM(api_key="key", model_id="model")
+    llm._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return llm
+
+
+def test_default_stream_yields_the_whole_conv_response():
+    assert asyncio.run(collect(EchoLLM().stream("hi"))) == ["echo: hi"]
+
+
+def test_open_router_stream_yields_deltas():
+    def handler(request):
+        assert json.loads(request.content)["stream"] is True
+        body = sse(
+            {"choices": [{"delta": {"role": "assistant"}}]},
+            {"choices": [{"delta": {"content": "Hello"}}]},
+            {"choices": [{"delta": {"content": ", world"}}]},
+            "[DONE]",
+        )
+        return httpx.Response(200, content=body, headers={"content-type": "text/event-stream"})
+
+    assert asyncio.run(collect(open_router_with(handler).stream("hi"))) == ["Hello", ", world"]
+
+
+def test_open_router_stream_raises_requests_errors():
+    def mid_stream_error(request):
+        return httpx.Response(200, content=sse({"error": {"code": 502, "message": "Provider down"}}))
+
+    with pytest.raises(requests.exceptions.HTTPError, match="Provider down"):
+        asyncio.run(collect(open_router_with(mid_stream_error).stream("hi")))
+
+    with pytest.raises(requests.exceptions.HTTPError, match="429"):
+        asyncio.run(collect(open_router_with(lambda request: httpx.Response(429, text="slow down")).stream("hi")))
+
+    def unreachable(request):
+        raise httpx.ConnectError("no route", request=request)
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        asyncio.run(collect(open_router_with(unreachable).stream("hi")))
+
+    def truncated(request):
+        return httpx.Response(200, content=sse({"choices": [{"delta": {"content": "Hel"}}]}, '{"choices": [{"del'))
+
+    with pytest.raises(requests.exceptions.JSONDecodeError):
+        asyncio.run(collect(open_router_with(truncated).stream("hi")))
+
+
+def test_azure_stream_skips_chunks_without_content():
+    pytest.importorskip("openai")
+    from LLMs.open_ai import AzureChat
+
+    def chunk(content=None):
+        choices = [] if content is None else [types.SimpleNamespace(delta=types.SimpleNamespace(content=content))]
+        return types.SimpleNamespace(choices=choices)
+
+    class Completions:
+        async def create(self, **kwargs):
+            assert kwargs["stream"] is True
+
+            async def stream():
+                for item in (chunk(), chunk("Buy"), chunk(""), chunk(" later")):
+                    yield item
+            return stream()
+
+    llm = AzureChat(model_id="gpt-4o", api_key="key", azure_endpoint="https://example.openai.azure.com")
+    llm._async_client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=Completions()))
+    assert asyncio.run(collect(llm.stream("hi"))) == ["Buy", " later"]
+
+
+def test_default_aconv_runs_conv():
+    assert asyncio.run(EchoLLM().aconv("hi")) == ("echo: hi", None)
+
+
+def test_open_router_aconv_retries_server_errors(monkeypatch):
+    async def no_sleep(delay):
+        pass
+
+    monkeypatch.setattr("LLMs.open_router.asyncio.sleep", no_sleep)
+    responses = [
+        httpx.Response(502, text="bad gateway"),
+        httpx.Response(200, json={
+            "choices": [{"message": {"content": "Wait for a dip."}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 4, "total_tokens": 14},
+        }),
+    ]
+    llm = open_router_with(lambda request: responses.pop(0))
+    response, usage = asyncio.run(llm.aconv("BTC?"))
+    assert response == "Wait for a dip."
+    assert usage == {"input_tokens": 10, "output_tokens": 4, "total_tokens": 14}
+
+
+def test_open_router_aconv_retries_malformed_json():
+    responses = [
+        httpx.Response(200, text='{"choices": [{"mess'),
+        httpx.Response(200, json={"choices": [{"message": {"content": "Hold."}}]}),
+    ]
+    llm = open_router_with(lambda request: responses.pop(0))
+    assert asyncio.run(llm.aconv("BTC?")) == ("Hold.", None)
+
+
+def test_open_router_aconv_does_not_retry_api_errors():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json={"error": {"code": 400, "message": "Bad model"}})
+
+    with pytest.raises(requests.exceptions.HTTPError, match="Bad model"):
+        asyncio.run(open_router_with(handler).aconv("hi"))
+    assert len(calls) == 1
+
+
+def test_azure_aconv_uses_the_async_client():
+    pytest.importorskip("openai")
+    from LLMs.open_ai import AzureChat
+
+    class Completions:
+        async def create(self, **kwargs):
+            assert kwargs["messages"][-1] == {"role": "user", "content": "hi"}
+            message = types.SimpleNamespace(content="Hold.")
+            usage = types.SimpleNamespace(prompt_tokens=3, completion_tokens=2, total_tokens=5)
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=usage)
+
+    llm = AzureChat(model_id="gpt-4o", api_key="key", azure_endpoint="https://example.openai.azure.com")
+    llm._async_client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=Completions()))
+    assert asyncio.run(llm.aconv("hi")) == ("Hold.", {"input_tokens": 3, "output_tokens": 2, "total_tokens": 5})
+
+
+class CountingLLM(EchoLLM):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def conv(self, message, max_retries=3):
+        self.calls += 1
+        return f"echo: {message}", {"input_tokens": 1, "output_tokens": 2, "total_tokens": 3}
+
+    async def stream(self, message):
+        self.calls += 1
+        for piece in ("echo: ", message):
+            yield piece
+
+
+def test_cached_llm_answers_repeated_prompts_from_the_cache(tmp_path):
+    from LLMs.cache import CachedLLM, ResponseCache
+
+    now = [1000.0]
+    inner = CountingLLM()
+    llm = CachedLLM(inner, ResponseCache(tmp_path / "cache.sqlite", clock=lambda: now[0]), ttl=60)
+
+    first = llm.conv("hi")
+    assert asyncio.run(llm.aconv("hi")) == first
+    assert inner.calls == 1
+
+    # Sampling parameters are part of the key
+    inner.temperature = llm.temperature = 0.9
+    llm.conv("hi")
+    assert inner.calls == 2
+
+    now[0] += 61
+    llm.conv("hi")
+    assert inner.calls == 3
+
+
+def test_cached_llm_stores_completed_streams(tmp_path):
+    from LLMs.cache import CachedLLM, ResponseCache
+
+    inner = CountingLLM()
+    llm = CachedLLM(inner, ResponseCache(tmp_path / "cache.sqlite"), ttl=60)
+    assert asyncio.run(collect(llm.stream("hi"))) == ["echo: ", "hi"]
+    assert asyncio.run(collect(llm.stream("hi"))) == ["echo: hi"]
+    assert llm.conv("hi")[0] == "echo: hi"
+    assert inner.calls == 1
+
+
+def test_response_cache_evicts_the_least_recently_used(tmp_path):
+    from LLMs.cache import ResponseCache
+
+    now = [0.0]
+
+    def clock():
+        now[0] += 1
+        return now[0]
+
+    cache = ResponseCache(tmp_path / "cache.sqlite", max_entries=2, clock=clock)
+    cache.put("a", "A", None, ttl=100)
+    cache.put("b", "B", None, ttl=100)
+    assert cache.get("a") == ("A", None)
+    cache.put("c", "C", {"total_tokens": 3}, ttl=100)
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("c") == ("C", {"total_tokens": 3})
+
+
+class ScriptedLLM(LLM):
+    def __init__(self, model_id, delay=0.0, fail=False):
+        super().__init__(model_id, "system", 100, 0.0, 1.0)
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = False
+
+    def conv(self, message, max_retries=3):
+        self.calls += 1
+        if self.fail:
+            raise requests.exceptions.HTTPError(f"{self.model_id} is down")
+        return f"{self.model_id}: {message}", None
+
+    async def aconv(self, message, max_retries=3):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self.conv(message, max_retries)
+
+    async def stream(self, message):
+        response, _ = await self.aconv(message)
+        for word in response.split(" "):
+            yield word
+
+
+def test_failover_moves_to_the_next_provider():
+    from LLMs.failover import FailoverLLM
+
+    primary, backup = ScriptedLLM("free", fail=True), ScriptedLLM("azure")
+    llm = FailoverLLM([primary, backup])
+    assert llm.conv("hi") == ("azure: hi", None)
+    assert asyncio.run(llm.aconv("hi")) == ("azure: hi", None)
+    assert asyncio.run(collect(llm.stream("hi"))) == ["azure:", "hi"]
+    assert llm.model_id == "azure"
+
+    backup.fail = True
+    with pytest.raises(requests.exceptions.HTTPError, match="azure is down"):
+        asyncio.run(llm.aconv("hi"))
+
+
+def test_hedging_answers_from_the_faster_provider():
+    from LLMs.failover import FailoverLLM
+
+    slow, fast = ScriptedLLM("slow", delay=5), ScriptedLLM("fast")
+    llm = FailoverLLM([slow, fast], hedge=True, hedge_after=0.01)
+    assert asyncio.run(llm.aconv("hi")) == ("fast: hi", None)
+    assert slow.cancelled
+    # Losing a hedge is not a failure
+    assert list(llm.breakers[0]._outcomes) == []
+
+    # Without hedging, the slow provider's answer is awaited
+    slow.delay = 0.05
+    assert asyncio.run(FailoverLLM([slow, fast]).aconv("hi")) == ("slow: hi", None)
+
+
+def test_hedge_delay_follows_recent_p95_latency():
+    from LLMs.failover import FailoverLLM
+
+    llm = FailoverLLM([ScriptedLLM("a")], hedge_after=20, min_samples=5)
+    assert llm.hedge_delay(0) == 20
+    llm._latencies[0].extend([1, 2, 3, 4, 5, 6, 7, 8, 9, 100])
+    assert llm.hedge_delay(0) == 100
+    llm._latencies[0].extend([1] * 90)
+    assert llm.hedge_delay(0) == 6
+
+
+def test_circuit_breaker_skips_a_failing_provider_until_cooldown():
+    from LLMs.failover import CircuitBreaker, FailoverLLM
+
+    now = [0.0]
+    breakers = [CircuitBreaker(min_calls=2, cooldown=30, clock=lambda: now[0]), CircuitBreaker()]
+    primary, backup = ScriptedLLM("free", fail=True), ScriptedLLM("azure")
+    llm = FailoverLLM([primary, backup], breakers=breakers)
+
+    for _ in range(4):
+        llm.conv("hi")
+    assert primary.calls == 2 and breakers[0].state == "open"
+
+    now[0] += 31
+    primary.fail = False
+    assert llm.conv("hi") == ("free: hi", None)
+    assert breakers[0].state == "closed"
+
+
+class RetryingLLM(EchoLLM):
+    """Fails `failures` attempts before answering, reporting each attempt like the providers do."""
+
+    def __init__(self, failures=0):
+        super().__init__()
+        self.failures = failures
+
+    def conv(self, message, max_retries=3):
+        from LLMs.telemetry import record_attempt
+
+        for attempt in range(max_retries + 1):
+            record_attempt(self.model_id)
+            if attempt >= self.failures:
+                return f"echo: {message}", {"input_tokens": 5, "output_tokens": 7, "total_tokens": 12}
+        raise requests.exceptions.HTTPError("still failing")
+
+
+def test_instrumented_llm_records_each_call(tmp_path):
+    from LLMs.cache import CachedLLM, ResponseCache
+    from LLMs.telemetry import InstrumentedLLM, MetricsStore
+
+    store = MetricsStore(tmp_path / "metrics.sqlite")
+    cached = CachedLLM(RetryingLLM(failures=2), ResponseCache(tmp_path / "cache.sqlite"), ttl=60)
+    llm = InstrumentedLLM(cached, store, job="quote_of_the_day")
+
+    asyncio.run(llm.aconv("hi"))
+    llm.conv("hi")  # answered from the cache
+    assert asyncio.run(collect(llm.stream("new"))) == ["echo: new"]
+    llm.llm.llm.failures = 10
+    with pytest.raises(requests.exceptions.HTTPError):
+        llm.conv("fails", max_retries=1)
+
+    [summary] = store.summary()
+    assert summary["job"] == "quote_of_the_day" and summary["model_id"] == "echo"
+    assert (summary["calls"], summary["errors"], summary["cache_hits"]) == (4, 1, 1)
+    assert summary["total_tokens"] == 12
+    assert summary["p50_latency"] <= summary["p95_latency"]
+
+    import sqlite3
+    with sqlite3.connect(store.path) as conn:
+        rows = conn.execute("SELECT method, attempts, first_token_latency, error FROM llm_calls ORDER BY ts").fetchall()
+    assert [row[:2] for row in rows] == [("aconv", 3), ("conv", 0), ("stream", 3), ("conv", 2)]
+    assert rows[2][2] is not None
+    assert rows[3][3] == "HTTPError: still failing"
+
+
+def test_metrics_summary_percentiles_by_job(tmp_path):
+    from LLMs.telemetry import MetricsStore
+
+    now = [0.0]
+    store = MetricsStore(tmp_path / "metrics.sqlite", clock=lambda: now[0])
+    for latency in range(1, 21):
+        now[0] += 1
+        store.record("crypto", "gpt-4o", "aconv", float(latency), retry_time=0.0, attempts=1)
+    store.record("word_quiz", "kimi", "aconv", 2.0, retry_time=1.5, attempts=2)
+
+    summary = {row["job"]: row for row in store.summary()}
+    assert summary["crypto"]["p50_latency"] == 11.0 and summary["crypto"]["p95_latency"] == 20.0
+    assert summary["word_quiz"]["mean_retry_time"] == 1.5
+    assert [row["calls"] for row in store.summary(since=16)] == [5, 1]
+
+
+class BatchLLM(EchoLLM):
+    def __init__(self, delay=0.01, packed_reply=None):
+        super().__init__()
+        self.delay = delay
+        self.packed_reply = packed_reply
+        self.in_flight = self.peak = 0
+        self.requests = []
+
+    async def aconv(self, message, max_retries=3):
+        self.requests.append(message)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        if message == "boom":
+            raise requests.exceptions.HTTPError("boom")
+        if message.startswith("Answer each of the following"):
+            if self.packed_reply is not None:
+                return self.packed_reply, None
+            asked = re.findall(r"Request \d+:\n(.*)", message)
+            return "```json\n" + json.dumps([f"echo: {m}" for m in asked]) + "\n```", {"total_tokens": 9}
+        return f"echo: {message}", {"total_tokens": 3}
+
+
+def test_conv_batch_bounds_concurrency_and_keeps_order():
+    class CountingLimiter:
+        acquired = 0
+
+        async def acquire(self):
+            self.acquired += 1
+
+    llm, limiter = BatchLLM(), CountingLimiter()
+    results = asyncio.run(llm.conv_batch([f"m{i}" for i in range(10)], max_concurrency=3, rate_limiter=limiter))
+    assert [response for response, _ in results] == [f"echo: m{i}" for i in range(10)]
+    assert llm.peak == 3 and limiter.acquired == 10
+
+    results = asyncio.run(llm.conv_batch(["a", "boom", "b"], return_exceptions=True))
+    assert results[0] == ("echo: a", {"total_tokens": 3})
+    assert isinstance(results[1], requests.exceptions.HTTPError)
+
+
+def test_conv_batch_packs_prompts_into_one_request():
+    llm = BatchLLM()
+    results = asyncio.run(llm.conv_batch(["a", "b", "c", "d", "e"], pack=2))
+    assert [response for response, _ in results] == ["echo: a", "echo: b", "echo: c", "echo: d", "echo: e"]
+    assert [usage for _, usage in results] == [{"total_tokens": 9}, None, {"total_tokens": 9}, None, {"total_tokens": 3}]
+    assert len(llm.requests) == 3
+
+
+def test_conv_batch_falls_back_when_the_packed_answer_cannot_be_split():
+    llm = BatchLLM(packed_reply="Sure! Here are your answers: one, two")
+    results = asyncio.run(llm.conv_batch(["a", "b"], pack=2))
+    assert [response for response, _ in results] == ["echo: a", "echo: b"]
+    assert len(llm.requests) == 3
+
+
+def test_hedge_cancelling_a_trial_call_frees_the_breaker():
+    from LLMs.failover import CircuitBreaker, FailoverLLM
+
+    now = [0.0]
+    breakers = [CircuitBreaker(min_calls=1, cooldown=30, clock=lambda: now[0]), CircuitBreaker()]
+    slow, fast = ScriptedLLM("slow", fail=True), ScriptedLLM("fast")
+    llm = FailoverLLM([slow, fast], hedge=True, hedge_after=0.01, breakers=breakers)
+    asyncio.run(llm.aconv("hi"))
+    assert breakers[0].state == "open"
+
+    # The half-open trial is slow enough to be hedged and cancelled
+    now[0] += 31
+    slow.fail, slow.delay = False, 5
+    assert asyncio.run(llm.aconv("hi")) == ("fast: hi", None)
+    assert slow.cancelled
+
+    now[0] = 1000
+    assert breakers[0].allow()
+
+
+def test_wrappers_name_the_provider_that_answered(tmp_path):
+    from LLMs.cache import CachedLLM, ResponseCache
+    from LLMs.failover import FailoverLLM
+    from LLMs.telemetry import InstrumentedLLM, MetricsStore
+
+    primary = ScriptedLLM("free", fail=True)
+    failover = FailoverLLM([primary, ScriptedLLM("azure")])
+    cached = CachedLLM(failover, ResponseCache(tmp_path / "cache.sqlite"), ttl=60)
+    llm = InstrumentedLLM(cached, MetricsStore(tmp_path / "metrics.sqlite"), job="quote_of_the_day")
+    assert llm.model_id == "free"
+
+    assert asyncio.run(llm.aconv("hi")) == ("azure: hi", None)
+    assert llm.model_id == cached.model_id == "azure"
+
+    # The cache key stays on the configured model, so the answer is reused
+    primary.fail = False
+    assert asyncio.run(llm.aconv("hi")) == ("azure: hi", None)
+    assert primary.calls == 1
+
+
+def test_hedged_call_is_recorded_under_the_provider_that_answered(tmp_path):
+    import sqlite3
+    from LLMs.failover import FailoverLLM
+    from LLMs.telemetry import InstrumentedLLM, MetricsStore
+
+    primary, hedge = ScriptedLLM("primary", delay=0.15), ScriptedLLM("hedge", delay=5)
+    store = MetricsStore(tmp_path / "metrics.sqlite")
+    llm = InstrumentedLLM(FailoverLLM([primary, hedge], hedge=True, hedge_after=0.05), store, job="word_quiz")
+
+    # The primary answers while the hedge is still running
+    assert asyncio.run(llm.aconv("hi")) == ("primary: hi", None)
+    assert hedge.cancelled
+
+    with sqlite3.connect(store.path) as conn:
+        model_id, retry_time = conn.execute("SELECT model_id, retry_time FROM llm_calls").fetchone()
+    assert model_id == "primary"
+    assert retry_time < 0.05
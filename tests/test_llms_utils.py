@@ -1,6 +1,6 @@
 import pandas as pd
 
-from LLMs.utils import create_trading_prompt
+from LLMs.utils import compact_table, create_trading_prompt, estimate_tokens
 
 
 def test_create_trading_prompt_includes_data_and_ta():
@@ -10,3 +10,30 @@ def test_create_trading_prompt_includes_data_and_ta():
     assert "HISTORICAL_DATA:" in prompt
     assert ta in prompt
     assert df.tail(2).to_string() in prompt
+
+
+def test_compact_table_selects_columns_and_thins_older_rows():
+    df = pd.DataFrame({'day': range(10), 'price': [float(p) for p in range(100, 110)], 'bollinger_std': 1.0})
+    text = compact_table(df, columns=['day', 'price', 'missing'], full_rows=3, stride=2)
+    # Older rows are thinned counting back from the full-resolution rows
+    assert text.splitlines() == ['day,price', '1,101.0', '3,103.0', '5,105.0', '7,107.0', '8,108.0', '9,109.0']
+
+
+def test_compact_table_delta_encoding():
+    df = pd.DataFrame({'date': ['d1', 'd2', 'd3'], 'price': [100.0, 105.5, 103.0]})
+    assert compact_table(df, encoding='delta').splitlines() == ['date,price', 'd1,100.0', 'd2,5.5', 'd3,-2.5']
+
+
+def test_compact_table_keeps_the_newest_rows_within_the_token_budget():
+    df = pd.DataFrame({'price': [float(p) for p in range(1000, 1100)]})
+    text = compact_table(df, max_tokens=50)
+    assert estimate_tokens(text) <= 50
+    assert text.splitlines()[-1] == '1099.0'
+    assert len(text.splitlines()) > 5
+
+
+def test_create_trading_prompt_with_compaction():
+    df = pd.DataFrame({'price': [1.0, 2.0, 3.0], 'volume': [10, 20, 30]})
+    prompt = create_trading_prompt(df, "TA", last_n_days=2, columns=['price'], encoding='csv')
+    assert 'price\n2.0\n3.0' in prompt
+    assert 'volume' not in prompt
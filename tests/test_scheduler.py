@@ -0,0 +1,105 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from scheduler.cron import CronSchedule
+from scheduler.daemon import Scheduler
+
+
+@pytest.mark.parametrize("expression, moment, expected", [
+    ("20 8 * * *", datetime(2024, 1, 1, 8, 0), datetime(2024, 1, 1, 8, 20)),
+    ("20 8 * * *", datetime(2024, 1, 1, 8, 20), datetime(2024, 1, 2, 8, 20)),
+    ("*/15 * * * *", datetime(2024, 1, 1, 8, 16, 30), datetime(2024, 1, 1, 8, 30)),
+    ("0 9 * * 1-5", datetime(2024, 1, 5, 10, 0), datetime(2024, 1, 8, 9, 0)),  # Fri -> Mon
+    ("0 0 * * 7", datetime(2024, 1, 1, 0, 0), datetime(2024, 1, 7, 0, 0)),  # 7 is Sunday
+    ("0 0 29 2 *", datetime(2023, 3, 1), datetime(2024, 2, 29)),
+    ("0 0 1 * 1", datetime(2024, 1, 1, 12, 0), datetime(2024, 1, 8)),  # dom OR dow
+    ("0 9 */2 * 1", datetime(2024, 1, 1, 10, 0), datetime(2024, 1, 15, 9, 0)),  # '*/2' dom: AND, odd Mondays
+])
+def test_cron_next_after(expression, moment, expected):
+    assert CronSchedule(expression).next_after(moment) == expected
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "0 0 * 13 *", "*/0 * * * *"])
+def test_cron_rejects_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+class FakeTime:
+    def __init__(self, start):
+        self.now = start
+
+    def clock(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += timedelta(seconds=seconds)
+        await asyncio.sleep(0)
+
+
+def run_scheduler(scheduler, until):
+    async def runner():
+        stop = asyncio.Event()
+
+        async def watchdog():
+            while scheduler.clock() < until:
+                await asyncio.sleep(0)
+            stop.set()
+
+        await asyncio.gather(scheduler.run(stop), watchdog())
+
+    asyncio.run(runner())
+
+
+def test_scheduler_runs_due_jobs_and_survives_failures():
+    fake = FakeTime(datetime(2024, 1, 1, 7, 59, 30))
+    scheduler = Scheduler(clock=fake.clock, sleep=fake.sleep)
+    runs = []
+
+    async def report():
+        runs.append(('report', fake.now))
+
+    async def broken():
+        runs.append(('broken', fake.now))
+        raise RuntimeError("boom")
+
+    async def exits():
+        runs.append(('exits', fake.now))
+        exit(1)
+
+    scheduler.add_job('report', "*/5 8 * * *", report)
+    scheduler.add_job('broken', "0 8 * * *", broken)
+    scheduler.add_job('exits', "1 8 * * *", exits)
+    run_scheduler(scheduler, until=datetime(2024, 1, 1, 8, 10, 30))
+
+    assert [name for name, _ in runs] == ['report', 'broken', 'exits', 'report', 'report']
+    assert all(moment.second == 0 for _, moment in runs)
+
+
+def test_scheduler_skips_a_run_while_the_previous_one_is_still_going():
+    fake = FakeTime(datetime(2024, 1, 1, 0, 0))
+    scheduler = Scheduler(clock=fake.clock, sleep=fake.sleep)
+    release = asyncio.Event()
+    started = []
+
+    async def slow():
+        started.append(fake.now)
+        await release.wait()
+
+    scheduler.add_job('slow', "* * * * *", slow)
+    with pytest.raises(ValueError):
+        scheduler.add_job('slow', "* * * * *", slow)
+
+    async def runner():
+        stop = asyncio.Event()
+        task = asyncio.create_task(scheduler.run(stop))
+        while fake.now < datetime(2024, 1, 1, 0, 5):
+            await asyncio.sleep(0)
+        release.set()
+        stop.set()
+        await task
+
+    asyncio.run(runner())
+    assert started == [datetime(2024, 1, 1, 0, 1)]
@@ -0,0 +1,73 @@
+import pandas as pd
+
+from crypto.signal_scanner import asset_table, scan_signals, render_signals
+
+
+def asset_frame(ma50, ma200, macd, signal_line, rsi, price, upper, lower, volume):
+    return pd.DataFrame({
+        'MA50': ma50, 'MA200': ma200, 'MACD': macd, 'Signal_Line': signal_line, 'RSI': rsi,
+        'price': price, 'bollinger_upper': upper, 'bollinger_lower': lower, 'volume': volume,
+    })
+
+
+def make_table():
+    bullish = asset_frame(
+        ma50=[2, 2, 2], ma200=[1, 1, 1],
+        macd=[-1, 1, 2], signal_line=[0, 0, 0],
+        rsi=[75, 80, 85],
+        price=[10, 10, 10], upper=[12, 12, 12], lower=[8, 8, 8],
+        volume=[1, 1, 1],
+    )
+    bearish = asset_frame(
+        ma50=[2, 1, 0], ma200=[1, 1, 1],
+        macd=[-1, -2, -3], signal_line=[0, 0, 0],
+        rsi=[50, 40, 25],
+        price=[10, 10, 7], upper=[12, 12, 12], lower=[8, 8, 8],
+        volume=[1, 1, 1],
+    )
+    return asset_table({'BTC': bullish, 'ETH': bearish})
+
+
+def test_scan_signals_classifies_each_asset():
+    signals = scan_signals(make_table(), window=3)
+
+    assert signals.loc['BTC', 'ma_state'] == 'consistent_uptrend'
+    assert signals.loc['BTC', 'macd_state'] == 'crossover'
+    assert signals.loc['BTC', 'macd_crossovers'] == [('bullish', 1)]
+    assert signals.loc['BTC', 'rsi_state'] == 'consistently_overbought'
+    assert signals.loc['BTC', 'bollinger_state'] == 'within'
+
+    assert signals.loc['ETH', 'ma_state'] == 'potential_death_cross'
+    assert signals.loc['ETH', 'macd_state'] == 'bearish'
+    assert signals.loc['ETH', 'rsi_state'] == 'oversold'
+    assert signals.loc['ETH', 'bollinger_state'] == 'below'
+
+    # 3 rows are not enough for a 20-period volume average, and no ADX was given
+    assert (signals['volume_state'] == 'insufficient_data').all()
+    assert (signals['regime_state'] == 'insufficient_data').all()
+
+
+def test_scan_signals_volume_and_regime():
+    table = asset_table({'BTC': pd.DataFrame({'volume': [10.0] * 19 + [40.0]})})
+    adx = asset_table({'BTC': pd.DataFrame({'ADX': [float('nan'), 30.0], 'DMP': [0, 10.0], 'DMN': [0, 20.0]})})
+    signals = scan_signals(table, adx=adx)
+    assert signals.loc['BTC', 'volume_state'] == 'spike'
+    assert signals.loc['BTC', 'regime_state'] == 'strong_bearish'
+
+
+def test_render_signals_matches_report_text():
+    signals = scan_signals(make_table(), window=3)
+    assert render_signals(signals.loc['BTC'], window=3) == [
+        "Consistent Uptrend (Golden Cross for 3 days) 🟢",
+        "MACD Crossovers Detected:\nBullish crossover 1 days ago 🟢",
+        "RSI consistently overbought (85.00) 🔴",
+        "Price within Bollinger Bands (Normal) ⚪",
+        "Volume (Not enough data)",
+        "Regime (Not enough data)",
+    ]
+
+
+def test_asset_table_skips_missing_frames():
+    assert asset_table({'BTC': None}) is None
+    table = asset_table({'BTC': pd.DataFrame({'price': [1]}), 'ETH': None})
+    assert list(table.columns) == [('BTC', 'price')]
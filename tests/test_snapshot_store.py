@@ -0,0 +1,64 @@
+import pandas as pd
+
+from crypto.get_btc_data import merge_dataframes
+from crypto.snapshot_store import SnapshotStore
+
+
+def row(date, price, dominance=50.0):
+    return {
+        'date': date,
+        'current_price': price,
+        'dominance_percentage': dominance,
+        'market_cap_usd': 1.0,
+        '24h_volume_usd': 2.0,
+        '24h_change_percentage': 3.0,
+    }
+
+
+def test_compact_keeps_latest_snapshot_per_day(tmp_path):
+    store = SnapshotStore(tmp_path / "snapshots.sqlite")
+    store.append_rows([
+        row('2024-01-01 08:00:00', 100),
+        row('2024-01-01 20:00:00', 110),
+        row('2024-01-02 08:00:00', 120),
+    ])
+    assert store.compact() == 1
+    assert store.count() == 2
+    assert store.query()['current_price'].tolist() == [110, 120]
+
+
+def test_query_returns_latest_per_day_within_range(tmp_path):
+    store = SnapshotStore(tmp_path / "snapshots.sqlite")
+    store.append_rows([
+        row('2024-01-01 08:00:00', 100),
+        row('2024-01-02 08:00:00', 120),
+        row('2024-01-02 09:00:00', 125),
+        row('2024-01-03 08:00:00', 130),
+    ])
+    result = store.query(start='2024-01-02', end=pd.Timestamp('2024-01-02'))
+    assert result['current_price'].tolist() == [125]
+    assert result['date'].tolist() == ['2024-01-02 09:00:00']
+
+
+def test_append_uses_current_data_layout(tmp_path):
+    store = SnapshotStore(tmp_path / "snapshots.sqlite")
+    store.append({'current_price': 1.234, 'current_dominance': 55.555, 'usd_market_cap': 1,
+                  'usd_24h_vol': 2, 'usd_24h_change': 3})
+    result = store.query()
+    assert result['current_price'].iloc[0] == 1.23
+    assert list(result.columns) == [
+        'date', 'current_price', 'dominance_percentage', 'market_cap_usd',
+        '24h_volume_usd', '24h_change_percentage',
+    ]
+
+
+def test_import_csv_and_merge(tmp_path):
+    csv_path = tmp_path / "btc_data.csv"
+    pd.DataFrame([row('2024-01-01 08:00:00', 100, 50), row('2024-01-02 08:00:00', 110, 60)]).to_csv(csv_path, index=False)
+    store = SnapshotStore(tmp_path / "snapshots.sqlite")
+    assert store.import_csv(csv_path) == 2
+
+    hist = pd.DataFrame({'date': ['2024-01-01', '2024-01-02'], 'price': [90, 95]})
+    merged = merge_dataframes(store.query(start='2024-01-01'), hist)
+    assert merged['price'].iloc[-1] == 110
+    assert merged['dominance_percentage'].tolist() == [50, 60]
@@ -0,0 +1,54 @@
+import os
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Modules that must not be loaded just by importing an entry point
+LAZY_MODULES = ("openai", "matplotlib", "pandas_ta")
+
+# Cold-start budgets in seconds, roughly 2x the measured import time so the
+# test catches regressions (e.g. a heavy SDK imported at module level again)
+# without being flaky. Scale them with STARTUP_BUDGET_SCALE on slow machines.
+STARTUP_BUDGETS = {
+    "crypto_main": 2.0,
+    "fetch_all_data": 2.0,
+    "word_quiz": 1.0,
+    "quote_of_the_day": 1.0,
+    "business_psychology": 1.0,
+}
+
+PROBE = """
+import sys, json, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def import_entry_point(module):
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("module", sorted(STARTUP_BUDGETS))
+def test_entry_point_startup(module):
+    # best of three runs, so a busy machine does not fail the test on its own
+    runs = [import_entry_point(module) for _ in range(3)]
+
+    loaded = {name.split(".")[0] for name in runs[0]["modules"]}
+    assert not loaded & set(LAZY_MODULES)
+
+    budget = STARTUP_BUDGETS[module] * float(os.getenv("STARTUP_BUDGET_SCALE", "1"))
+    assert min(run["elapsed"] for run in runs) < budget
@@ -0,0 +1,110 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from crypto.storage import read_table, write_table, table_exists, NpyColumnBackend
+
+
+def sample_frame():
+    return pd.DataFrame({
+        'date': [datetime.date(2024, 1, 1), datetime.date(2024, 1, 2)],
+        'price': [42000.12, 43000.5],
+        'volume': [1.5e10, 2.5e10],
+        'symbol': ['btc', 'btc'],
+    })
+
+
+def test_npy_roundtrip_keeps_types_and_values(tmp_path):
+    path = tmp_path / "historical_data.csv"
+    write_table(sample_frame(), path, backend='npy')
+
+    assert (tmp_path / "historical_data.cols").is_dir()
+    result = read_table(path, backend='npy')
+    assert list(result.columns) == ['date', 'price', 'volume', 'symbol']
+    assert result['price'].tolist() == [42000.12, 43000.5]
+    assert pd.api.types.is_datetime64_any_dtype(result['date'])
+    assert result['symbol'].tolist() == ['btc', 'btc']
+
+
+def test_npy_read_is_memory_mapped_and_projected(tmp_path):
+    path = tmp_path / "ohlc_data.csv"
+    write_table(sample_frame(), path, backend='npy')
+
+    result = read_table(path, columns=['volume', 'price'], backend='npy')
+    assert list(result.columns) == ['price', 'volume']
+    assert isinstance(result['price'].to_numpy().base, np.memmap) or isinstance(result['price'].to_numpy(), np.memmap)
+
+
+def test_missing_column_raises(tmp_path):
+    path = tmp_path / "t.csv"
+    write_table(sample_frame(), path, backend='npy')
+    with pytest.raises(KeyError):
+        read_table(path, columns=['nope'], backend='npy')
+
+
+def test_read_falls_back_to_existing_csv(tmp_path):
+    path = tmp_path / "historical_data.csv"
+    sample_frame().to_csv(path, index=False)
+
+    assert table_exists(path, backend='npy')
+    assert not NpyColumnBackend().exists(path)
+    assert read_table(path, backend='npy')['price'].tolist() == [42000.12, 43000.5]
+
+
+def test_read_missing_table_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        read_table(tmp_path / "missing.csv", backend='npy')
+
+
+def test_csv_backend_writes_plain_csv(tmp_path):
+    path = tmp_path / "data.csv"
+    write_table(sample_frame(), path)
+    assert pd.read_csv(path)['price'].tolist() == [42000.12, 43000.5]
+
+
+def test_npy_overwrite_replaces_the_whole_table(tmp_path):
+    path = tmp_path / "historical_data.csv"
+    write_table(sample_frame(), path, backend='npy')
+    first = (tmp_path / "historical_data.cols").resolve()
+    write_table(pd.DataFrame({'price': [1.0, 2.0, 3.0]}), path, backend='npy')
+    second = (tmp_path / "historical_data.cols").resolve()
+    write_table(pd.DataFrame({'price': [4.0]}), path, backend='npy')
+
+    assert read_table(path, backend='npy')['price'].tolist() == [4.0]
+    # The narrower table leaves no column files of the old one behind
+    location = (tmp_path / "historical_data.cols").resolve()
+    assert sorted(p.name for p in location.iterdir()) == ['0.npy', '_schema.json']
+    # Only the version replaced last is kept, for readers still on it
+    versions = {p for p in tmp_path.iterdir() if p.name.startswith("historical_data.cols.")}
+    assert versions == {second, location} and not first.exists()
+
+
+def test_npy_read_retries_when_its_version_is_removed(tmp_path, monkeypatch):
+    import shutil
+    from crypto import storage
+
+    path = tmp_path / "historical_data.csv"
+    write_table(sample_frame(), path, backend='npy')
+    old = (tmp_path / "historical_data.cols").resolve()
+    load = np.load
+
+    def load_after_replacing(*args, **kwargs):
+        # The old version is removed after the reader resolved it but before its columns are loaded
+        if old.exists():
+            write_table(pd.DataFrame({'price': [1.0]}), path, backend='npy')
+            shutil.rmtree(old)
+        return load(*args, **kwargs)
+
+    monkeypatch.setattr(storage.np, "load", load_after_replacing)
+    assert read_table(path, backend='npy')['price'].tolist() == [1.0]
+
+
+def test_npy_keeps_missing_text_values_missing(tmp_path):
+    path = tmp_path / "t.csv"
+    write_table(pd.DataFrame({'symbol': ['btc', None, np.nan]}), path, backend='npy')
+
+    result = read_table(path, backend='npy')
+    assert result['symbol'].iloc[0] == 'btc'
+    assert result['symbol'].iloc[1:].isna().all()
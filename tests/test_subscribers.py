@@ -0,0 +1,59 @@
+import asyncio
+
+from telegram_service.subscribers import SubscriberRegistry, deliver, load_audiences, load_chat_ids
+
+
+def test_registry_groups_subscribers_by_report(tmp_path):
+    registry = SubscriberRegistry(tmp_path / "subscribers.sqlite")
+    registry.subscribe(1, "crypto_main", assets=["btc"])
+    registry.subscribe(2, "crypto_main", assets=["BTC", "eth"])
+    registry.subscribe(3, "crypto_main", assets=["ETH"], schedule="0 7 * * *")
+    registry.subscribe(4, "quote_of_the_day")
+
+    assert registry.audiences("crypto_main") == {"BTC": [1, 2], "ETH": [2]}
+    assert registry.audiences("crypto_main", "0 7 * * *") == {"ETH": [3]}
+    assert registry.audiences("quote_of_the_day") == {None: [4]}
+    assert registry.schedules("crypto_main") == ["0 7 * * *"]
+    assert registry.count() == 4
+
+
+def test_subscribe_replaces_preferences_and_unsubscribe_removes(tmp_path):
+    registry = SubscriberRegistry(tmp_path / "subscribers.sqlite")
+    registry.subscribe(1, "crypto_main", assets=["BTC", "ETH"])
+    registry.subscribe(1, "crypto_main", assets=["SOL"])
+    registry.subscribe(1, "word_quiz")
+    assert registry.audiences("crypto_main") == {"SOL": [1]}
+
+    assert registry.unsubscribe(1, "crypto_main") == 1
+    assert registry.audiences("crypto_main") == {}
+    assert registry.unsubscribe(1) == 1
+    assert registry.count() == 0
+
+
+def test_load_audiences_falls_back_to_the_default_chat(tmp_path):
+    path = tmp_path / "subscribers.sqlite"
+    assert load_audiences(path, "crypto_main", default_chat_id=99, default_key="BTC") == {"BTC": [99]}
+    assert load_chat_ids(path, "word_quiz", default_chat_id=99) == [99]
+
+    SubscriberRegistry(path).subscribe(5, "word_quiz", schedule="0 9 * * *")
+    # Once the bot has subscribers, the default chat is no longer added
+    assert load_chat_ids(path, "word_quiz", default_chat_id=99) == []
+    assert load_chat_ids(path, "word_quiz", schedule="0 9 * * *", default_chat_id=99) == [5]
+
+
+def test_deliver_renders_each_report_once():
+    rendered, sent = [], []
+
+    async def render(asset):
+        rendered.append(asset)
+        return None if asset == "DOGE" else f"{asset} report"
+
+    async def send(report, chat_ids):
+        sent.append((report, chat_ids))
+
+    audiences = {"BTC": [1, 2, 3], "ETH": [2], "DOGE": [4]}
+    reports = asyncio.run(deliver(audiences, render, send))
+
+    assert sorted(rendered) == ["BTC", "DOGE", "ETH"]
+    assert sorted(sent) == [("BTC report", [1, 2, 3]), ("ETH report", [2])]
+    assert reports == {"BTC": "BTC report", "ETH": "ETH report", "DOGE": None}
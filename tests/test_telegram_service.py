@@ -1,9 +1,15 @@
 # tests/test_telegram_notifier.py
 import asyncio
 import types
+from datetime import datetime, timezone
+
 import pytest
+from telegram.error import BadRequest, Forbidden, RetryAfter, TimedOut
 
 from telegram_service import bot as bot_module
+from telegram_service.cursor import UpdateCursor
+from telegram_service.dispatcher import UpdateDispatcher
+from telegram_service.send_queue import SendQueue
 
 
 def test_telegram_notifier_requires_token():
@@ -26,25 +32,16 @@ class DummyUpdate:
 class DummyBotGetUpdatesOK:
     def __init__(self, token):
         self.token = token
-        self.called = False
-        self.last_ack_offset = None
-        self.last_ack_limit = None
-        # pretend there are two new updates
-        self._queue = [
-            DummyUpdate(1, "hi"),
-            DummyUpdate(2, "hello"),
+        self.calls = []
+        # pretend there are two new updates, then nothing
+        self._batches = [
+            [DummyUpdate(1, "hi"), DummyUpdate(2, "hello")],
+            [],
         ]
 
-    async def get_updates(self, offset=None, limit=None):
-        # First call (no offset): return queued updates
-        if offset is None:
-            self.called = True
-            return list(self._queue)
-
-        # "Ack" call: record what was requested and return empty
-        self.last_ack_offset = offset
-        self.last_ack_limit = limit
-        return []
+    async def get_updates(self, offset=None, limit=None, timeout=None, allowed_updates=None):
+        self.calls.append({'offset': offset, 'limit': limit, 'timeout': timeout, 'allowed_updates': allowed_updates})
+        return self._batches.pop(0)
 
 
 def test_send_message(monkeypatch):
@@ -73,21 +70,30 @@ def test_get_updates_success(monkeypatch):
     # Now get_updates returns the texts it extracted
     assert texts == ["hi", "hello"]
 
-    # Ensure the initial fetch ran
-    assert dummy.called is True
+    # One request per call: no separate ack round trip
+    assert dummy.calls == [{'offset': None, 'limit': 100, 'timeout': 0, 'allowed_updates': ["message"]}]
+
+    # The next call carries offset = last_update_id + 1, which confirms updates 1 and 2
+    assert asyncio.run(notifier.get_updates()) == []
+    assert dummy.calls[1]['offset'] == 3
 
-    # Ensure the ack call advanced the offset to last_update_id + 1 (2 + 1 = 3)
-    assert dummy.last_ack_offset == 3
-    # We suggested limit=1 for a lightweight ack
-    # If your production code doesn't pass limit, remove this next assert
-    # assert dummy.last_ack_limit == 1
+
+def test_get_updates_persists_the_cursor(monkeypatch, tmp_path):
+    cursor_path = tmp_path / "offset.json"
+    monkeypatch.setattr(bot_module, "Bot", lambda token: DummyBotGetUpdatesOK(token))
+    asyncio.run(bot_module.TelegramNotifier("token", cursor_path=str(cursor_path)).get_updates())
+
+    dummy = DummyBotGetUpdatesOK("token")
+    monkeypatch.setattr(bot_module, "Bot", lambda token: dummy)
+    asyncio.run(bot_module.TelegramNotifier("token", cursor_path=str(cursor_path)).get_updates())
+    assert dummy.calls[0]['offset'] == 3
 
 
 class DummyBotGetUpdatesTelegramError:
     def __init__(self, token):
         self.token = token
 
-    async def get_updates(self, offset=None, limit=None):
+    async def get_updates(self, **kwargs):
         raise bot_module.TelegramError("boom")
 
 
@@ -107,7 +113,7 @@ class DummyBotGetUpdatesGenericError:
     def __init__(self, token):
         self.token = token
 
-    async def get_updates(self, offset=None, limit=None):
+    async def get_updates(self, **kwargs):
         raise RuntimeError("unexpected crash")
 
 
@@ -116,3 +122,338 @@ def test_get_updates_generic_exception_returns_empty_list(monkeypatch):
     notifier = bot_module.TelegramNotifier("token")
     texts = asyncio.run(notifier.get_updates())
     assert texts == []
+
+
+class ChatMessage:
+    def __init__(self, chat_id, text, date=None):
+        self.chat_id = chat_id
+        self.text = text
+        self.date = date
+
+
+class ChatUpdate:
+    def __init__(self, update_id, chat_id, text, date=None):
+        self.update_id = update_id
+        self.message = ChatMessage(chat_id, text, date)
+
+
+class LongPollBot:
+    """Answers each long poll with the next scripted batch, or blocks like Telegram would."""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.calls = []
+
+    async def get_updates(self, offset=None, timeout=None, allowed_updates=None):
+        self.calls.append({'offset': offset, 'timeout': timeout, 'allowed_updates': allowed_updates})
+        if self.batches:
+            await asyncio.sleep(0)
+            return self.batches.pop(0)
+        await asyncio.sleep(3600)
+        return []
+
+
+def test_dispatcher_routes_replies_by_chat():
+    bot = LongPollBot([
+        [ChatUpdate(10, 999, "someone else")],
+        [ChatUpdate(11, 42, "word1, word2")],
+    ])
+
+    async def scenario():
+        dispatcher = UpdateDispatcher(bot, poll_timeout=30)
+        reply = await dispatcher.wait_for_reply(42, timeout=5)
+        await asyncio.sleep(0)
+        return dispatcher, reply
+
+    dispatcher, reply = asyncio.run(scenario())
+    assert reply == "word1, word2"
+    assert [c['offset'] for c in bot.calls] == [None, 11, 12]
+    assert all(c['timeout'] == 30 and c['allowed_updates'] == ["message"] for c in bot.calls)
+    assert dispatcher.offset == 12
+    assert not dispatcher.waiting
+
+
+def test_dispatcher_ignores_messages_sent_before_the_wait():
+    stale = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    bot = LongPollBot([[ChatUpdate(1, 42, "old answer", date=stale)], [ChatUpdate(2, 42, "new answer")]])
+    reply = asyncio.run(UpdateDispatcher(bot).wait_for_reply(42, timeout=5))
+    assert reply == "new answer"
+
+
+def test_dispatcher_times_out_and_stops_polling():
+    bot = LongPollBot([])
+
+    async def scenario():
+        dispatcher = UpdateDispatcher(bot)
+        reply = await dispatcher.wait_for_reply(42, timeout=0.01)
+        await asyncio.sleep(0)
+        return dispatcher, reply
+
+    dispatcher, reply = asyncio.run(scenario())
+    assert reply is None
+    assert len(bot.calls) == 1
+    assert dispatcher._poller.done()
+
+
+def test_dispatcher_without_waiters_does_not_poll():
+    bot = LongPollBot([[ChatUpdate(1, 42, "hi")]])
+    dispatcher = UpdateDispatcher(bot)
+    assert dispatcher.process_update(ChatUpdate(1, 42, "hi")) is False
+    assert bot.calls == []
+
+
+def test_dispatcher_streams_every_update_to_each_consumer(tmp_path):
+    bot = LongPollBot([
+        [ChatUpdate(1, 42, "quiz answer"), ChatUpdate(2, 7, "/start")],
+        [ChatUpdate(3, 42, "second")],
+    ])
+    dispatcher = UpdateDispatcher(bot, cursor=UpdateCursor(str(tmp_path / "offset.json")))
+
+    async def consume(stream, count):
+        texts = []
+        async for update in stream:
+            texts.append(update.message.text)
+            if len(texts) == count:
+                break
+        return texts
+
+    async def scenario():
+        return await asyncio.gather(
+            consume(dispatcher.stream(), 3),
+            consume(dispatcher.stream(chat_id=42), 2),
+            dispatcher.wait_for_reply(42, timeout=5),
+        )
+
+    everything, chat_42, reply = asyncio.run(scenario())
+    assert everything == ["quiz answer", "/start", "second"]
+    assert chat_42 == ["quiz answer", "second"]
+    assert reply == "quiz answer"
+    assert not dispatcher.waiting
+    assert UpdateCursor(str(tmp_path / "offset.json")).offset == 4
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+
+
+class FloodyBot:
+    """Rejects the first call with RetryAfter, then records the send times."""
+
+    def __init__(self, clock, failures):
+        self.clock = clock
+        self.failures = list(failures)
+        self.sent = []
+
+    async def send_message(self, chat_id, text):
+        if self.failures:
+            raise self.failures.pop(0)
+        self.sent.append((chat_id, text, self.clock.now))
+
+
+def test_send_queue_paces_each_chat_and_honours_retry_after():
+    clock = FakeClock()
+    bot = FloodyBot(clock, [RetryAfter(5)])
+    queue = SendQueue(bot, global_rate=100, clock=clock, sleep=clock.sleep)
+
+    async def scenario():
+        for text in ("a", "b", "c"):
+            await queue.send('send_message', 42, text=text)
+
+    asyncio.run(scenario())
+    # "a" waits out the 5 s flood control, then chat 42 gets one message per second
+    assert bot.sent == [(42, "a", 5.0), (42, "b", 6.0), (42, "c", 7.0)]
+
+
+def test_send_queue_paces_channel_usernames_at_the_group_rate():
+    clock = FakeClock()
+    bot = FloodyBot(clock, [])
+    queue = SendQueue(bot, global_rate=100, group_rate=0.5, clock=clock, sleep=clock.sleep)
+
+    async def scenario():
+        for text in ("a", "b"):
+            await queue.send('send_message', "@channel", text=text)
+
+    asyncio.run(scenario())
+    assert bot.sent == [("@channel", "a", 0.0), ("@channel", "b", 2.0)]
+
+
+def test_send_queue_retries_network_errors_but_not_bad_requests():
+    clock = FakeClock()
+    bot = FloodyBot(clock, [TimedOut(), TimedOut()])
+    queue = SendQueue(bot, clock=clock, sleep=clock.sleep, backoff_factor=1.0)
+    asyncio.run(queue.send('send_message', 1, text="hi"))
+    assert bot.sent == [(1, "hi", 3.0)]  # 1 s + 2 s backoff
+
+    bot = FloodyBot(clock, [BadRequest("chat not found")])
+    queue = SendQueue(bot, clock=clock, sleep=clock.sleep)
+    with pytest.raises(BadRequest):
+        asyncio.run(queue.send('send_message', 1, text="hi"))
+    assert bot.sent == []
+
+
+def test_broadcast_message_sends_to_every_chat(monkeypatch):
+    class BroadcastBot:
+        def __init__(self, token):
+            self.sent = []
+
+        async def send_message(self, chat_id, text):
+            if chat_id == 3:
+                raise Forbidden("bot was blocked by the user")
+            self.sent.append(chat_id)
+
+    dummy = BroadcastBot("token")
+    monkeypatch.setattr(bot_module, "Bot", lambda token: dummy)
+    notifier = bot_module.TelegramNotifier("token")
+    results = asyncio.run(notifier.broadcast_message("report", range(1, 6)))
+    assert results == {1: True, 2: True, 3: False, 4: True, 5: True}
+    assert sorted(dummy.sent) == [1, 2, 4, 5]
+
+
+def test_send_media_group_batches_albums_of_ten(monkeypatch, tmp_path):
+    class AlbumBot:
+        def __init__(self, token):
+            self.albums = []
+
+        async def send_media_group(self, chat_id, media):
+            self.albums.append((chat_id, [m.caption for m in media]))
+
+    paths = []
+    for i in range(12):
+        paths.append(tmp_path / f"chart{i}.png")
+        paths[-1].write_bytes(b"png")
+
+    dummy = AlbumBot("token")
+    monkeypatch.setattr(bot_module, "Bot", lambda token: dummy)
+    notifier = bot_module.TelegramNotifier("token")
+    assert asyncio.run(notifier.send_media_group(paths, chat_id=7, caption="Charts")) is True
+    assert [len(captions) for _, captions in dummy.albums] == [10, 2]
+    assert dummy.albums[0][1][0] == "Charts" and dummy.albums[0][1][1] is None
+
+
+class PhotoBot:
+    def __init__(self, token):
+        self.sent = []
+        self.uploads = 0
+        self.reject = set()
+
+    async def send_photo(self, chat_id, photo, caption=None):
+        self.sent.append((chat_id, photo))
+        if isinstance(photo, bytes):
+            self.uploads += 1
+            await asyncio.sleep(0)
+            file_id = f"file-{self.uploads}"
+        elif photo in self.reject:
+            raise BadRequest("Wrong file identifier/http url specified")
+        else:
+            file_id = photo
+        sizes = [types.SimpleNamespace(file_id=f"{file_id}-thumb"), types.SimpleNamespace(file_id=file_id)]
+        return types.SimpleNamespace(photo=sizes)
+
+
+def test_broadcast_photos_uploads_each_chart_once(monkeypatch, tmp_path):
+    chart = tmp_path / "chart.png"
+    chart.write_bytes(b"chart v1")
+    cache_path = tmp_path / "file_ids.json"
+
+    dummy = PhotoBot("token")
+    monkeypatch.setattr(bot_module, "Bot", lambda token: dummy)
+    notifier = bot_module.TelegramNotifier("token", file_id_cache_path=str(cache_path))
+    results = asyncio.run(notifier.broadcast_photos([chart], "Chart", range(1, 6)))
+    assert all(results.values())
+    assert dummy.uploads == 1
+    assert sorted(photo for _, photo in dummy.sent if not isinstance(photo, bytes)) == ["file-1"] * 4
+    assert notifier._uploads == {}
+
+    # A new process reuses the persisted file_id; a changed chart is uploaded again
+    notifier = bot_module.TelegramNotifier("token", file_id_cache_path=str(cache_path))
+    asyncio.run(notifier.send_photo(chart, "Chart", chat_id=6))
+    assert dummy.uploads == 1 and dummy.sent[-1] == (6, "file-1")
+    chart.write_bytes(b"chart v2")
+    asyncio.run(notifier.send_photo(chart, "Chart", chat_id=6))
+    assert dummy.uploads == 2 and dummy.sent[-1] == (6, b"chart v2")
+
+
+def test_rejected_file_id_falls_back_to_uploading(monkeypatch, tmp_path):
+    chart = tmp_path / "chart.png"
+    chart.write_bytes(b"chart")
+    dummy = PhotoBot("token")
+    monkeypatch.setattr(bot_module, "Bot", lambda token: dummy)
+    notifier = bot_module.TelegramNotifier("token")
+    notifier.file_ids.put(bot_module.content_hash(b"chart"), "stale")
+    dummy.reject.add("stale")
+
+    assert asyncio.run(notifier.send_photo(chart, "Chart", chat_id=1)) is True
+    assert dummy.sent == [(1, "stale"), (1, b"chart")]
+    assert notifier.file_ids.get(bot_module.content_hash(b"chart")) == "file-1"
+
+
+def test_file_id_cache_evicts_the_oldest_entries(tmp_path):
+    from telegram_service.file_cache import FileIdCache
+
+    path = tmp_path / "file_ids.json"
+    cache = FileIdCache(str(path), max_entries=2)
+    for digest in ("a", "b", "a", "c"):
+        cache.put(digest, f"id-{digest}")
+    reloaded = FileIdCache(str(path), max_entries=2)
+    assert (reloaded.get("a"), reloaded.get("b"), reloaded.get("c")) == ("id-a", None, "id-c")
+
+
+class EditingBot:
+    def __init__(self, token):
+        self.texts = {}
+        self.edits = 0
+        self.deleted = []
+
+    async def send_message(self, chat_id, text):
+        self.texts[chat_id] = text
+        return types.SimpleNamespace(message_id=100 + chat_id)
+
+    async def edit_message_text(self, chat_id, message_id, text):
+        assert message_id == 100 + chat_id
+        self.edits += 1
+        self.texts[chat_id] = text
+
+    async def delete_message(self, chat_id, message_id):
+        self.deleted.append(chat_id)
+
+
+async def deltas(*pieces, fail=False):
+    for piece in pieces:
+        await asyncio.sleep(0)
+        yield piece
+    if fail:
+        raise RuntimeError("generation failed")
+
+
+def test_broadcast_stream_edits_placeholders_to_the_final_text(monkeypatch):
+    dummy = EditingBot("token")
+    monkeypatch.setattr(bot_module, "Bot", lambda token: dummy)
+    notifier = bot_module.TelegramNotifier("token")
+    text, results = asyncio.run(notifier.broadcast_stream(
+        deltas("Carpe", " diem"), [1, 2], header="Topic: time\n\n", footer="\n\nLLM: m", min_interval=0,
+    ))
+    assert text == "Carpe diem"
+    assert results == {1: True, 2: True}
+    assert dummy.texts == {1: "Topic: time\n\nCarpe diem\n\nLLM: m", 2: "Topic: time\n\nCarpe diem\n\nLLM: m"}
+    assert dummy.edits > 2  # progressive edits before the final one
+
+
+def test_broadcast_stream_removes_placeholders_when_generation_fails(monkeypatch):
+    dummy = EditingBot("token")
+    monkeypatch.setattr(bot_module, "Bot", lambda token: dummy)
+    notifier = bot_module.TelegramNotifier("token")
+    with pytest.raises(RuntimeError):
+        asyncio.run(notifier.broadcast_stream(deltas("Half", fail=True), [1, 2]))
+    assert sorted(dummy.deleted) == [1, 2]
+
+
+def test_split_message_prefers_line_breaks():
+    assert bot_module.split_message("aaa\nbbb\nccc", limit=8) == ["aaa\nbbb", "ccc"]
+    assert bot_module.split_message("abcdefghij", limit=4) == ["abcd", "efgh", "ij"]
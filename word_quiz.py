@@ -6,11 +6,12 @@ from dotenv import load_dotenv
 from quote_of_the_day import get_learned_words
 
 import config.word_quiz_config as word_quiz_config
+import config.subscribers_config as subscribers_config
 
 from telegram_service.bot import TelegramNotifier
+from telegram_service.subscribers import load_chat_ids
 
 from LLMs.factory import get_llm_instance
-from requests.exceptions import HTTPError, RequestException
 
 logging.basicConfig(level=logging.INFO,
                     format="%(asctime)s - %(levelname)s - %(message)s")
@@ -47,10 +48,15 @@ def evaluate_answers(correct_words: list[str], user_words: list[str]) -> str:
 
 
 # --- Main Asynchronous Logic ---
-async def main():
+async def main(chat_instance=None, notifier=None, schedule=None):
+    chat_ids = load_chat_ids(subscribers_config.DB_PATH, "word_quiz", schedule, default_chat_id=TELEGRAM_USER_ID)
+    if not chat_ids:
+        logger.info("No subscribers for this run.")
+        return
+
     # --- Initialization ---
-    chat_instance = get_llm_instance(word_quiz_config)
-    notifier = TelegramNotifier(token=QOTD_BOT_TOKEN)
+    chat_instance = chat_instance or get_llm_instance(word_quiz_config)
+    notifier = notifier or TelegramNotifier(token=QOTD_BOT_TOKEN, cursor_path=word_quiz_config.UPDATE_OFFSET_PATH)
     learned_words = get_learned_words(word_quiz_config.FILEPATH)
     learned_words = learned_words.split(",")[:-1]
     learned_words = learned_words[-word_quiz_config.N_WORDS:]
@@ -60,7 +66,7 @@ async def main():
     # --- LLM Interaction ---
     logger.info("Generating LLM response for words: %s", ", ".join(shuffled_words))
     message = f"Create sentences for the following words: {', '.join(shuffled_words)}"
-    response, usage = chat_instance.conv(message)
+    response, usage = await chat_instance.aconv(message)
     logger.info("LLM response received. Usage: %s", usage)
 
     final_message = (
@@ -72,43 +78,39 @@ async def main():
         f"LLM: {chat_instance.model_id}"
     )
 
-    # --- Send Notifications (within the same async context) ---
+    # --- Send Notifications: one quiz for every subscriber ---
+    # Register for the replies before sending so an instant answer is not missed
+    replies = {chat_id: notifier.updates.expect_reply(chat_id) for chat_id in chat_ids}
     logger.info("Sending notifications to Telegram...")
-    # These two tasks will run sequentially.
-    await notifier.send_message(msg=final_message, chat_id=TELEGRAM_USER_ID)
+    await notifier.broadcast_message(final_message, chat_ids)
     logger.info("Notification sent.")
 
-    # Start checking for updates 
-    start_time = asyncio.get_event_loop().time()
-    end_time = start_time + word_quiz_config.WAIT_FOR_REPLY_SECONDS
-    telegram_response = []
-    
-    while asyncio.get_event_loop().time() < end_time:
-        try:
-            telegram_response = await notifier.get_updates()
-            if telegram_response != []:
-                logger.info("Received user response. %s", telegram_response)
-                break
-            await asyncio.sleep(word_quiz_config.SLEEP_BETWEEN_CHECKS_SECONDS)
-        except (HTTPError, RequestException) as e:
-            logger.error("Error getting updates: %s", e)
-            await asyncio.sleep(word_quiz_config.SLEEP_BETWEEN_CHECKS_SECONDS)
-        except KeyboardInterrupt:
-            logger.info("Stopping update checks...")
-            break
-    
+    # Each subscriber's reply is awaited and graded independently
+    await asyncio.gather(*(
+        evaluate_reply(notifier, chat_id, reply, shuffled_words) for chat_id, reply in replies.items()
+    ))
+
+
+async def evaluate_reply(notifier: TelegramNotifier, chat_id: int, reply: asyncio.Future, shuffled_words: list[str]):
+    """Waits for one chat's quiz answer (pushed by the long-poll dispatcher) and sends back the evaluation."""
+    try:
+        telegram_response = await asyncio.wait_for(reply, word_quiz_config.WAIT_FOR_REPLY_SECONDS)
+        logger.info("Received response from %s. %s", chat_id, telegram_response)
+    except asyncio.TimeoutError:
+        telegram_response = None
+
     if not telegram_response:
-        logger.info("No user response within %d seconds.", word_quiz_config.WAIT_FOR_REPLY_SECONDS)
+        logger.info("No response from %s within %d seconds.", chat_id, word_quiz_config.WAIT_FOR_REPLY_SECONDS)
         await notifier.send_message(
             msg=f"⏱️ No reply received. We’ll try again next time.",
-            chat_id=TELEGRAM_USER_ID,
+            chat_id=chat_id,
         )
         return
     
-    user_answers = telegram_response[0].split(", ")
+    user_answers = telegram_response.split(", ")
 
     evaluation = evaluate_answers(shuffled_words, user_answers)
-    await notifier.send_message(msg=evaluation, chat_id=TELEGRAM_USER_ID)
+    await notifier.send_message(msg=evaluation, chat_id=chat_id)
 
 if __name__ == "__main__":
     # Run the entire async main function once.